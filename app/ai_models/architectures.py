@@ -1,18 +1,228 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
 import torch
 import torch.nn as nn
 from torchvision import models
 
+from app.core.metrics import metrics
+
+# (최대 스레드 수, 풀)
+_member_pool: Optional[Tuple[int, ThreadPoolExecutor]] = None
+_member_pool_lock = threading.Lock()
+
+
+def _get_member_pool(size: int) -> ThreadPoolExecutor:
+    """
+    앙상블 멤버를 동시에 돌릴 때 첫 멤버를 뺀 나머지를 실행하는 스레드 풀 (torch 연산은 GIL을 놓고 실행됨).
+    요청한 크기보다 작으면 더 큰 풀로 바꾼다 (기존 풀에서 실행 중인 작업은 그대로 끝남)
+    """
+    global _member_pool
+    with _member_pool_lock:
+        if _member_pool is None or _member_pool[0] < size:
+            if _member_pool is not None:
+                _member_pool[1].shutdown(wait=False)
+            _member_pool = (size, ThreadPoolExecutor(max_workers=size, thread_name_prefix="ensemble"))
+        return _member_pool[1]
+
+
+def _is_tracing() -> bool:
+    """jit.trace / FX(prepare_fx 정적 양자화) / torch.export·compile 로 그래프를 뽑는 중인지"""
+    if torch.jit.is_tracing() or torch.jit.is_scripting():
+        return True
+    if torch.compiler.is_compiling():
+        return True
+    # is_fx_tracing 은 호출마다 경고를 남기는 버전이 있어 symbolic_trace 전용 함수를 먼저 사용
+    from torch.fx import _symbolic_trace
+    check = getattr(_symbolic_trace, "is_fx_symbolic_tracing", None) or _symbolic_trace.is_fx_tracing
+    return check()
+
+
 class EnsembleModel(nn.Module):
     """
     앙상블을 위한 기본 모델 클래스
     Args:
         models (list): 앙상블에 사용할 모델 리스트
+        weights (list, optional): 모델별 가중치 (기본값은 동일 가중치 = 단순 평균)
+        parallel (bool): 멤버 모델을 스레드로 동시에 실행할지 여부
+            (호출한 스레드의 intra-op 스레드 수를 멤버끼리 나눠 써서 코어를 초과해 쓰지 않음)
+        max_concurrent_calls (int): 동시에 forward 를 호출하는 스레드 수 (추론 워커 수).
+            parallel 일 때 다른 요청의 멤버 뒤에서 기다리지 않도록 멤버 스레드를 이만큼 준비한다
+        early_exit_threshold (float, optional): 첫 번째 모델의 최고 확률이 이 값 이상인 입력은
+            나머지 모델을 건너뛰고 첫 번째 모델의 결과를 그대로 사용
+        names (list, optional): 지연 시간 지표에 사용할 멤버 이름
+        pet_type (str, optional): 지표에 붙일 pet_type (강아지/고양이 앙상블을 따로 집계)
     """
-    def __init__(self, models):
+    def __init__(
+        self,
+        models,
+        weights: Optional[Sequence[float]] = None,
+        parallel: bool = False,
+        early_exit_threshold: Optional[float] = None,
+        names: Optional[Sequence[str]] = None,
+        pet_type: Optional[str] = None,
+        max_concurrent_calls: int = 1,
+    ):
         super().__init__()
         self.models = nn.ModuleList(models)
-        
+
+        if weights is None:
+            weights = [1.0] * len(self.models)
+        if len(weights) != len(self.models) or sum(weights) <= 0:
+            raise ValueError(f"앙상블 가중치가 올바르지 않습니다: {list(weights)}")
+        total = float(sum(weights))
+        self.weights: List[float] = [float(w) / total for w in weights]
+        self.is_weighted = len(set(self.weights)) > 1
+        self.parallel = parallel
+        self.max_concurrent_calls = max(1, max_concurrent_calls)
+        self.early_exit_threshold = early_exit_threshold
+
+        names = list(names) if names is not None else [str(i) for i in range(len(self.models))]
+        labels = {"pet_type": pet_type} if pet_type else {}
+        self._member_ms = [metrics.histogram("ensemble_member_ms", member=name, **labels) for name in names]
+        self._rows = metrics.counter("ensemble_rows_total", **labels)
+        self._early_exit_rows = metrics.counter("ensemble_early_exit_rows_total", **labels)
+
+    @property
+    def variant(self) -> str:
+        """예측 결과에 영향을 주는 설정 (기본 설정이면 빈 문자열). 캐시 키 구분에 사용"""
+        parts = []
+        if self.is_weighted:
+            parts.append("w=" + ",".join(f"{w:.4g}" for w in self.weights))
+        if self.early_exit_threshold is not None:
+            parts.append(f"exit={self.early_exit_threshold:g}")
+        return ";".join(parts)
+
     def forward(self, x):
-        # 각 모델의 예측을 모두 구해서 평균냅니다.
-        outputs = [model(x) for model in self.models]
-        return torch.mean(torch.stack(outputs), dim=0)
+        # trace(export, FX 양자화) 중에는 지표/데이터에 따른 분기/스레드 없이 모든 모델을 순서대로 실행
+        if _is_tracing():
+            return self._combine([model(x) for model in self.models], self.weights)
+
+        self._rows.inc(x.shape[0])
+        if self.early_exit_threshold is None or len(self.models) < 2:
+            return self._combine(self._run_members(range(len(self.models)), x), self.weights)
+
+        # 첫 번째 모델의 확신도가 낮은 입력만 나머지 모델로 다시 계산
+        first = self._run_member(0, x)
+        confidence = torch.softmax(first, dim=1).max(dim=1).values
+        pending = confidence < self.early_exit_threshold
+        self._early_exit_rows.inc(int(x.shape[0] - pending.sum()))
+        if not bool(pending.any()):
+            return first
+
+        rest = self._run_members(range(1, len(self.models)), x[pending])
+        output = first.clone()
+        output[pending] = self._combine([first[pending]] + rest, self.weights)
+        return output
+
+    @staticmethod
+    def _combine(outputs: List[torch.Tensor], weights: List[float]) -> torch.Tensor:
+        # 각 모델의 예측을 가중 평균합니다. (동일 가중치면 기존의 단순 평균과 같음)
+        return torch.sum(torch.stack([o * w for o, w in zip(outputs, weights)]), dim=0)
+
+    def _run_members(self, indices, x) -> List[torch.Tensor]:
+        indices = list(indices)
+        if not self.parallel or len(indices) < 2:
+            return [self._run_member(i, x) for i in indices]
+
+        # intra-op 스레드 수(OpenMP)는 스레드별 설정이라 호출한 스레드의 몫을 멤버 수로 나눠서 각 멤버 스레드에 준다.
+        # no_grad 등 autograd 상태도 스레드별이라 호출한 스레드의 상태를 그대로 넘겨준다
+        total_threads = torch.get_num_threads()
+        threads = max(1, total_threads // len(indices))
+        grad_enabled = torch.is_grad_enabled()
+        pool = _get_member_pool(self.max_concurrent_calls * (len(indices) - 1))
+        futures = [pool.submit(self._run_member, i, x, grad_enabled, threads) for i in indices[1:]]
+        # 첫 멤버는 호출한 스레드에서 실행
+        torch.set_num_threads(threads)
+        try:
+            first = self._run_member(indices[0], x)
+        finally:
+            torch.set_num_threads(total_threads)
+        return [first] + [future.result() for future in futures]
+
+    def _run_member(
+        self,
+        index: int,
+        x,
+        grad_enabled: Optional[bool] = None,
+        threads: Optional[int] = None,
+    ) -> torch.Tensor:
+        started = time.perf_counter()
+        if grad_enabled is None:
+            output = self.models[index](x)
+        else:
+            torch.set_num_threads(threads)
+            with torch.set_grad_enabled(grad_enabled):
+                output = self.models[index](x)
+        self._member_ms[index].observe((time.perf_counter() - started) * 1000)
+        return output
+
+
+def build_resnet18(num_classes: int) -> nn.Module:
+    """학습 시와 동일한 분류 헤드를 가진 resnet18"""
+    model = models.resnet18(weights=None)
+    model.fc = nn.Sequential(
+        nn.Dropout(0.7),
+        nn.Linear(model.fc.in_features, num_classes)
+    )
+    return model
+
+
+def build_efficientnet_b0(num_classes: int) -> nn.Module:
+    """학습 시와 동일한 분류 헤드를 가진 efficientnet_b0"""
+    model = models.efficientnet_b0(weights=None)
+    model.classifier[1] = nn.Sequential(
+        nn.Dropout(0.7),
+        nn.Linear(model.classifier[1].in_features, 256),
+        nn.ReLU(),
+        nn.Linear(256, num_classes)
+    )
+    return model
+
+
+def is_ensemble_checkpoint(checkpoint: dict) -> bool:
+    return 'resnet' in checkpoint and 'efficientnet' in checkpoint
+
+
+def build_model_from_checkpoint(
+    checkpoint: dict,
+    num_classes: int,
+    model_file_name: str,
+    ensemble_weights: Optional[Sequence[float]] = None,
+    ensemble_parallel: bool = False,
+    ensemble_early_exit_threshold: Optional[float] = None,
+    ensemble_concurrent_calls: int = 1,
+    pet_type: Optional[str] = None,
+) -> nn.Module:
+    """
+    체크포인트 형식에 맞는 모델을 만들고 가중치를 로드한다.
+    - {'resnet': ..., 'efficientnet': ...} 형태면 앙상블 (ensemble_* 옵션은 이 경우에만 사용)
+    - 그 외에는 파일명으로 단일 모델 아키텍처를 판단
+    """
+    if is_ensemble_checkpoint(checkpoint):
+        resnet = build_resnet18(num_classes)
+        resnet.load_state_dict(checkpoint['resnet'])
+
+        efficientnet = build_efficientnet_b0(num_classes)
+        efficientnet.load_state_dict(checkpoint['efficientnet'])
+
+        return EnsembleModel(
+            models=[resnet, efficientnet],
+            weights=ensemble_weights,
+            parallel=ensemble_parallel,
+            early_exit_threshold=ensemble_early_exit_threshold,
+            names=["resnet", "efficientnet"],
+            pet_type=pet_type,
+            max_concurrent_calls=ensemble_concurrent_calls,
+        )
+
+    if "resnet" in model_file_name.lower():
+        model = build_resnet18(num_classes)
+    elif "efficientnet" in model_file_name.lower():
+        model = build_efficientnet_b0(num_classes)
+    else:
+        raise RuntimeError(f"모델 아키텍처를 판단할 수 없습니다: {model_file_name}")
+    model.load_state_dict(checkpoint)
+    return model
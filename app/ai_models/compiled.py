@@ -0,0 +1,73 @@
+import json
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import torch
+import torch.nn as nn
+
+# 아티팩트 안에 함께 저장되는 라벨/메타데이터 키
+# (TorchScript는 _extra_files, ONNX는 metadata_props 에 저장)
+LABELS_KEY = "labels.json"
+METADATA_KEY = "export.json"
+
+
+@dataclass
+class ExportMetadata:
+    format: str  # torchscript | onnx
+    quantize: str  # none | dynamic | static
+    channels_last: bool
+    source_checkpoint: str
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+def artifact_format(name: str) -> str:
+    """blob 이름의 확장자로 모델 파일 형식을 판단한다."""
+    lowered = name.lower()
+    if lowered.endswith(".onnx"):
+        return "onnx"
+    if lowered.endswith((".ts", ".torchscript")):
+        return "torchscript"
+    return "checkpoint"
+
+
+class OnnxModel(nn.Module):
+    """
+    onnxruntime 세션을 nn.Module처럼 호출할 수 있게 감싼다.
+    onnxruntime은 선택 의존성이라 ONNX 아티팩트를 사용할 때만 import 한다.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__()
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("ONNX 아티팩트를 사용하려면 onnxruntime 패키지가 필요합니다") from e
+
+        self._session = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+        self._input_name = self._session.get_inputs()[0].name
+
+    @property
+    def custom_metadata(self) -> Dict[str, str]:
+        return self._session.get_modelmeta().custom_metadata_map
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        outputs = self._session.run(None, {self._input_name: x.contiguous().numpy()})
+        return torch.from_numpy(outputs[0])
+
+
+def load_compiled_model(path: Union[str, Path], format: str) -> Tuple[nn.Module, List[str], ExportMetadata]:
+    """export 명령으로 만든 아티팩트와 그 안에 포함된 라벨/메타데이터를 로드한다."""
+    if format == "onnx":
+        model = OnnxModel(path)
+        extra_files = model.custom_metadata
+    else:
+        extra_files = {LABELS_KEY: "", METADATA_KEY: ""}
+        model = torch.jit.load(str(path), map_location=torch.device("cpu"), _extra_files=extra_files)
+
+    labels = json.loads(extra_files[LABELS_KEY])
+    metadata = ExportMetadata(**json.loads(extra_files[METADATA_KEY]))
+    model.eval()
+    return model, labels, metadata
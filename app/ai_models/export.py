@@ -0,0 +1,228 @@
+"""
+학습된 체크포인트를 CPU 추론용 아티팩트(TorchScript/ONNX)로 변환하는 오프라인 명령
+
+    python -m app.ai_models.export \\
+        --checkpoint dog_ensemble.pth --labels dog_labels.json \\
+        --output dog_ensemble_int8.ts --quantize dynamic --channels-last \\
+        --eval-dir ./samples/dog
+
+변환된 모델과 기존 eager 모델의 예측 차이를 --eval-dir 이미지로 비교하고,
+허용 범위를 넘으면 아티팩트를 저장하지 않고 종료 코드 1로 끝난다.
+보고서는 항상 {output}.report.json 으로 저장된다.
+서비스에서는 TORCH_DOG_ARTIFACT_NAME / TORCH_CAT_ARTIFACT_NAME 에 업로드한 아티팩트 이름을 지정하면 된다.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+import torch
+import torch.nn as nn
+
+from app.ai_models.architectures import build_model_from_checkpoint
+from app.ai_models.compiled import ExportMetadata, LABELS_KEY, METADATA_KEY, load_compiled_model
+from app.ai_models.preprocessing import default_preprocessor
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
+
+
+def list_images(image_dir: Path) -> List[Path]:
+    return sorted(p for p in image_dir.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def iter_batches(images: List[Path], batch_size: int) -> Iterator[torch.Tensor]:
+    """서비스와 같은 전처리기로 만든 배치. 배치 버퍼는 재사용되므로 다음 배치 전에 사용을 끝내야 한다."""
+    buffer = default_preprocessor.new_batch(batch_size)
+    for start in range(0, len(images), batch_size):
+        chunk = images[start:start + batch_size]
+        yield default_preprocessor.preprocess_batch([path.read_bytes() for path in chunk], out=buffer)
+
+
+def load_eager_model(checkpoint_path: Path, num_classes: int) -> nn.Module:
+    checkpoint = torch.load(checkpoint_path, map_location=torch.device("cpu"))
+    model = build_model_from_checkpoint(checkpoint, num_classes, checkpoint_path.name)
+    model.eval()
+    return model
+
+
+def quantize_static(model: nn.Module, calibration_images: List[Path], example: torch.Tensor) -> nn.Module:
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    prepared = prepare_fx(model, get_default_qconfig_mapping("x86"), example_inputs=(example,))
+    with torch.no_grad():
+        for batch in iter_batches(calibration_images, batch_size=16):
+            prepared(batch)
+    return convert_fx(prepared)
+
+
+def export_torchscript(
+    model: nn.Module,
+    output: Path,
+    labels: List[str],
+    metadata: ExportMetadata,
+    quantize: str,
+    calibration_images: List[Path],
+) -> None:
+    example = torch.zeros(1, 3, 224, 224)
+    if quantize == "dynamic":
+        model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    elif quantize == "static":
+        model = quantize_static(model, calibration_images, example)
+
+    if metadata.channels_last:
+        model = model.to(memory_format=torch.channels_last)
+        example = example.contiguous(memory_format=torch.channels_last)
+
+    with torch.no_grad():
+        scripted = torch.jit.freeze(torch.jit.trace(model, example))
+    torch.jit.save(
+        scripted,
+        str(output),
+        _extra_files={LABELS_KEY: json.dumps(labels), METADATA_KEY: metadata.to_json()},
+    )
+
+
+def export_onnx(model: nn.Module, output: Path, labels: List[str], metadata: ExportMetadata, quantize: str) -> None:
+    import onnx
+
+    example = torch.zeros(1, 3, 224, 224)
+    fp32_path = output.with_name(output.name + ".fp32")
+    try:
+        torch.onnx.export(
+            model,
+            (example,),
+            str(fp32_path),
+            input_names=["input"],
+            output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+            dynamo=False,
+        )
+
+        if quantize == "dynamic":
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(str(fp32_path), str(output), weight_type=QuantType.QInt8)
+        else:
+            fp32_path.replace(output)
+    finally:
+        fp32_path.unlink(missing_ok=True)
+
+    onnx_model = onnx.load(str(output))
+    for key, value in ((LABELS_KEY, json.dumps(labels)), (METADATA_KEY, metadata.to_json())):
+        entry = onnx_model.metadata_props.add()
+        entry.key, entry.value = key, value
+    onnx.save(onnx_model, str(output))
+
+
+def compare_models(reference: nn.Module, candidate: nn.Module, images: List[Path], channels_last: bool) -> dict:
+    """eager 모델 대비 변환된 모델의 예측 차이 보고서"""
+    top1_agree = 0
+    top3_overlap = 0.0
+    max_delta = 0.0
+    delta_sum = 0.0
+    reference_seconds = 0.0
+    candidate_seconds = 0.0
+
+    with torch.no_grad():
+        for batch in iter_batches(images, batch_size=16):
+            started = time.perf_counter()
+            reference_probs = torch.softmax(reference(batch), dim=1)
+            reference_seconds += time.perf_counter() - started
+
+            candidate_input = batch.contiguous(memory_format=torch.channels_last) if channels_last else batch
+            started = time.perf_counter()
+            candidate_probs = torch.softmax(candidate(candidate_input), dim=1)
+            candidate_seconds += time.perf_counter() - started
+
+            top1_agree += int((reference_probs.argmax(dim=1) == candidate_probs.argmax(dim=1)).sum())
+            k = min(3, reference_probs.shape[1])
+            for ref_top, cand_top in zip(reference_probs.topk(k, dim=1).indices, candidate_probs.topk(k, dim=1).indices):
+                top3_overlap += len(set(ref_top.tolist()) & set(cand_top.tolist())) / k
+            delta = (reference_probs - candidate_probs).abs()
+            max_delta = max(max_delta, float(delta.max()))
+            delta_sum += float(delta.max(dim=1).values.sum())
+
+    count = len(images)
+    return {
+        "images": count,
+        "top1_agreement": top1_agree / count,
+        "top3_overlap": top3_overlap / count,
+        "max_prob_delta": max_delta,
+        "mean_prob_delta": delta_sum / count,
+        "reference_ms_per_image": reference_seconds * 1000 / count,
+        "candidate_ms_per_image": candidate_seconds * 1000 / count,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="체크포인트를 CPU 추론용 아티팩트로 변환")
+    parser.add_argument("--checkpoint", type=Path, required=True, help="{'resnet', 'efficientnet'} 또는 단일 state_dict")
+    parser.add_argument("--labels", type=Path, required=True, help="라벨 JSON 파일")
+    parser.add_argument("--output", type=Path, required=True, help=".ts/.torchscript 또는 .onnx")
+    parser.add_argument("--quantize", choices=["none", "dynamic", "static"], default="none")
+    parser.add_argument("--channels-last", action="store_true")
+    parser.add_argument("--eval-dir", type=Path, required=True, help="정확도 비교(및 static 양자화 보정)에 사용할 이미지 폴더")
+    parser.add_argument("--max-top1-disagreement", type=float, default=0.01)
+    parser.add_argument("--max-prob-delta", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    format = "onnx" if args.output.suffix.lower() == ".onnx" else "torchscript"
+    if format == "onnx" and (args.quantize == "static" or args.channels_last):
+        parser.error("ONNX 변환은 --quantize dynamic 만 지원하며 --channels-last 는 사용할 수 없습니다")
+
+    labels = json.loads(args.labels.read_text())
+    images = list_images(args.eval_dir)
+    if not images:
+        parser.error(f"평가 이미지가 없습니다: {args.eval_dir}")
+
+    model = load_eager_model(args.checkpoint, len(labels))
+    metadata = ExportMetadata(
+        format=format,
+        quantize=args.quantize,
+        channels_last=args.channels_last,
+        source_checkpoint=args.checkpoint.name,
+    )
+
+    # 검증을 통과하기 전까지는 임시 파일에만 쓴다
+    fd, tmp_name = tempfile.mkstemp(dir=args.output.parent, suffix=args.output.suffix)
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        if format == "onnx":
+            export_onnx(model, tmp_path, labels, metadata, args.quantize)
+        else:
+            # 양자화/channels_last 변환이 원본 모듈을 바꿀 수 있어 비교용 모델과 별도로 로드
+            export_torchscript(load_eager_model(args.checkpoint, len(labels)), tmp_path, labels, metadata, args.quantize, images)
+
+        candidate, _, _ = load_compiled_model(tmp_path, format)
+        report = compare_models(model, candidate, images, args.channels_last)
+        report["passed"] = (
+            1 - report["top1_agreement"] <= args.max_top1_disagreement
+            and report["max_prob_delta"] <= args.max_prob_delta
+        )
+        report["metadata"] = json.loads(metadata.to_json())
+
+        Path(f"{args.output}.report.json").write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+        if not report["passed"]:
+            logger.error("정확도 차이가 허용 범위를 넘어 아티팩트를 저장하지 않았습니다")
+            return 1
+        tmp_path.replace(args.output)
+        logger.info(f"Exported {args.output}")
+        return 0
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
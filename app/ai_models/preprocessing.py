@@ -0,0 +1,70 @@
+from io import BytesIO
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from PIL import Image
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+class ImagePreprocessor:
+    """
+    Resize((224, 224)) -> ToTensor() -> Normalize(mean, std) 와 같은 결과를 내는 전처리기
+
+    - JPEG는 draft 모드로 디코딩해서 큰 사진도 축소된 해상도로 바로 읽는다
+    - 리사이즈는 한 번만 하고, uint8 -> float 변환과 정규화를 한 번의 연산(addcmul)으로
+      미리 할당된 출력 텐서에 바로 쓴다
+    - 상태가 없어 여러 스레드에서 같은 인스턴스를 공유해도 된다
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int] = (224, 224),
+        mean: Sequence[float] = IMAGENET_MEAN,
+        std: Sequence[float] = IMAGENET_STD,
+        draft_factor: int = 2,
+    ):
+        self.size = size  # (height, width)
+        # (x / 255 - mean) / std == x * scale + bias
+        std_tensor = torch.tensor(std, dtype=torch.float32).view(3, 1, 1)
+        mean_tensor = torch.tensor(mean, dtype=torch.float32).view(3, 1, 1)
+        self._scale = 1.0 / (255.0 * std_tensor)
+        self._bias = -mean_tensor / std_tensor
+        # draft 디코딩 해상도를 출력 크기보다 여유 있게 둬서 리사이즈 품질을 유지
+        self._draft_size = (size[1] * draft_factor, size[0] * draft_factor)
+
+    def decode(self, data: bytes) -> Image.Image:
+        """이미지 바이트를 RGB 이미지로 디코딩 (JPEG는 필요한 만큼만 축소 디코딩)"""
+        image = Image.open(BytesIO(data))
+        if image.format == "JPEG":
+            image.draft("RGB", self._draft_size)
+        return image.convert("RGB")
+
+    def new_batch(self, batch_size: int) -> torch.Tensor:
+        return torch.empty((batch_size, 3, *self.size), dtype=torch.float32)
+
+    def preprocess_into(self, data: bytes, out: torch.Tensor) -> torch.Tensor:
+        """디코딩 + 리사이즈 + 정규화 결과를 (3, H, W) 크기의 out 텐서에 쓴다."""
+        image = self.decode(data).resize((self.size[1], self.size[0]), Image.BILINEAR)
+        # 224x224 uint8 한 장만 복사하고 (C, H, W) 는 view로 바꾼다
+        pixels = torch.from_numpy(np.array(image)).permute(2, 0, 1)
+        return torch.addcmul(self._bias, pixels, self._scale, out=out)
+
+    def preprocess(self, data: bytes) -> torch.Tensor:
+        return self.preprocess_into(data, torch.empty((3, *self.size), dtype=torch.float32))
+
+    def preprocess_batch(self, images: Sequence[bytes], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """여러 이미지를 하나의 (N, 3, H, W) 배치 버퍼에 바로 쓴다. out을 넘기면 재사용한다."""
+        if out is None:
+            out = self.new_batch(len(images))
+        elif out.shape[0] < len(images):
+            raise ValueError(f"배치 버퍼가 작습니다: {out.shape[0]} < {len(images)}")
+        for index, data in enumerate(images):
+            self.preprocess_into(data, out[index])
+        return out[:len(images)]
+
+
+# 모델 입력(224x224, ImageNet 정규화)용 공용 전처리기
+default_preprocessor = ImagePreprocessor()
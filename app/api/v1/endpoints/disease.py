@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
 from app.db.session import get_db
-from app.schemas.disease import DiseaseSchema, DiseaseCreate, HospitalSchema, InsuranceSchema
+from app.schemas.disease import DiseaseSchema, DiseaseCreate, HospitalSchema, InsuranceSchema, CatalogImportResult
+from app.crud import catalog_io
 from app.crud import disease as disease_crud
 from app.crud import hospital as hospital_crud
 from app.crud import insurance as insurance_crud
@@ -11,35 +13,114 @@ from loguru import logger
 
 router = APIRouter()
 
-@router.get("/", response_model=List[DiseaseSchema])
+# 본문을 직접 읽기 때문에 문서에 보일 요청 형식을 따로 적어준다
+IMPORT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-ndjson": {"schema": {"type": "string", "description": "한 줄에 DiseaseCreate JSON 하나"}},
+            "text/csv": {"schema": {"type": "string", "description": "name,type,details,hospitals,insurances (자식 목록은 JSON 배열)"}},
+        },
+    }
+}
+
+def include_relations(
+    include: Optional[str] = Query(
+        None,
+        description="함께 받을 관계 (details,hospitals,insurances 중 쉼표로 구분). 생략하면 모두, 빈 값이면 질병 정보만"
+    )
+) -> Tuple[str, ...]:
+    if include is None:
+        return disease_crud.DISEASE_RELATIONS
+    relations = tuple(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+    unknown = [name for name in relations if name not in disease_crud.DISEASE_RELATIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 include 값: {', '.join(unknown)}")
+    return relations
+
+# 요청하지 않은 관계는 응답에서 뺀다 (response_model_exclude_unset)
+@router.get("/", response_model=List[DiseaseSchema], response_model_exclude_unset=True)
 async def read_diseases(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값 (있으면 skip 무시)"),
+    include: Tuple[str, ...] = Depends(include_relations),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info(f"Fetching diseases with skip={skip}, limit={limit}, cursor={cursor}, include={include}")
+    try:
+        page = await disease_crud.get_diseases(db, skip=skip, limit=limit, cursor=cursor, include=include)
+    except ValueError as e:  # 잘못된 cursor
+        raise HTTPException(status_code=400, detail=str(e))
+    # 다음 페이지 토큰은 헤더로 전달 (응답 본문 형식은 그대로 유지)
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return [disease_crud.to_disease_schema(disease, include) for disease in page.items]
+
+# /{disease_id} 보다 먼저 선언해야 export 가 id 로 해석되지 않는다
+@router.post("/import", response_model=CatalogImportResult, openapi_extra=IMPORT_REQUEST_BODY)
+async def import_diseases(
+    request: Request,
+    response: Response,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    batch_size: Optional[int] = Query(None, ge=1, description="트랜잭션 하나에 저장할 질병 수"),
+    mode: str = Query("skip", pattern="^(skip|replace)$", description="이미 있는 type 의 레코드를 건너뛸지(skip) 기존 질병을 바꿀지(replace)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    질병(상세/병원/보험 포함)을 NDJSON 또는 CSV 로 한 번에 등록한다.
+    본문을 받는 대로 검증해서 batch_size 개씩 저장하고, 잘못된 레코드는 줄 번호와 함께 errors 로 알려준다.
+    도중에 멈추면 500 과 함께 그때까지의 결과(aborted=true)를 돌려준다.
+    """
+    try:
+        result = await catalog_io.import_catalog(db, catalog_io.iter_lines(request.stream()), format, batch_size, mode)
+    except Exception as e:
+        logger.error(f"Disease import failed: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="질병 정보 가져오기 중 오류가 발생했습니다"
+        )
+    if result.aborted:
+        # 이미 저장한 배치는 남아 있으므로 어디까지 저장됐는지 알 수 있게 결과를 그대로 돌려준다
+        response.status_code = 500
+    logger.info(f"Imported diseases: {result.imported} imported, {result.skipped} skipped, {result.failed} failed")
+    return result
+
+@router.get("/export")
+async def export_diseases(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
     db: AsyncSession = Depends(get_db)
 ):
-    logger.info(f"Fetching diseases with skip={skip}, limit={limit}")
-    diseases = await disease_crud.get_diseases(db, skip=skip, limit=limit)
-    return [DiseaseSchema.model_validate(disease) for disease in diseases]
+    """전체 질병 정보를 /import 로 다시 넣을 수 있는 형식으로 스트리밍한다."""
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    return StreamingResponse(
+        catalog_io.export_catalog(db, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="diseases.{format}"'}
+    )
 
-@router.get("/{disease_id}", response_model=DiseaseSchema)
+@router.get("/{disease_id}", response_model=DiseaseSchema, response_model_exclude_unset=True)
 async def read_disease(
     disease_id: UUID,
+    include: Tuple[str, ...] = Depends(include_relations),
     db: AsyncSession = Depends(get_db)
 ):
-    disease = await disease_crud.get_disease(db, disease_id)
+    disease = await disease_crud.get_disease_cached(db, disease_id, include)
     if not disease:
         raise HTTPException(status_code=404, detail="Disease not found")
-    return DiseaseSchema.model_validate(disease)
+    return disease
 
-@router.get("/type/{disease_type}", response_model=DiseaseSchema)
+@router.get("/type/{disease_type}", response_model=DiseaseSchema, response_model_exclude_unset=True)
 async def read_disease_by_type(
     disease_type: str,
+    include: Tuple[str, ...] = Depends(include_relations),
     db: AsyncSession = Depends(get_db)
 ):
-    disease = await disease_crud.get_disease_by_type(db, disease_type)
+    disease = await disease_crud.get_disease_by_type_cached(db, disease_type, include)
     if disease is None:
         raise HTTPException(status_code=404, detail="Disease not found")
-    return DiseaseSchema.model_validate(disease)
+    return disease
 
 @router.post("/", response_model=DiseaseSchema)
 async def create_disease(
@@ -82,7 +163,7 @@ async def delete_disease(
 ):
     try:
         deleted_disease = await disease_crud.delete_disease(db, disease_id)
-        if deleted_disease is None:
+        if not deleted_disease:
             raise HTTPException(status_code=404, detail="Disease not found")
         return {"message": "Disease deleted successfully"}
     except HTTPException:
@@ -99,13 +180,11 @@ async def read_hospitals_by_disease(
     disease_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
-    hospitals = await hospital_crud.get_hospitals_by_disease(db, disease_id)
-    return [HospitalSchema.model_validate(hospital) for hospital in hospitals]
+    return await hospital_crud.get_hospitals_by_disease_cached(db, disease_id)
 
 @router.get("/{disease_id}/insurances", response_model=List[InsuranceSchema])
 async def read_insurances_by_disease(
     disease_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
-    insurances = await insurance_crud.get_insurances_by_disease(db, disease_id)
-    return [InsuranceSchema.model_validate(insurance) for insurance in insurances]
\ No newline at end of file
+    return await insurance_crud.get_insurances_by_disease_cached(db, disease_id)
\ No newline at end of file
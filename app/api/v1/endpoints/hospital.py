@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.db.session import get_db
 from app.schemas.hospital import HospitalSchema, HospitalCreate, HospitalUpdate
@@ -11,12 +11,20 @@ router = APIRouter()
 
 @router.get("/", response_model=List[HospitalSchema])
 async def read_hospitals(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값 (있으면 skip 무시)"),
     db: AsyncSession = Depends(get_db)
 ):
-    hospitals = await hospital_crud.get_hospitals(db, skip=skip, limit=limit)
-    return [HospitalSchema.model_validate(hospital) for hospital in hospitals]
+    try:
+        page = await hospital_crud.get_hospitals(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:  # 잘못된 cursor
+        raise HTTPException(status_code=400, detail=str(e))
+    # 다음 페이지 토큰은 헤더로 전달 (응답 본문 형식은 그대로 유지)
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return [HospitalSchema.model_validate(hospital) for hospital in page.items]
 
 @router.get("/{hospital_id}", response_model=HospitalSchema)
 async def read_hospital(
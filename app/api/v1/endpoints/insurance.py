@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.db.session import get_db
 from app.schemas.insurance import InsuranceSchema, InsuranceCreate, InsuranceUpdate
@@ -11,12 +11,20 @@ router = APIRouter()
 
 @router.get("/", response_model=List[InsuranceSchema])
 async def read_insurances(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값 (있으면 skip 무시)"),
     db: AsyncSession = Depends(get_db)
 ):
-    insurances = await insurance_crud.get_insurances(db, skip=skip, limit=limit)
-    return [InsuranceSchema.model_validate(insurance) for insurance in insurances]
+    try:
+        page = await insurance_crud.get_insurances(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:  # 잘못된 cursor
+        raise HTTPException(status_code=400, detail=str(e))
+    # 다음 페이지 토큰은 헤더로 전달 (응답 본문 형식은 그대로 유지)
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return [InsuranceSchema.model_validate(insurance) for insurance in page.items]
 
 @router.get("/{insurance_id}", response_model=InsuranceSchema)
 async def read_insurance(
@@ -42,7 +50,7 @@ async def create_insurance(
     insurance: InsuranceCreate,
     db: AsyncSession = Depends(get_db)
 ):
-    disease = await disease_crud.get_disease(db, disease_id)
+    disease = await disease_crud.get_disease(db, disease_id, include=())  # 존재 여부만 확인
     if not disease:
         raise HTTPException(status_code=404, detail="Disease not found")
     return await insurance_crud.create_insurance(db=db, insurance=insurance, disease_id=disease_id)
@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from app.core.metrics import metrics
+
+router = APIRouter()
+
+@router.get("/")
+async def read_metrics():
+    """프로세스 내 지표(큐 길이, 배치 크기, 캐시 적중률 등) 스냅샷"""
+    return metrics.snapshot()
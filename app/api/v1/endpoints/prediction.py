@@ -1,7 +1,25 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.predict import PredictionResult, ImagePredictionRequest
-from app.services.predict_service import predict_pet_disease_torch, predict_pet_disease_custom_vision
-import requests
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.schemas.predict import (
+    PredictionResult,
+    ImagePredictionRequest,
+    BatchPredictionRequest,
+    BatchPredictionItemResult,
+    CombinedPredictionResult,
+    EnrichedPredictionResult,
+)
+from app.schemas.prediction_job import PredictionJobCreate, PredictionJobSchema
+from app.services.prediction_jobs import prediction_job_queue
+from app.services.prediction_enrichment import predict_and_enrich
+from app.services.prediction_router import prediction_router
+from app.services.predict_service import (
+    predict_pet_disease_torch,
+    predict_pet_disease_custom_vision,
+    predict_pet_disease_both,
+    predict_batch,
+    PredictFn,
+)
 from typing import List
 
 router = APIRouter()
@@ -11,10 +29,10 @@ async def predict_image_custom_vision(request: ImagePredictionRequest):
     try:
         predictions = await predict_pet_disease_custom_vision(request.image_url, request.pet_type)
         return predictions
+    except HTTPException:
+        raise
     except ValueError as e:  # pet_type 오류 처리
         raise HTTPException(status_code=400, detail=str(e))
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=400, detail=f"Image download failed: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
@@ -28,9 +46,133 @@ async def predict_image_torch(request: ImagePredictionRequest):
     try:
         predictions = await predict_pet_disease_torch(request.image_url, request.pet_type)
         return predictions
+    except HTTPException:
+        raise
     except ValueError as e:  # pet_type 유효성 검사
         raise HTTPException(status_code=400, detail=str(e))
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=400, detail=f"Image download failed: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@router.post("/both/predict", response_model=CombinedPredictionResult)
+async def predict_image_both(request: ImagePredictionRequest):
+    """
+    torch 모델과 Custom Vision 결과를 한 번에 반환한다. 이미지는 한 번만 내려받는다.
+    """
+    try:
+        return await predict_pet_disease_both(request.image_url, request.pet_type)
+    except HTTPException:
+        raise
+    except ValueError as e:  # pet_type 유효성 검사
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@router.post("/auto/predict", response_model=List[PredictionResult])
+async def predict_image_auto(request: ImagePredictionRequest, response: Response):
+    """
+    최근 지연 시간/오류율을 보고 torch 또는 Custom Vision 중 빠르고 정상인 백엔드로 예측한다.
+    응답이 늦으면 다른 백엔드로 hedge, 실패하면 fallback 하며 실제 사용한 백엔드는 X-Prediction-Backend 헤더로 알려준다.
+    """
+    try:
+        backend, predictions = await prediction_router.predict(request.image_url, request.pet_type)
+    except HTTPException:
+        raise
+    except ValueError as e:  # pet_type 유효성 검사
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    response.headers["X-Prediction-Backend"] = backend
+    return predictions
+
+@router.post("/enriched", response_model=List[EnrichedPredictionResult])
+async def predict_image_enriched(
+    request: ImagePredictionRequest,
+    response: Response,
+    backend: str = Query("torch", pattern="^(torch|vision|auto)$", description="torch | vision | auto"),
+):
+    """
+    예측 결과 상위 k개에 질병 상세/병원/보험 정보를 붙여서 한 번에 반환한다.
+    (결과 화면에서 질병마다 /diseases/type/{type}, /hospitals, /insurances 를 따로 부르지 않아도 됨)
+    DB 연결은 추론 내내 잡지 않고 질병 조회에만 잠깐 쓴다.
+    """
+    async def predict(image_url: str, pet_type: str) -> List[PredictionResult]:
+        if backend == "auto":
+            used, predictions = await prediction_router.predict(image_url, pet_type)
+            response.headers["X-Prediction-Backend"] = used
+            return predictions
+        if backend == "vision":
+            return await predict_pet_disease_custom_vision(image_url, pet_type)
+        return await predict_pet_disease_torch(image_url, pet_type)
+
+    try:
+        # vision 태그는 torch 라벨과 달라서 미리 조회해도 맞지 않는다
+        return await predict_and_enrich(request.image_url, request.pet_type, predict, prefetch=backend != "vision")
+    except HTTPException:
+        raise
+    except ValueError as e:  # pet_type 유효성 검사
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+async def _batch_response(request: BatchPredictionRequest, predict: PredictFn, stream: bool):
+    if len(request.items) > settings.PREDICTION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.PREDICTION_BATCH_MAX_ITEMS}개까지 요청할 수 있습니다"
+        )
+
+    results = predict_batch(request.items, predict)
+    if stream:
+        # 끝나는 순서대로 한 줄에 하나씩 (index 로 요청 항목과 매칭)
+        async def ndjson():
+            try:
+                async for result in results:
+                    yield result.model_dump_json() + "\n"
+            finally:
+                # 클라이언트 연결이 끊기면 남은 예측 작업도 취소
+                await results.aclose()
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    collected = [result async for result in results]
+    return sorted(collected, key=lambda result: result.index)
+
+@router.post("/torch/batch", response_model=List[BatchPredictionItemResult])
+async def predict_images_torch_batch(
+    request: BatchPredictionRequest,
+    stream: bool = Query(False, description="true면 완료되는 순서대로 NDJSON 스트리밍")
+):
+    """
+    여러 (image_url, pet_type) 항목을 한 번에 예측한다.
+    항목별로 predictions 또는 status_code/error 가 채워지며, 일부 실패가 전체 요청을 실패시키지 않는다.
+    """
+    return await _batch_response(request, predict_pet_disease_torch, stream)
+
+@router.post("/vision/batch", response_model=List[BatchPredictionItemResult])
+async def predict_images_custom_vision_batch(
+    request: BatchPredictionRequest,
+    stream: bool = Query(False, description="true면 완료되는 순서대로 NDJSON 스트리밍")
+):
+    return await _batch_response(request, predict_pet_disease_custom_vision, stream)
+
+@router.post("/jobs", response_model=PredictionJobSchema, status_code=202)
+async def create_prediction_job(request: PredictionJobCreate):
+    """
+    예측 작업을 큐에 넣고 바로 작업 id를 반환한다.
+    결과는 GET /prediction/jobs/{job_id} 로 조회 (wait 로 long polling 가능)
+    """
+    try:
+        return await prediction_job_queue.submit(request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=PredictionJobSchema)
+async def get_prediction_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="작업이 끝날 때까지 최대 wait 초 대기")
+):
+    job = await prediction_job_queue.get(job_id, wait=min(wait, settings.PREDICTION_JOB_MAX_WAIT_SECONDS))
+    if job is None:
+        raise HTTPException(status_code=404, detail="예측 작업을 찾을 수 없습니다 (만료되었거나 존재하지 않음)")
+    return job
@@ -1,50 +1,67 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile
-from pydantic import BaseModel
-from azure.storage.blob import BlobServiceClient
+from fastapi import APIRouter, HTTPException, Request
 from app.core.config import settings
 from app.schemas.upload import Upload
+from app.services.image_derivatives import upload_pipeline
+from app.services.multipart_stream import MultipartFileStream
+from app.services.upload_storage import upload_storage
+from loguru import logger
 import os
+import uuid
 
 # APIRouter 생성
 router = APIRouter()
 
-@router.post("/", response_model=Upload)
-async def upload(file: UploadFile):
-    # Azure Blob 서비스 클라이언트 생성
-    blob_service_client = BlobServiceClient.from_connection_string(settings.AZURE_CONNECTION_STRING)
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif"}
 
-    # Blob 컨테이너 클라이언트 생성
-    container_client = blob_service_client.get_container_client(settings.STORAGE_NAME)
+# 본문을 직접 읽기 때문에 문서에 보일 요청 형식을 따로 적어준다
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+@router.post("/", response_model=Upload, openapi_extra=UPLOAD_REQUEST_BODY)
+async def upload(request: Request):
+    # 파일을 메모리에 모으지 않고 받는 대로 스토리지에 올린다 (크기 제한도 받는 중에 확인)
+    file = await MultipartFileStream(request, "file", max_bytes=settings.UPLOAD_MAX_BYTES).open()
+
+    # 파일 형식 검증 (본문을 받기 전에 확인)
+    original_file_name = file.filename
+    file_ext = os.path.splitext(original_file_name)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="File type not allowed")
 
     try:
-    # 파일 크기 검증 (예: 10MB 제한)
-        MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-        file_size = 0
-        contents = await file.read()
-        file_size = len(contents)
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File size exceeds maximum limit")
-        
-        # 파일 형식 검증
-        ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif"}
-        original_file_name = file.filename
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in ALLOWED_EXTENSIONS:
-            raise HTTPException(status_code=400, detail="File type not allowed")
-        
+        if settings.UPLOAD_DERIVATIVES_ENABLED or settings.UPLOAD_DEDUP_ENABLED:
+            # 받는 동안 내용 해시를 계산하고 디코딩해서 실제 이미지인지 확인한 뒤 모델용 축소본/썸네일도 함께 저장.
+            # 중복 제거를 켜면 이미 있는 이미지는 저장을 건너뛴다 (대신 다 받은 뒤에 올림)
+            stored = await upload_pipeline.save(file_ext, file.iter_chunks(), content_type=file.content_type)
+            return {
+                "filename": original_file_name,
+                "url": stored.url,
+                "model_url": stored.model_url,
+                "thumbnail_url": stored.thumbnail_url,
+                "content_hash": stored.content_hash,
+            }
         # 안전한 파일 이름 생성
-        import uuid
         file_name = f"{uuid.uuid4()}{file_ext}"
-
-        # Azure Blob Storage에 파일 업로드
-        blob_client = container_client.get_blob_client(blob=file_name)
-        blob_client.upload_blob(contents)
-
-        # 업로드된 Blob의 URL 생성
-        blob_url = f"https://{blob_service_client.account_name}.blob.core.windows.net/{settings.STORAGE_NAME}/{file_name}"
-
-        # 파일 업로드 성공 후 JSON 응답 반환
-        return {"filename": original_file_name, "url": blob_url}
-
+        blob_url = await upload_storage.save(file_name, file.iter_chunks(), content_type=file.content_type)
+    except HTTPException:
+        raise
+    except ValueError as e:  # 이미지 디코딩 실패
+        raise HTTPException(status_code=400, detail=f"Invalid image file: {str(e)}")
     except Exception as e:
+        logger.error(f"Upload failed ({original_file_name}): {str(e)}")
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+    # 파일 업로드 성공 후 JSON 응답 반환
+    return {"filename": original_file_name, "url": blob_url}
@@ -4,6 +4,7 @@ from app.api.v1.endpoints import prediction
 from app.api.v1.endpoints import disease
 from app.api.v1.endpoints import hospital
 from app.api.v1.endpoints import insurance
+from app.api.v1.endpoints import metrics
 
 router = APIRouter()
 
@@ -36,3 +37,9 @@ router.include_router(
     prefix="/insurances",
     tags=["insurances"]
 )
+
+router.include_router(
+    metrics.router,
+    prefix="/metrics",
+    tags=["metrics"]
+)
@@ -1,4 +1,5 @@
 # core/config.py
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
@@ -15,6 +16,15 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     DATABASE_URL: str
 
+    # DB 연결 풀 설정 (pooled | null)
+    DB_POOL_MODE: str = "pooled"
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0  # 연결을 기다리는 최대 시간, 넘으면 503
+    DB_POOL_RECYCLE_SECONDS: int = 30 * 60
+    DB_POOL_PRE_PING: bool = False  # 꺼내 쓸 때마다 SELECT 1 (끊긴 연결이 잦은 환경에서만)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # asyncpg, 0이면 사용 안 함
+
     AZURE_CONNECTION_STRING: str
     STORAGE_NAME: str
 
@@ -34,7 +44,121 @@ class Settings(BaseSettings):
     TORCH_CAT_MODEL_NAME: str
     DOG_LABELS: str
     CAT_LABELS: str
-    
+
+    # 모델 레지스트리 설정 (체크포인트를 교체할 때 버전을 올리면 새로 로드됨)
+    TORCH_DOG_MODEL_VERSION: str = "latest"
+    TORCH_CAT_MODEL_VERSION: str = "latest"
+    # app.ai_models.export 로 만든 아티팩트(.ts/.onnx)를 지정하면 체크포인트 대신 사용
+    TORCH_DOG_ARTIFACT_NAME: Optional[str] = None
+    TORCH_CAT_ARTIFACT_NAME: Optional[str] = None
+    MODEL_WARMUP_PET_TYPES: List[str] = ["dog", "cat"]
+
+    # 앙상블(resnet + efficientnet) 실행 설정
+    ENSEMBLE_PARALLEL: bool = False  # 멤버 모델을 동시에 실행 (intra-op 스레드를 멤버끼리 나눠 씀)
+    ENSEMBLE_WEIGHTS: Optional[List[float]] = None  # [resnet, efficientnet], 미지정 시 단순 평균
+    ENSEMBLE_EARLY_EXIT_THRESHOLD: Optional[float] = None  # resnet 확률이 이 값 이상이면 efficientnet 생략
+
+    # 체크포인트 로컬 디스크 캐시 설정
+    CHECKPOINT_CACHE_DIR: str = ".cache/checkpoints"
+    CHECKPOINT_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    CHECKPOINT_CACHE_REVALIDATE_SECONDS: int = 3600
+    CHECKPOINT_CACHE_EVICT_GRACE_SECONDS: int = 600  # 이 시간 안에 쓰였거나 만들어진 객체는 지우지 않음 (다른 워커가 사용 중일 수 있음)
+    MODEL_BLOB_LOCAL_DIR: Optional[str] = None  # 지정 시 Azure 대신 로컬 디렉토리에서 모델을 읽음
+
+    # 마이크로 배칭 설정
+    INFERENCE_MAX_BATCH_SIZE: int = 16
+    INFERENCE_MAX_WAIT_MS: float = 8.0
+
+    # 추론 전용 스레드 풀 설정
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_TORCH_THREADS: int = 0  # 0이면 torch 기본값 사용
+    INFERENCE_MAX_PENDING: int = 64
+    INFERENCE_RETRY_AFTER_SECONDS: int = 1
+
+    # 이미지 다운로드 설정
+    IMAGE_FETCH_MAX_CONNECTIONS: int = 100
+    IMAGE_FETCH_MAX_CONNECTIONS_PER_HOST: int = 20
+    IMAGE_FETCH_CONNECT_TIMEOUT: float = 3.0
+    IMAGE_FETCH_READ_TIMEOUT: float = 10.0
+    IMAGE_FETCH_MAX_BYTES: int = 20 * 1024 * 1024
+    # 받은 이미지를 백엔드/요청 간에 공유하는 버퍼
+    IMAGE_BUFFER_MAX_BYTES: int = 128 * 1024 * 1024
+    IMAGE_BUFFER_TTL_SECONDS: float = 60.0
+
+    # 이미지 업로드 설정 (azure | filesystem)
+    UPLOAD_BACKEND: str = "azure"
+    UPLOAD_LOCAL_DIR: str = "uploads"
+    UPLOAD_LOCAL_BASE_URL: str = "http://localhost:8000/uploads"  # filesystem 일 때 /uploads 로 서빙
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_BLOCK_SIZE: int = 4 * 1024 * 1024  # Blob 블록 하나 크기
+    UPLOAD_MAX_CONCURRENCY: int = 2  # 업로드 하나가 동시에 올리는 블록 수
+    # 업로드 시 디코딩 검증 + 모델용 축소본/썸네일 생성 (예측 시 축소본을 받아서 사용)
+    UPLOAD_DERIVATIVES_ENABLED: bool = True
+    UPLOAD_MODEL_DERIVATIVE_SIZE: int = 256  # 짧은 변 기준
+    UPLOAD_THUMBNAIL_SIZE: int = 128  # 긴 변 기준
+    UPLOAD_SPOOL_MEMORY_BYTES: int = 1024 * 1024  # 이보다 큰 원본은 검증하는 동안 임시 파일에 보관
+    # 같은 이미지는 한 번만 저장 (blob 이름을 내용 해시로 정함).
+    # 켜면 해시가 나올 때까지 업로드 전체를 spool 에 받은 뒤 올리므로 받는 동안 블록을 올리는 스트리밍 업로드는 쓰지 않는다.
+    # 끄면(기본) 받는 대로 올리고 해시/검증은 동시에 하지만, 같은 이미지도 매번 새로 저장하고
+    # URL 로 내용 해시를 알 수 없어 예측 캐시는 이미지를 내려받은 뒤에야 확인한다
+    UPLOAD_DEDUP_ENABLED: bool = False
+    UPLOAD_DEDUP_INDEX_SIZE: int = 10000  # 최근 업로드의 해시 -> URL 인덱스 크기
+
+    # 예측 결과 캐시 설정 (memory | redis | none)
+    PREDICTION_CACHE_BACKEND: str = "memory"
+    PREDICTION_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    PREDICTION_CACHE_MAX_ENTRIES: int = 10000
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # 질병 카탈로그(질병/병원/보험) 읽기 캐시 설정
+    CATALOG_CACHE_ENABLED: bool = True
+    CATALOG_CACHE_TTL_SECONDS: int = 300  # 무효화 메시지를 놓쳤을 때 최대로 오래된 값을 볼 수 있는 시간
+    CATALOG_CACHE_MAX_ENTRIES: int = 2000
+    # 워커 간 무효화 채널 (local: 같은 프로세스 안에서만 | redis: REDIS_URL 의 pub/sub)
+    CATALOG_CACHE_INVALIDATION: str = "local"
+    CATALOG_CACHE_CHANNEL: str = "catalog-cache-invalidation"
+
+    # 카탈로그 대량 가져오기/내보내기 설정
+    CATALOG_IMPORT_BATCH_SIZE: int = 500  # 트랜잭션 하나에 저장할 질병 수
+    CATALOG_IMPORT_MAX_ERRORS: int = 1000  # 응답에 담을 레코드별 오류 최대 개수
+    CATALOG_EXPORT_BATCH_SIZE: int = 500  # 한 번에 읽을 질병 수
+
+    # Custom Vision 호출 설정
+    CUSTOM_VISION_MAX_CONCURRENCY: int = 8
+    CUSTOM_VISION_TIMEOUT_SECONDS: float = 10.0
+    CUSTOM_VISION_MAX_RETRIES: int = 2
+    CUSTOM_VISION_BACKOFF_BASE_SECONDS: float = 0.2
+    CUSTOM_VISION_BACKOFF_MAX_SECONDS: float = 2.0
+    CUSTOM_VISION_BREAKER_FAILURE_THRESHOLD: int = 5
+    CUSTOM_VISION_BREAKER_RESET_SECONDS: float = 30.0
+    # 업로드 스토리지에 있는 이미지는 바이트 대신 URL로 분류 요청 (Custom Vision이 직접 가져감)
+    CUSTOM_VISION_USE_IMAGE_URL: bool = True
+
+    # 자동 라우팅(/prediction/auto) 설정
+    ROUTING_BACKENDS: List[str] = ["torch", "vision"]  # 지연 시간 기록이 부족할 때의 우선 순서
+    ROUTING_LATENCY_BUDGET_MS: float = 5000.0
+    ROUTING_HEDGE_QUANTILE: float = 0.95
+    ROUTING_DEFAULT_HEDGE_MS: float = 1500.0
+    ROUTING_MIN_SAMPLES: int = 20
+    ROUTING_LATENCY_WINDOW: int = 200
+    ROUTING_ERROR_WINDOW: int = 20
+    ROUTING_MAX_ERROR_RATE: float = 0.5
+    ROUTING_UNHEALTHY_COOLDOWN_SECONDS: float = 30.0
+
+    # 배치 예측 API 설정
+    PREDICTION_BATCH_MAX_ITEMS: int = 500
+    # 모든 배치 요청을 합쳐 동시에 처리하는 이미지 수. INFERENCE_MAX_PENDING 과의 차이만큼이 단건 요청 몫으로 남는다
+    PREDICTION_BATCH_CONCURRENCY: int = 32
+
+    # 비동기 예측 작업 설정 (저장소: memory | sqlite)
+    PREDICTION_JOB_STORE: str = "memory"
+    PREDICTION_JOB_SQLITE_PATH: str = ".cache/prediction_jobs.sqlite3"
+    PREDICTION_JOB_WORKERS: int = 4
+    PREDICTION_JOB_MAX_QUEUED: int = 1000
+    PREDICTION_JOB_RESULT_TTL_SECONDS: int = 60 * 60
+    PREDICTION_JOB_LEASE_SECONDS: float = 30.0  # 워커가 죽은 뒤 다른 워커가 작업을 가져가기까지의 시간
+    PREDICTION_JOB_MAX_WAIT_SECONDS: float = 30.0  # long polling 최대 대기 시간
+
     @property
     def ASYNC_DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
@@ -0,0 +1,129 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Union
+
+
+def _metric_name(name: str, labels: Dict[str, str]) -> str:
+    if not labels:
+        return name
+    label_str = ",".join(f"{key}={value}" for key, value in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> int:
+        return self._value
+
+
+class Gauge:
+    def __init__(self):
+        self._value: float = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """
+    전체 count/sum/max와 최근 window개 관측값(분위수 계산용)을 보관하는 간단한 히스토그램
+    """
+
+    def __init__(self, window: int = 1024):
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._recent.append(value)
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            values = sorted(self._recent)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self._count,
+            "sum": self._sum,
+            "avg": self._sum / self._count if self._count else None,
+            "max": self._max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class MetricsRegistry:
+    """프로세스 내 지표 저장소. /api/v1/metrics 에서 JSON으로 노출된다."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, labels: Dict[str, str]):
+        key = _metric_name(name, labels)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, cls())
+        if not isinstance(metric, cls):
+            raise TypeError(f"{key} is already registered as {type(metric).__name__}")
+        return metric
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        return self._get_or_create(Counter, name, labels)
+
+    def gauge(self, name: str, **labels: str) -> Gauge:
+        return self._get_or_create(Gauge, name, labels)
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        return self._get_or_create(Histogram, name, labels)
+
+    def snapshot(self) -> dict:
+        return {key: metric.snapshot() for key, metric in sorted(self._metrics.items())}
+
+
+metrics = MetricsRegistry()
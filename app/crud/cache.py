@@ -0,0 +1,344 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Protocol, Set, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.disease import DiseaseSchema
+
+logger = logging.getLogger(__name__)
+
+
+def disease_key(disease_id: UUID) -> str:
+    return f"id:{disease_id}"
+
+
+def disease_type_key(type: str) -> str:
+    return f"type:{type}"
+
+
+# 없는 질병이라는 것도 캐시한다 (예측 라벨 중 카탈로그에 없는 type 을 매번 조회하지 않도록)
+_ABSENT = ""
+
+InvalidationCallback = Callable[[List[str], float, str], None]
+
+
+class InvalidationChannel(Protocol):
+    """
+    워커 간 캐시 무효화 채널. publish 한 무효화 그룹(질병 id 등) 목록을 모든 구독자(다른 워커 포함)에게
+    callback(groups, 보낸 시각, origin) 으로 전달한다. origin 으로 자기가 보낸 메시지를 구분한다.
+    전달이 늦거나 유실되어도 TTL 이 지나면 캐시가 새로 채워진다.
+    """
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        ...
+
+    async def publish(self, groups: List[str], origin: str) -> None:
+        ...
+
+    async def start(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class LocalInvalidationChannel:
+    """같은 프로세스 안의 구독자에게만 전달하는 채널 (워커 1개 또는 테스트용)"""
+
+    def __init__(self):
+        self._callbacks: List[InvalidationCallback] = []
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        self._callbacks.append(callback)
+
+    async def publish(self, groups: List[str], origin: str) -> None:
+        sent_at = time.time()
+        for callback in self._callbacks:
+            callback(groups, sent_at, origin)
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisInvalidationChannel:
+    """
+    Redis pub/sub 으로 다른 워커에 무효화를 알리는 채널.
+    redis 패키지는 선택 의존성이라 이 채널을 쓸 때만 import 한다.
+    """
+
+    def __init__(self, url: str, channel: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CATALOG_CACHE_INVALIDATION=redis 를 사용하려면 redis 패키지가 필요합니다") from e
+        self._client = redis.from_url(url)
+        self._channel = channel
+        self._callbacks: List[InvalidationCallback] = []
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        self._callbacks.append(callback)
+
+    async def publish(self, groups: List[str], origin: str) -> None:
+        message = json.dumps({"groups": groups, "sent_at": time.time(), "origin": origin})
+        await self._client.publish(self._channel, message)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._client.close()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub()
+                await pubsub.subscribe(self._channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    for callback in self._callbacks:
+                        callback(payload["groups"], payload["sent_at"], payload["origin"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 연결이 끊긴 동안 놓친 무효화는 TTL 로 복구된다
+                logger.warning(f"Catalog cache invalidation listener failed: {str(e)}")
+                await asyncio.sleep(1.0)
+
+
+class CatalogCache:
+    """
+    질병 카탈로그(질병 + 상세/병원/보험) 읽기 캐시.
+    - 직렬화한 DiseaseSchema 를 id 와 type 두 키로 보관 (LRU + TTL)
+    - 어떤 키든 질병 id 로 묶어 두어 쓰기 후 invalidate(disease_id) 한 번으로 관련 키를 모두 지운다
+    - 없는 질병도 캐시하고 키 자신으로 묶어 둔다 (새 type 이 생기면 invalidate(..., types=[type]) 로 지움)
+    - DB 에서 읽는 사이에 무효화가 일어나면 읽은 값은 캐시에 넣지 않는다 (옛 값이 다시 들어가는 것 방지)
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        channel: Optional[InvalidationChannel] = None,
+        enabled: bool = True,
+        clock=time.monotonic,
+    ):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._channel = channel
+        self._enabled = enabled
+        self._clock = clock
+        self._origin = uuid.uuid4().hex  # 자기가 보낸 무효화는 이미 반영했으므로 받으면 무시
+        # key -> (저장 시각, 무효화 그룹, 직렬화된 DiseaseSchema 또는 _ABSENT)
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._keys_by_group: Dict[str, Set[str]] = {}
+        self._epoch = 0  # 무효화할 때마다 증가
+        self._lock = threading.Lock()
+        self._hits = metrics.counter("catalog_cache_hits_total")
+        self._misses = metrics.counter("catalog_cache_misses_total")
+        self._hit_ratio = metrics.gauge("catalog_cache_hit_ratio")
+        self._entries_gauge = metrics.gauge("catalog_cache_entries")
+        self._invalidations = metrics.counter("catalog_cache_invalidations_total")
+        self._errors = metrics.counter("catalog_cache_errors_total")
+        # 캐시에서 돌려준 값이 저장된 지 얼마나 됐는지 (최대 TTL 만큼 오래된 값을 볼 수 있음)
+        self._age = metrics.histogram("catalog_cache_entry_age_seconds")
+        # 다른 워커의 쓰기가 이 워커 캐시에서 지워지기까지 걸린 시간
+        self._invalidation_lag = metrics.histogram("catalog_cache_invalidation_lag_ms")
+        if channel is not None:
+            channel.subscribe(self._on_invalidation)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Optional[DiseaseSchema]]],
+    ) -> Optional[DiseaseSchema]:
+        """캐시에 있으면 그 값을, 없으면 load() 결과를 캐시에 넣고 돌려준다."""
+        if not self._enabled:
+            return await load()
+
+        payload = self._get(key)
+        if payload is not None:
+            return DiseaseSchema.model_validate_json(payload) if payload != _ABSENT else None
+
+        epoch = self._epoch
+        disease = await load()
+        self._store(key, disease, epoch)
+        return disease
+
+    async def get_many_or_load(
+        self,
+        keys: List[str],
+        load: Callable[[List[str]], Awaitable[Dict[str, DiseaseSchema]]],
+    ) -> Dict[str, DiseaseSchema]:
+        """
+        여러 키를 한 번에 조회. 캐시에 없는 키만 모아서 load(없는 키 목록) 한 번으로 채운다.
+        결과에는 질병이 있는 키만 들어 있다.
+        """
+        if not self._enabled:
+            return await load(keys)
+
+        found: Dict[str, DiseaseSchema] = {}
+        missing: List[str] = []
+        for key in keys:
+            payload = self._get(key)
+            if payload is None:
+                missing.append(key)
+            elif payload != _ABSENT:
+                found[key] = DiseaseSchema.model_validate_json(payload)
+        if missing:
+            epoch = self._epoch
+            loaded = await load(missing)
+            for key in missing:
+                self._store(key, loaded.get(key), epoch)
+            found.update(loaded)
+        return found
+
+    async def invalidate(self, disease_id: UUID, types: Iterable[Optional[str]] = ()) -> None:
+        """
+        질병(또는 그 상세/병원/보험)이 바뀐 뒤 호출. 이 워커의 캐시를 지우고 다른 워커에 알린다.
+        질병이 새로 갖게 된 type 은 types 로 넘겨서 '없음' 으로 캐시된 값도 지운다.
+        """
+        if not self._enabled:
+            return
+        groups = [str(disease_id), disease_key(disease_id)]
+        groups.extend(disease_type_key(type) for type in types if type is not None)
+        await self._invalidate_groups(groups)
+
+    async def invalidate_types(self, types: Iterable[Optional[str]]) -> None:
+        """질병을 한꺼번에 새로 만든 뒤 호출. 그 type 들의 '없음' 캐시만 지운다 (새 id 는 캐시에 있을 수 없음)"""
+        if not self._enabled:
+            return
+        groups = list({disease_type_key(type) for type in types if type is not None})
+        if groups:
+            await self._invalidate_groups(groups)
+
+    async def _invalidate_groups(self, groups: List[str]) -> None:
+        self._drop(groups)
+        if self._channel is None:
+            return
+        try:
+            await self._channel.publish(groups, self._origin)
+        except Exception as e:
+            self._errors.inc()
+            logger.warning(f"Catalog cache invalidation publish failed: {str(e)}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._keys_by_group.clear()
+            self._entries_gauge.set(0)
+
+    async def start(self) -> None:
+        if self._enabled and self._channel is not None:
+            await self._channel.start()
+
+    async def close(self) -> None:
+        if self._channel is not None:
+            await self._channel.close()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            now = self._clock()
+            if entry is not None and now - entry[0] >= self._ttl_seconds:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._misses.inc()
+                self._update_ratio()
+                return None
+            self._entries.move_to_end(key)
+            self._hits.inc()
+            self._update_ratio()
+            self._age.observe(now - entry[0])
+            return entry[2]
+
+    def _store(self, key: str, disease: Optional[DiseaseSchema], epoch: int) -> None:
+        if disease is None:
+            self._set(key, key, _ABSENT, epoch)
+        else:
+            self._set(key, str(disease.id), disease.model_dump_json(), epoch)
+
+    def _set(self, key: str, group: str, payload: str, epoch: int) -> None:
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._remove(key)
+            self._entries[key] = (self._clock(), group, payload)
+            self._keys_by_group.setdefault(group, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                self._remove(next(iter(self._entries)))
+            self._entries_gauge.set(len(self._entries))
+
+    def _drop(self, groups: List[str]) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._invalidations.inc()
+            for group in groups:
+                for key in self._keys_by_group.pop(group, set()):
+                    self._entries.pop(key, None)
+            self._entries_gauge.set(len(self._entries))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_group.get(entry[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_group[entry[1]]
+
+    def _update_ratio(self) -> None:
+        total = self._hits.value + self._misses.value
+        self._hit_ratio.set(self._hits.value / total if total else 0)
+
+    def _on_invalidation(self, groups: List[str], sent_at: float, origin: str) -> None:
+        if origin == self._origin:
+            return
+        self._drop(groups)
+        self._invalidation_lag.observe(max(0.0, time.time() - sent_at) * 1000)
+
+
+def create_catalog_cache() -> CatalogCache:
+    if settings.CATALOG_CACHE_INVALIDATION == "redis":
+        channel = RedisInvalidationChannel(settings.REDIS_URL, settings.CATALOG_CACHE_CHANNEL)
+    else:
+        channel = LocalInvalidationChannel()
+    return CatalogCache(
+        ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+        max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+        channel=channel,
+        enabled=settings.CATALOG_CACHE_ENABLED,
+    )
+
+
+catalog_cache = create_catalog_cache()
@@ -0,0 +1,359 @@
+"""
+질병 카탈로그 대량 가져오기/내보내기 (NDJSON, CSV)
+
+한 레코드는 상세/병원/보험을 포함한 질병 하나 (DiseaseCreate 와 같은 모양)
+- NDJSON: 한 줄에 DiseaseCreate JSON 하나
+- CSV: name,type,details,hospitals,insurances 헤더, 자식 목록 열은 JSON 배열
+
+API(POST /diseases/import, GET /diseases/export) 외에 명령줄로도 실행할 수 있다.
+    python -m app.crud.catalog_io import diseases.ndjson
+    python -m app.crud.catalog_io import diseases.ndjson --mode replace
+    python -m app.crud.catalog_io export diseases.csv --format csv
+"""
+import argparse
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import sys
+import uuid
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.crud.cache import catalog_cache
+from app.crud.disease import disease_relation_options
+from app.crud.pagination import paginate
+from app.models.disease import Disease, DiseaseDetail
+from app.models.hospital import Hospital
+from app.models.insurance import Insurance
+from app.schemas.disease import CatalogImportError, CatalogImportResult, DiseaseCreate
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+MODES = ("skip", "replace")  # 이미 있는 type 의 레코드를 건너뛸지, 기존 질병을 바꿀지
+CSV_COLUMNS = ["name", "type", "details", "hospitals", "insurances"]
+CHILD_COLUMNS = ("details", "hospitals", "insurances")
+
+imported_records = metrics.counter("catalog_import_records_total")
+failed_records = metrics.counter("catalog_import_errors_total")
+batch_ms = metrics.histogram("catalog_import_batch_ms")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """바이트 조각 스트림을 줄 단위 문자열로 (조각 경계에 걸친 줄/UTF-8 문자도 처리)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterator[str], format: str) -> AsyncIterator[Tuple[int, object]]:
+    """
+    (레코드가 시작하는 줄 번호, dict 또는 파싱 오류) 를 순서대로 돌려준다.
+    파싱 오류도 레코드 하나로 보고 이어서 읽는다.
+    """
+    if format == "ndjson":
+        line_no = 0
+        async for line in lines:
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, e
+        return
+
+    header: Optional[List[str]] = None
+    buffer: List[str] = []
+    line_no = start = 0
+    async for line in lines:
+        line_no += 1
+        if not buffer:
+            if not line.strip():
+                continue
+            start = line_no
+        buffer.append(line)
+        # 따옴표 개수가 홀수면 줄바꿈이 들어간 필드가 아직 안 끝난 것
+        if sum(part.count('"') for part in buffer) % 2:
+            continue
+        row = next(csv.reader(["\n".join(buffer)]))
+        buffer = []
+        if header is None:
+            header = row
+            continue
+        yield start, _csv_record(header, row)
+    if buffer:
+        yield start, ValueError("따옴표가 닫히지 않았습니다")
+
+
+def _csv_record(header: List[str], row: List[str]) -> object:
+    if len(row) != len(header):
+        return ValueError(f"열 개수가 헤더와 다릅니다 ({len(row)} != {len(header)})")
+    record = dict(zip(header, row))
+    try:
+        for column in CHILD_COLUMNS:
+            record[column] = json.loads(record[column]) if record.get(column) else []
+    except ValueError as e:
+        return ValueError(f"{column} 열이 JSON 배열이 아닙니다: {str(e)}")
+    if not record.get("type"):
+        record["type"] = None
+    return record
+
+
+async def _existing_ids(db: AsyncSession, types: List[str]) -> Dict[str, List[uuid.UUID]]:
+    """type -> 그 type 의 질병 id 목록 (먼저 만든 것부터)"""
+    if not types:
+        return {}
+    result = await db.execute(
+        select(Disease.type, Disease.id)
+        .where(Disease.type.in_(types))
+        .order_by(Disease.created_at, Disease.id)
+    )
+    ids: Dict[str, List[uuid.UUID]] = {}
+    for type, disease_id in result.all():
+        ids.setdefault(type, []).append(disease_id)
+    return ids
+
+
+async def _insert_batch(db: AsyncSession, diseases: List[DiseaseCreate], mode: str = "skip") -> Tuple[int, List[uuid.UUID]]:
+    """
+    질병 여러 개를 테이블마다 set 단위 문장 한 번씩으로 저장 (commit 은 호출한 쪽에서).
+    type 은 카탈로그에서 질병을 찾는 키라서, 같은 type 의 질병이 이미 있으면
+    mode 가 skip 이면 건너뛰고 replace 면 그 질병의 이름과 상세/병원/보험을 바꾼다 (id 는 유지).
+    (건너뛴 수, 내용이 바뀌거나 지워진 질병 id 목록) 을 돌려준다. diseases 안에서는 type 이 겹치지 않아야 한다.
+    """
+    existing = await _existing_ids(db, [disease.type for disease in diseases if disease.type is not None])
+    skipped = 0
+    replaced: List[uuid.UUID] = []
+    duplicates: List[uuid.UUID] = []
+    disease_rows, renamed_rows = [], []
+    child_rows = {DiseaseDetail: [], Hospital: [], Insurance: []}
+    for disease in diseases:
+        ids = existing.get(disease.type)
+        if ids and mode == "skip":
+            skipped += 1
+            continue
+        if ids:
+            # 예전 가져오기로 같은 type 이 여러 개 들어가 있으면 가장 먼저 만든 것만 남긴다
+            disease_id = ids[0]
+            replaced.append(disease_id)
+            duplicates.extend(ids[1:])
+            renamed_rows.append({"id": disease_id, "name": disease.name})
+        else:
+            disease_id = uuid.uuid4()
+            disease_rows.append({"id": disease_id, "name": disease.name, "type": disease.type})
+        child_rows[DiseaseDetail].extend({"disease_id": disease_id, **detail.model_dump()} for detail in disease.details)
+        child_rows[Hospital].extend({"disease_id": disease_id, **hospital.model_dump()} for hospital in disease.hospitals)
+        child_rows[Insurance].extend({"disease_id": disease_id, **insurance.model_dump()} for insurance in disease.insurances)
+
+    removed = replaced + duplicates
+    if removed:
+        for model in child_rows:
+            await db.execute(
+                delete(model).where(model.disease_id.in_(removed)).execution_options(synchronize_session=False)
+            )
+    if duplicates:
+        await db.execute(
+            delete(Disease).where(Disease.id.in_(duplicates)).execution_options(synchronize_session=False)
+        )
+    if renamed_rows:
+        await db.execute(update(Disease), renamed_rows)
+    for model, rows in ((Disease, disease_rows), *child_rows.items()):
+        if rows:
+            await db.execute(insert(model), rows)
+    return skipped, removed
+
+
+async def _write_batch(
+    db: AsyncSession,
+    batch: List[Tuple[int, DiseaseCreate]],
+    result: CatalogImportResult,
+    mode: str,
+) -> None:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    changed: List[uuid.UUID] = []
+    try:
+        skipped, removed = await _insert_batch(db, [disease for _, disease in batch], mode)
+        await db.commit()
+        result.imported += len(batch) - skipped
+        result.skipped += skipped
+        changed.extend(removed)
+    except Exception as e:
+        await db.rollback()
+        # 배치 안의 어떤 레코드가 문제인지 찾기 위해 하나씩 다시 저장
+        logger.warning(f"Catalog import batch failed, retrying per record: {str(e)}")
+        for line, disease in batch:
+            try:
+                skipped, removed = await _insert_batch(db, [disease], mode)
+                await db.commit()
+                result.imported += 1 - skipped
+                result.skipped += skipped
+                changed.extend(removed)
+            except Exception as record_error:
+                await db.rollback()
+                _add_error(result, line, str(record_error))
+    batch_ms.observe((loop.time() - started) * 1000)
+    for disease_id in changed:
+        await catalog_cache.invalidate(disease_id)
+    await catalog_cache.invalidate_types(disease.type for _, disease in batch)
+
+
+def _add_error(result: CatalogImportResult, line: int, error: str) -> None:
+    result.failed += 1
+    failed_records.inc()
+    if len(result.errors) < settings.CATALOG_IMPORT_MAX_ERRORS:
+        result.errors.append(CatalogImportError(line=line, error=error))
+    else:
+        result.errors_truncated = True
+
+
+async def import_catalog(
+    db: AsyncSession,
+    lines: AsyncIterator[str],
+    format: str = "ndjson",
+    batch_size: Optional[int] = None,
+    mode: str = "skip",
+) -> CatalogImportResult:
+    """
+    레코드를 읽는 대로 검증하고 batch_size 개씩 한 트랜잭션으로 저장한다.
+    - 잘못된 레코드는 건너뛰고 줄 번호와 오류를 결과에 담는다
+    - 이미 있는 type 의 레코드는 mode 에 따라 건너뛰거나(skip, 개수는 skipped) 기존 질병을 바꾼다(replace)
+    - 도중에 저장을 이어갈 수 없는 오류가 나면 멈추고 aborted 로 알린다 (이미 저장한 배치는 되돌리지 않음)
+    """
+    if format not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {format}")
+    if mode not in MODES:
+        raise ValueError(f"지원하지 않는 mode 입니다: {mode}")
+    batch_size = batch_size or settings.CATALOG_IMPORT_BATCH_SIZE
+    result = CatalogImportResult()
+    batch: List[Tuple[int, DiseaseCreate]] = []
+    batch_types = set()
+
+    try:
+        async for line, record in iter_records(lines, format):
+            if isinstance(record, Exception):
+                _add_error(result, line, str(record))
+                continue
+            try:
+                disease = DiseaseCreate.model_validate(record)
+            except ValidationError as e:
+                _add_error(result, line, str(e))
+                continue
+            # 한 배치 안에서는 type 이 겹치지 않게 (파일 안의 중복도 앞 레코드가 저장된 뒤 mode 대로 처리)
+            if disease.type is not None and disease.type in batch_types:
+                await _write_batch(db, batch, result, mode)
+                batch, batch_types = [], set()
+            batch.append((line, disease))
+            if disease.type is not None:
+                batch_types.add(disease.type)
+            if len(batch) >= batch_size:
+                await _write_batch(db, batch, result, mode)
+                batch, batch_types = [], set()
+        if batch:
+            await _write_batch(db, batch, result, mode)
+    except Exception as e:
+        logger.error(f"Catalog import aborted after {result.imported} records: {str(e)}")
+        result.aborted = True
+
+    imported_records.inc(result.imported)
+    return result
+
+
+async def iter_catalog(db: AsyncSession, batch_size: Optional[int] = None) -> AsyncIterator[DiseaseCreate]:
+    """
+    전체 카탈로그를 (created_at, id) 순서로 batch_size 개씩 읽어서 하나씩 돌려준다.
+    keyset 페이지로 나눠 읽고 다 쓴 행은 세션에서 내보내서 메모리 사용량이 테이블 크기와 무관하다.
+    """
+    batch_size = batch_size or settings.CATALOG_EXPORT_BATCH_SIZE
+    stmt = select(Disease).options(*disease_relation_options())
+    cursor = None
+    while True:
+        page = await paginate(db, stmt, Disease, limit=batch_size, cursor=cursor)
+        for disease in page.items:
+            yield DiseaseCreate.model_validate(disease, from_attributes=True)
+        db.expunge_all()
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
+
+
+async def export_catalog(db: AsyncSession, format: str = "ndjson", batch_size: Optional[int] = None) -> AsyncIterator[str]:
+    """import_catalog 로 다시 가져올 수 있는 형식의 텍스트 조각 스트림"""
+    if format not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {format}")
+    if format == "csv":
+        yield _csv_line(CSV_COLUMNS)
+    async for disease in iter_catalog(db, batch_size):
+        if format == "ndjson":
+            yield disease.model_dump_json() + "\n"
+        else:
+            data = disease.model_dump()
+            yield _csv_line([
+                data["name"],
+                data["type"] or "",
+                *(json.dumps(data[column], ensure_ascii=False) for column in CHILD_COLUMNS),
+            ])
+
+
+def _csv_line(values: Iterable[str]) -> str:
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerow(values)
+    return out.getvalue()
+
+
+async def _file_lines(path: str) -> AsyncIterator[str]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+async def _run(args) -> int:
+    from app.db.base import async_session_maker, close_db
+
+    try:
+        async with async_session_maker() as db:
+            if args.command == "import":
+                result = await import_catalog(db, _file_lines(args.path), args.format, args.batch_size, args.mode)
+                print(result.model_dump_json(indent=2))
+                return 1 if result.failed or result.aborted else 0
+            with open(args.path, "w", encoding="utf-8", newline="") as f:
+                async for text in export_catalog(db, args.format, args.batch_size):
+                    f.write(text)
+            return 0
+    finally:
+        await close_db()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="질병 카탈로그 대량 가져오기/내보내기")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="가져올 파일 또는 내보낼 파일 경로")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="기본값은 확장자로 판단 (.csv 면 csv)")
+    parser.add_argument("--batch-size", type=int, default=None, help="트랜잭션(또는 읽기) 하나에 담을 질병 수")
+    parser.add_argument("--mode", choices=MODES, default="skip", help="이미 있는 type 의 레코드를 건너뛸지(skip) 기존 질병을 바꿀지(replace)")
+    args = parser.parse_args(argv)
+    if args.format is None:
+        args.format = "csv" if args.path.lower().endswith(".csv") else "ndjson"
+
+    logging.basicConfig(level=logging.INFO)
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,48 +1,134 @@
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Dict, Iterable, List, Optional, Sequence
 from uuid import UUID
 from app.models.disease import Disease, DiseaseDetail
 from app.models.hospital import Hospital
 from app.models.insurance import Insurance
-from app.schemas.disease import DiseaseCreate, DiseaseDetailCreate, DiseaseUpdate
+from app.schemas.disease import DiseaseCreate, DiseaseDetailCreate, DiseaseSchema, DiseaseSummarySchema, DiseaseUpdate
+from app.schemas.hospital import HospitalCreate
+from app.schemas.insurance import InsuranceCreate
 from sqlalchemy.orm import selectinload
+from app.crud.cache import catalog_cache, disease_key, disease_type_key
+from app.crud.pagination import Page, paginate
+from app.db.base import async_session_maker
+
+# 질병과 함께 읽을 수 있는 관계. 모델 관계는 lazy 라서 쿼리마다 읽을 관계를 include 로 정한다.
+DISEASE_RELATIONS = ("details", "hospitals", "insurances")
+
+def disease_relation_options(include: Iterable[str] = DISEASE_RELATIONS) -> list:
+    return [selectinload(getattr(Disease, relation)) for relation in include]
+
+def to_disease_schema(disease: Disease, include: Iterable[str] = DISEASE_RELATIONS) -> DiseaseSchema:
+    """include 한 관계만 채운 DiseaseSchema (나머지 관계는 unset 이라 exclude_unset 응답에서 빠진다)"""
+    data = DiseaseSummarySchema.model_validate(disease).model_dump()
+    for relation in include:
+        data[relation] = getattr(disease, relation)
+    return DiseaseSchema.model_validate(data)
+
+def project_disease(disease: DiseaseSchema, include: Sequence[str]) -> DiseaseSchema:
+    """관계를 모두 가진 DiseaseSchema(캐시 값)에서 include 한 관계만 남긴다"""
+    if set(include) >= set(DISEASE_RELATIONS):
+        return disease
+    fields = set(DiseaseSummarySchema.model_fields) | set(include)
+    return DiseaseSchema.model_validate(disease.model_dump(include=fields))
 
 async def get_diseases(
     db: AsyncSession, 
     skip: int = 0, 
-    limit: int = 100
-) -> List[Disease]:
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include: Sequence[str] = DISEASE_RELATIONS
+) -> Page[Disease]:
+    # include 가 비어 있으면 질병 테이블만 읽는다 (요약 목록)
+    stmt = select(Disease).options(*disease_relation_options(include))
+    return await paginate(db, stmt, Disease, limit=limit, cursor=cursor, skip=skip)
+
+async def get_disease(
+    db: AsyncSession,
+    disease_id: UUID,
+    include: Sequence[str] = DISEASE_RELATIONS
+) -> Optional[Disease]:
     stmt = (
         select(Disease)
-        .options(
-            selectinload(Disease.details),
-            selectinload(Disease.hospitals),
-            selectinload(Disease.insurances)
-        )
-        .offset(skip)
-        .limit(limit)
+        .options(*disease_relation_options(include))
+        .where(Disease.id == disease_id)
     )
     result = await db.execute(stmt)
-    return result.scalars().all()
+    return result.scalar_one_or_none()
 
-async def get_disease(db: AsyncSession, disease_id: UUID) -> Optional[Disease]:
+async def get_disease_by_type(
+    db: AsyncSession,
+    type: str,
+    include: Sequence[str] = DISEASE_RELATIONS
+) -> Optional[Disease]:
     stmt = (
         select(Disease)
-        .options(
-            selectinload(Disease.details),
-            selectinload(Disease.hospitals),
-            selectinload(Disease.insurances)
-        )
-        .where(Disease.id == disease_id)
+        .options(*disease_relation_options(include))
+        .where(Disease.type == type)
     )
     result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
-async def get_disease_by_type(db: AsyncSession, type: str) -> Optional[Disease]:
-    stmt = select(Disease).where(Disease.type == type)
-    result = await db.execute(stmt)
-    return result.scalar_one_or_none()
+# 조회 API 용 캐시 읽기 (캐시에 없을 때만 DB 조회, 결과는 직렬화해서 보관)
+# 캐시에는 관계를 모두 채운 값을 두고 include 에 맞게 잘라서 돌려준다.
+# 캐시를 끈 경우에는 include 한 관계만 DB 에서 읽는다.
+async def get_disease_cached(
+    db: AsyncSession,
+    disease_id: UUID,
+    include: Sequence[str] = DISEASE_RELATIONS
+) -> Optional[DiseaseSchema]:
+    if not catalog_cache.enabled:
+        disease = await get_disease(db, disease_id, include)
+        return to_disease_schema(disease, include) if disease else None
+
+    async def load() -> Optional[DiseaseSchema]:
+        disease = await get_disease(db, disease_id)
+        return to_disease_schema(disease) if disease else None
+    disease = await catalog_cache.get_or_load(disease_key(disease_id), load)
+    return project_disease(disease, include) if disease else None
+
+async def get_disease_by_type_cached(
+    db: AsyncSession,
+    type: str,
+    include: Sequence[str] = DISEASE_RELATIONS
+) -> Optional[DiseaseSchema]:
+    if not catalog_cache.enabled:
+        disease = await get_disease_by_type(db, type, include)
+        return to_disease_schema(disease, include) if disease else None
+
+    async def load() -> Optional[DiseaseSchema]:
+        disease = await get_disease_by_type(db, type)
+        return to_disease_schema(disease) if disease else None
+    disease = await catalog_cache.get_or_load(disease_type_key(type), load)
+    return project_disease(disease, include) if disease else None
+
+async def get_diseases_by_types(
+    types: List[str],
+    sessions: async_sessionmaker = async_session_maker
+) -> Dict[str, DiseaseSchema]:
+    """
+    type -> 질병 정보 (없는 type 은 빠짐)
+    캐시에 없는 type 만 모아 WHERE type IN (...) 쿼리 한 번으로 관계까지 함께 읽는다.
+    세션은 캐시에 없는 type 이 있을 때만 열고 조회가 끝나면 바로 닫는다 (추론을 기다리는 동안 연결을 잡고 있지 않음)
+    """
+    keys = {disease_type_key(type): type for type in types}
+
+    async def load(missing_keys: List[str]) -> Dict[str, DiseaseSchema]:
+        stmt = (
+            select(Disease)
+            .options(*disease_relation_options())
+            .where(Disease.type.in_([keys[key] for key in missing_keys]))
+        )
+        async with sessions() as db:
+            result = await db.execute(stmt)
+            return {
+                disease_type_key(disease.type): to_disease_schema(disease)
+                for disease in result.scalars().all()
+            }
+
+    found = await catalog_cache.get_many_or_load(list(keys), load)
+    return {keys[key]: disease for key, disease in found.items()}
 
 async def get_disease_details(db: AsyncSession, disease_id: UUID) -> List[DiseaseDetail]:
     stmt = select(DiseaseDetail).where(DiseaseDetail.disease_id == disease_id)
@@ -64,91 +150,95 @@ async def get_disease_details_by_name(
     result = await db.execute(stmt)
     return result.scalars().all()
 
+async def _insert_children(
+    db: AsyncSession,
+    disease_id: UUID,
+    details: List[DiseaseDetailCreate] = (),
+    hospitals: List[HospitalCreate] = (),
+    insurances: List[InsuranceCreate] = ()
+) -> None:
+    # 테이블마다 INSERT ... VALUES (...), (...) 한 번 (행마다 ORM 객체를 만들지 않음), id 는 컬럼 기본값으로 생성
+    if details:
+        await db.execute(
+            insert(DiseaseDetail),
+            [{"disease_id": disease_id, **detail.model_dump()} for detail in details]
+        )
+    if hospitals:
+        await db.execute(
+            insert(Hospital),
+            [{"disease_id": disease_id, **hospital.model_dump()} for hospital in hospitals]
+        )
+    if insurances:
+        await db.execute(
+            insert(Insurance),
+            [{"disease_id": disease_id, **insurance.model_dump()} for insurance in insurances]
+        )
+
 async def create_disease(db: AsyncSession, disease: DiseaseCreate) -> Disease:
-    # 질병 기본 정보 생성
+    # 질병 기본 정보와 상세/병원/보험 정보를 한 트랜잭션에서 저장 (commit 한 번)
     db_disease = Disease(name=disease.name, type=disease.type)
     db.add(db_disease)
+    await db.flush()  # 자식 행의 외래 키가 참조할 질병 행을 먼저 INSERT
+    await _insert_children(db, db_disease.id, disease.details, disease.hospitals, disease.insurances)
     await db.commit()
-    await db.refresh(db_disease)
-    
-    # 상세 정보 추가 - id 자동 생성
-    for detail in disease.details:
-        db_detail = DiseaseDetail(
-            disease_id=db_disease.id,  # 부모 disease의 id 참조
-            detail_type=detail.detail_type,
-            detail_value=detail.detail_value
-        )
-        db.add(db_detail)
-    
-    # 병원 정보 추가 - id 자동 생성
-    if disease.hospitals:
-        for hospital in disease.hospitals:
-            db_hospital = Hospital(
-                disease_id=db_disease.id,  # 부모 disease의 id 참조
-                hospital_name=hospital.hospital_name,
-                address=hospital.address,
-                contact_info=hospital.contact_info,
-                website=hospital.website
-            )
-            db.add(db_hospital)
-    
-    # 보험 정보 추가 - id 자동 생성
-    if disease.insurances:
-        for insurance in disease.insurances:
-            db_insurance = Insurance(
-                disease_id=db_disease.id,  # 부모 disease의 id 참조
-                insurance_name=insurance.insurance_name,
-                policy_details=insurance.policy_details,
-                website=insurance.website
-            )
-            db.add(db_insurance)
-    
-    await db.commit()
-    await db.refresh(db_disease)
-    return db_disease
+    await catalog_cache.invalidate(db_disease.id, types=[db_disease.type])
+    # 관계는 lazy 라서 응답에 필요한 관계까지 한 번에 다시 읽는다
+    return await get_disease(db, db_disease.id)
 
 async def update_disease(
     db: AsyncSession, 
     disease_id: UUID, 
     disease: DiseaseUpdate
 ) -> Optional[Disease]:
-    db_disease = await get_disease(db, disease_id)
-    if not db_disease:
+    # 기본 정보 업데이트 (질병을 먼저 읽지 않고 UPDATE 한 번, 없는 id 면 0행)
+    result = await db.execute(
+        update(Disease)
+        .where(Disease.id == disease_id)
+        .values(name=disease.name, type=disease.type)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
         return None
     
-    # 기본 정보 업데이트
-    db_disease.name = disease.name
-    db_disease.type = disease.type
-    
-    # 상세 정보 업데이트 (기존 정보 삭제 후 새로 추가)
-    query = select(DiseaseDetail).where(DiseaseDetail.disease_id == disease_id)
-    result = await db.execute(query)
-    existing_details = result.scalars().all()
-    for detail in existing_details:
-        await db.delete(detail)
-    
-    for detail in disease.details:
-        db_detail = DiseaseDetail(
-            disease_id=disease_id,
-            detail_type=detail.detail_type,
-            detail_value=detail.detail_value
+    # 상세 정보 업데이트 (기존 정보를 DELETE 한 번으로 지우고 새로 추가)
+    if disease.details is not None:
+        await db.execute(
+            delete(DiseaseDetail)
+            .where(DiseaseDetail.disease_id == disease_id)
+            .execution_options(synchronize_session=False)
         )
-        db.add(db_detail)
+        await _insert_children(db, disease_id, details=disease.details)
     
     await db.commit()
-    await db.refresh(db_disease)
-    return db_disease
+    # id 로 묶인 키(이전 type 키 포함)와 새 type 의 '없음' 캐시를 지운다
+    await catalog_cache.invalidate(disease_id, types=[disease.type])
+    # 세션에 남아 있을 수 있는 이전 상태 대신 방금 저장한 값으로 다시 읽는다
+    db.expire_all()
+    return await get_disease(db, disease_id)
 
 async def delete_disease(
     db: AsyncSession, 
     disease_id: UUID
 ) -> bool:
-    disease = await get_disease(db, disease_id)
-    if not disease:
+    # 자식 행까지 테이블마다 DELETE 한 번 (행을 읽어서 하나씩 지우지 않음)
+    # DB 의 ON DELETE CASCADE 가 꺼져 있는 환경(sqlite)에서도 같은 결과가 되도록 직접 지운다
+    for model in (DiseaseDetail, Hospital, Insurance):
+        await db.execute(
+            delete(model)
+            .where(model.disease_id == disease_id)
+            .execution_options(synchronize_session=False)
+        )
+    result = await db.execute(
+        delete(Disease)
+        .where(Disease.id == disease_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
         return False
-    
-    await db.delete(disease)
     await db.commit()
+    await catalog_cache.invalidate(disease_id)
     return True
 
 # 상세 정보 관련 추가 함수들
@@ -164,6 +254,7 @@ async def add_disease_detail(
     )
     db.add(db_detail)
     await db.commit()
+    await catalog_cache.invalidate(disease_id)
     await db.refresh(db_detail)
     return db_detail
 
@@ -177,4 +268,5 @@ async def delete_disease_detail(
     if detail:
         await db.delete(detail)
         await db.commit()
+        await catalog_cache.invalidate(detail.disease_id)
     return detail
\ No newline at end of file
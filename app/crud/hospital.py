@@ -1,19 +1,21 @@
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 from app.models.hospital import Hospital
-from app.schemas.hospital import HospitalCreate, HospitalUpdate
+from app.schemas.hospital import HospitalCreate, HospitalSchema, HospitalUpdate
 from app.models.disease import Disease
+from app.crud import disease as disease_crud
+from app.crud.cache import catalog_cache
+from app.crud.pagination import Page, paginate
 
 async def get_hospitals(
     db: AsyncSession, 
     skip: int = 0, 
-    limit: int = 100
-) -> List[Hospital]:
-    stmt = select(Hospital).offset(skip).limit(limit)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Page[Hospital]:
+    return await paginate(db, select(Hospital), Hospital, limit=limit, cursor=cursor, skip=skip)
 
 async def get_hospital(db: AsyncSession, hospital_id: UUID) -> Optional[Hospital]:
     stmt = select(Hospital).where(Hospital.id == hospital_id)
@@ -25,6 +27,15 @@ async def get_hospitals_by_disease(db: AsyncSession, disease_id: UUID) -> List[H
     result = await db.execute(stmt)
     return result.scalars().all()
 
+# 질병 캐시 payload 에 hospitals 목록이 함께 들어 있으므로 질병 캐시에서 꺼낸다
+# (아래 쓰기 함수들이 부모 질병을 무효화하므로 같은 무효화로 함께 지워진다)
+async def get_hospitals_by_disease_cached(
+    db: AsyncSession,
+    disease_id: UUID
+) -> List[HospitalSchema]:
+    disease = await disease_crud.get_disease_cached(db, disease_id, ("hospitals",))
+    return disease.hospitals if disease else []
+
 async def create_hospital(db: AsyncSession, hospital: HospitalCreate, disease_id: UUID) -> Hospital:
     # 질병 ID 존재 여부 확인
     disease_exists = await db.execute(
@@ -42,6 +53,8 @@ async def create_hospital(db: AsyncSession, hospital: HospitalCreate, disease_id
     )
     db.add(db_hospital)
     await db.commit()
+    # 질병 캐시에 병원/보험 목록이 함께 들어 있으므로 부모 질병을 무효화
+    await catalog_cache.invalidate(disease_id)
     await db.refresh(db_hospital)
     return db_hospital
 
@@ -55,6 +68,7 @@ async def update_hospital(db: AsyncSession, hospital_id: UUID, hospital: Hospita
         setattr(db_hospital, key, value)
     
     await db.commit()
+    await catalog_cache.invalidate(db_hospital.disease_id)
     await db.refresh(db_hospital)
     return db_hospital
 
@@ -66,15 +80,18 @@ async def delete_hospital(
     if hospital:
         await db.delete(hospital)
         await db.commit()
+        await catalog_cache.invalidate(hospital.disease_id)
     return hospital
 
 async def delete_hospitals_by_disease(
     db: AsyncSession, 
     disease_id: UUID
 ) -> None:
-    stmt = select(Hospital.__table__.columns).where(Hospital.disease_id == disease_id)
-    result = await db.execute(stmt)
-    hospitals = result.scalars().all()
-    for hospital in hospitals:
-        await db.delete(hospital)
-    await db.commit()
\ No newline at end of file
+    # 행을 읽지 않고 DELETE ... WHERE disease_id 한 번
+    await db.execute(
+        delete(Hospital)
+        .where(Hospital.disease_id == disease_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await catalog_cache.invalidate(disease_id)
\ No newline at end of file
@@ -1,19 +1,21 @@
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 from app.models.insurance import Insurance
-from app.schemas.insurance import InsuranceCreate, InsuranceUpdate
+from app.schemas.insurance import InsuranceCreate, InsuranceSchema, InsuranceUpdate
 from app.models.disease import Disease
+from app.crud import disease as disease_crud
+from app.crud.cache import catalog_cache
+from app.crud.pagination import Page, paginate
 
 async def get_insurances(
     db: AsyncSession, 
     skip: int = 0, 
-    limit: int = 100
-) -> List[Insurance]:
-    stmt = select(Insurance).offset(skip).limit(limit)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Page[Insurance]:
+    return await paginate(db, select(Insurance), Insurance, limit=limit, cursor=cursor, skip=skip)
 
 async def get_insurance(db: AsyncSession, insurance_id: UUID) -> Optional[Insurance]:
     stmt = select(Insurance).where(Insurance.id == insurance_id)
@@ -28,6 +30,15 @@ async def get_insurances_by_disease(
     result = await db.execute(stmt)
     return result.scalars().all()
 
+# 질병 캐시 payload 에 insurances 목록이 함께 들어 있으므로 질병 캐시에서 꺼낸다
+# (아래 쓰기 함수들이 부모 질병을 무효화하므로 같은 무효화로 함께 지워진다)
+async def get_insurances_by_disease_cached(
+    db: AsyncSession,
+    disease_id: UUID
+) -> List[InsuranceSchema]:
+    disease = await disease_crud.get_disease_cached(db, disease_id, ("insurances",))
+    return disease.insurances if disease else []
+
 async def create_insurance(
     db: AsyncSession, 
     insurance: InsuranceCreate, 
@@ -48,6 +59,8 @@ async def create_insurance(
     )
     db.add(db_insurance)
     await db.commit()
+    # 질병 캐시에 병원/보험 목록이 함께 들어 있으므로 부모 질병을 무효화
+    await catalog_cache.invalidate(disease_id)
     await db.refresh(db_insurance)
     return db_insurance
 
@@ -65,6 +78,7 @@ async def update_insurance(
         setattr(db_insurance, key, value)
     
     await db.commit()
+    await catalog_cache.invalidate(db_insurance.disease_id)
     await db.refresh(db_insurance)
     return db_insurance
 
@@ -76,6 +90,7 @@ async def delete_insurance(
     if insurance:
         await db.delete(insurance)
         await db.commit()
+        await catalog_cache.invalidate(insurance.disease_id)
     return insurance
 
 # 특정 질병에 대한 모든 보험 삭제
@@ -83,9 +98,11 @@ async def delete_insurances_by_disease(
     db: AsyncSession, 
     disease_id: UUID
 ) -> None:
-    stmt = select(Insurance.__table__.columns).where(Insurance.disease_id == disease_id)
-    result = await db.execute(stmt)
-    insurances = result.scalars().all()
-    for insurance in insurances:
-        await db.delete(insurance)
-    await db.commit()
\ No newline at end of file
+    # 행을 읽지 않고 DELETE ... WHERE disease_id 한 번
+    await db.execute(
+        delete(Insurance)
+        .where(Insurance.disease_id == disease_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await catalog_cache.invalidate(disease_id)
\ No newline at end of file
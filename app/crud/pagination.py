@@ -0,0 +1,64 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # 다음 페이지가 없으면 None
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """마지막 행의 (created_at, id) 를 클라이언트가 해석할 필요 없는 토큰으로 만든다"""
+    raw = json.dumps([created_at.isoformat(), id.hex], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """잘못된 토큰이면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id_hex = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(hex=id_hex)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"잘못된 cursor: {cursor}") from e
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    model,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Page:
+    """
+    (created_at, id) 순서의 keyset 페이지네이션
+    - cursor 가 있으면 그 행 다음부터 읽는다 (앞 페이지를 건너뛰느라 읽지 않아서 깊은 페이지도 빠름)
+    - cursor 가 없으면 기존처럼 skip 만큼 건너뛴다 (하위 호환)
+    - limit + 1 개를 읽어서 다음 페이지가 있을 때만 next_cursor 를 준다
+    """
+    order = (model.created_at, model.id)
+    if cursor is not None:
+        # 행 값 비교라 (created_at, id) 복합 인덱스를 그대로 범위 검색한다
+        stmt = stmt.where(tuple_(*order) > decode_cursor(cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+    stmt = stmt.order_by(*order).limit(limit + 1)
+
+    result = await db.execute(stmt)
+    items = list(result.scalars().all())
+    if len(items) <= limit:
+        return Page(items=items)
+    items = items[:limit]
+    last = items[-1]
+    return Page(items=items, next_cursor=encode_cursor(last.created_at, last.id))
@@ -1,18 +1,65 @@
+from typing import Any, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.core.metrics import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    DB_POOL_MODE 에 따른 create_async_engine 옵션
+    - pooled: 연결을 풀에 두고 재사용 (요청마다 TCP/TLS/인증을 다시 하지 않음)
+    - null: 요청마다 새 연결 (pgbouncer 등 외부 풀러를 쓸 때)
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO_LOG,
+        "future": True,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_POOL_MODE == "null":
+        options["poolclass"] = NullPool
+    elif url.get_backend_name() != "sqlite":  # sqlite(테스트)는 드라이버 기본 풀 사용
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_use_lifo=True,  # 한가할 때 남는 연결이 recycle 되도록 최근 연결부터 사용
+        )
+    if url.get_driver_name() == "asyncpg":
+        # SQLAlchemy 어댑터와 asyncpg 양쪽의 prepared statement 캐시 (pgbouncer transaction 모드면 0)
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+def instrument_pool(async_engine) -> None:
+    """풀 상태 지표: 새로 연 연결 수, 사용 중인 연결 수"""
+    connects = metrics.counter("db_connections_opened_total")
+    checked_out = metrics.gauge("db_pool_checked_out")
+    sync_engine = async_engine.sync_engine
+
+    def on_connect(dbapi_connection, connection_record):
+        connects.inc()
+
+    def on_pool_change(*args):
+        pool = sync_engine.pool
+        if hasattr(pool, "checkedout"):
+            checked_out.set(pool.checkedout())
+
+    event.listen(sync_engine, "connect", on_connect)
+    event.listen(sync_engine, "checkout", on_pool_change)
+    event.listen(sync_engine, "checkin", on_pool_change)
+
 # 비동기 엔진 생성
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DB_ECHO_LOG,
-    future=True,
-    pool_pre_ping=True,
-    poolclass=NullPool
-)
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+instrument_pool(engine)
 
 # 비동기 세션 팩토리 생성
 async_session_maker = async_sessionmaker(
@@ -31,4 +78,8 @@ async def init_db():
             await conn.run_sync(Base.metadata.create_all)
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
-        raise
\ No newline at end of file
+        raise
+
+async def close_db():
+    # 풀에 남아 있는 연결 정리
+    await engine.dispose()
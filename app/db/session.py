@@ -1,9 +1,30 @@
+import time
 from typing import AsyncGenerator
+from fastapi import HTTPException, status
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.db.base import async_session_maker
 
+checkout_ms = metrics.histogram("db_pool_checkout_ms")
+checkout_timeouts = metrics.counter("db_pool_timeouts_total")
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
+        # 풀에서 연결을 먼저 꺼내서 대기 시간(null 모드는 연결 시간)을 기록
+        started = time.perf_counter()
+        try:
+            await session.connection()
+        except PoolTimeoutError as e:
+            checkout_timeouts.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="데이터베이스 연결이 부족합니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_SECONDS)},
+            ) from e
+        finally:
+            checkout_ms.observe((time.perf_counter() - started) * 1000)
         try:
             yield session
             await session.commit()
@@ -11,4 +32,4 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
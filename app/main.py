@@ -1,9 +1,18 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+from app.core.config import settings
 from app.api.v1.router import router as api_v1_router
-from app.db.base import init_db
+from app.db.base import init_db, close_db
+from app.crud.cache import catalog_cache
 from app.core.logging import setup_logging
+from app.services.model_registry import model_registry
+from app.services.batching import close_batchers
+from app.services.inference_executor import inference_executor
+from app.services.image_fetcher import image_fetcher
+from app.services.prediction_jobs import prediction_job_queue
+from app.services.custom_vision import custom_vision_client
 from loguru import logger
 import asyncio
 
@@ -14,11 +23,22 @@ async def lifespan(app: FastAPI):
     logger.info("Application starting up...")
     try:
         await init_db()
+        # 첫 요청이 모델 로드 비용을 치르지 않도록 미리 로드
+        await model_registry.warmup()
+        await prediction_job_queue.start()
+        await catalog_cache.start()
         yield
     except asyncio.CancelledError:
         logger.warning("Lifespan tasks cancelled")
     finally:
         # 종료 시 실행
+        await prediction_job_queue.stop()
+        await close_batchers()
+        inference_executor.shutdown()
+        await image_fetcher.close()
+        custom_vision_client.close()
+        await catalog_cache.close()
+        await close_db()
         logger.info("Application shutting down...")
 
 app = FastAPI(title="My API", lifespan=lifespan)
@@ -35,6 +55,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prediction-Backend"],  # 프론트엔드에서 읽는 응답 헤더
 )
 
-app.include_router(api_v1_router, prefix="/api/v1")
\ No newline at end of file
+app.include_router(api_v1_router, prefix="/api/v1")
+
+# 로컬 업로드 저장소를 쓸 때는 업로드한 이미지를 직접 서빙
+if settings.UPLOAD_BACKEND == "filesystem":
+    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_LOCAL_DIR, check_dir=False), name="uploads")
\ No newline at end of file
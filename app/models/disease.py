@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import List, TYPE_CHECKING
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, ForeignKey
+from sqlalchemy import String, Text, ForeignKey, Index
 from uuid import UUID
 from .base import Base
 
@@ -12,25 +12,28 @@ if TYPE_CHECKING:
 
 class Disease(Base):
     __tablename__ = "diseases"
+    # 목록 API keyset 페이지네이션 순서
+    __table_args__ = (Index("ix_diseases_created_at_id", "created_at", "id"),)
     
     name: Mapped[str] = mapped_column(String(100), index=True)
 
     type: Mapped[str] = mapped_column(String(100), index=True, nullable=True)
     
+    # 관계는 기본적으로 읽지 않고, 필요한 쿼리에서 selectinload 로 명시한다 (crud.disease.DISEASE_RELATIONS)
     details: Mapped[List["DiseaseDetail"]] = relationship(
         back_populates="disease",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="select"
     )
     hospitals: Mapped[List["Hospital"]] = relationship(
         back_populates="disease",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="select"
     )
     insurances: Mapped[List["Insurance"]] = relationship(
         back_populates="disease",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="select"
     )
 
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index
 from uuid import UUID
 from .base import Base
 
@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 class Hospital(Base):
     __tablename__ = "hospitals"
+    # 목록 API keyset 페이지네이션 순서
+    __table_args__ = (Index("ix_hospitals_created_at_id", "created_at", "id"),)
     
     disease_id: Mapped[UUID] = mapped_column(ForeignKey("diseases.id", ondelete="CASCADE"), nullable=False)
     hospital_name: Mapped[str] = mapped_column(String(200))
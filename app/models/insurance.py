@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey, Text
+from sqlalchemy import String, ForeignKey, Text, Index
 from uuid import UUID
 from .base import Base
 
@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 class Insurance(Base):
     __tablename__ = "insurances"
+    # 목록 API keyset 페이지네이션 순서
+    __table_args__ = (Index("ix_insurances_created_at_id", "created_at", "id"),)
     
     disease_id: Mapped[UUID] = mapped_column(ForeignKey("diseases.id", ondelete="CASCADE"), nullable=False)
     insurance_name: Mapped[str] = mapped_column(String(200))
@@ -13,7 +13,8 @@ class DiseaseDetailSchema(BaseModel):
     detail_value: str
     created_at: datetime
 
-class DiseaseSchema(BaseModel):
+class DiseaseSummarySchema(BaseModel):
+    """질병 테이블 컬럼만 (관계 없음)"""
     model_config = ConfigDict(from_attributes=True)
     
     id: UUID
@@ -21,7 +22,10 @@ class DiseaseSchema(BaseModel):
     type: Optional[str] = None
     created_at: datetime
     updated_at: datetime
-    details: List[DiseaseDetailSchema]
+
+class DiseaseSchema(DiseaseSummarySchema):
+    # include 로 요청하지 않은 관계는 채우지 않는다 (응답에서는 exclude_unset 으로 빠짐)
+    details: List[DiseaseDetailSchema] = []
     hospitals: List[HospitalSchema] = []
     insurances: List[InsuranceSchema] = []
 
@@ -43,3 +47,17 @@ class DiseaseUpdate(BaseModel):
     details: Optional[List[DiseaseDetailCreate]] = None
     hospitals: Optional[List[HospitalCreate]] = None
     insurances: Optional[List[InsuranceCreate]] = None
+
+
+class CatalogImportError(BaseModel):
+    line: int  # 레코드가 시작하는 줄 번호 (1부터)
+    error: str
+
+
+class CatalogImportResult(BaseModel):
+    imported: int = 0
+    skipped: int = 0  # 같은 type 의 질병이 이미 있어서 건너뛴 레코드 (mode=skip)
+    failed: int = 0
+    errors: List[CatalogImportError] = []
+    errors_truncated: bool = False  # CATALOG_IMPORT_MAX_ERRORS 를 넘은 오류는 개수만 센다
+    aborted: bool = False  # 도중에 멈췄으면 True (그 전까지 저장한 레코드는 imported 에 들어 있음)
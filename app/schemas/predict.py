@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+from app.schemas.disease import DiseaseSchema
 
 class ImagePredictionRequest(BaseModel):
     image_url: str
@@ -6,4 +8,23 @@ class ImagePredictionRequest(BaseModel):
 
 class PredictionResult(BaseModel):
     tag_name: str
-    probability: float
\ No newline at end of file
+    probability: float
+
+class EnrichedPredictionResult(PredictionResult):
+    disease: Optional[DiseaseSchema] = None  # tag_name 과 type 이 같은 질병 (병원/보험 포함), 없으면 None
+
+class BatchPredictionRequest(BaseModel):
+    items: List[ImagePredictionRequest] = Field(..., min_length=1)
+
+class BatchPredictionItemResult(BaseModel):
+    index: int  # 요청 items 에서의 위치
+    image_url: str
+    pet_type: str
+    status_code: int = 200
+    predictions: Optional[List[PredictionResult]] = None
+    error: Optional[str] = None
+
+class CombinedPredictionResult(BaseModel):
+    torch: Optional[List[PredictionResult]] = None
+    vision: Optional[List[PredictionResult]] = None
+    errors: Dict[str, str] = {}  # 실패한 백엔드 -> 오류 메시지
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Literal, Optional
+from .predict import ImagePredictionRequest, PredictionResult
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+class PredictionJobCreate(ImagePredictionRequest):
+    backend: Literal["torch", "vision"] = "torch"
+    priority: int = Field(0, ge=0, le=9, description="클수록 먼저 처리")
+
+class PredictionJobSchema(BaseModel):
+    id: str
+    status: JobStatus
+    backend: str
+    image_url: str
+    pet_type: str
+    priority: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    status_code: Optional[int] = None  # 실패 시 동기 API였다면 받았을 상태 코드
+    predictions: Optional[List[PredictionResult]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
@@ -1,12 +1,20 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class Upload(BaseModel):
     filename: str
     url: str
+    model_url: Optional[str] = None  # 모델 입력용 축소본 (짧은 변 256px)
+    thumbnail_url: Optional[str] = None
+    content_hash: Optional[str] = None  # 원본의 sha256 (같은 이미지는 같은 URL)
     class Config:
-        schema_extra = {
+        protected_namespaces = ()  # model_url 필드 허용
+        json_schema_extra = {
             "example": {
                 "filename": "example.jpg",
-                "url": "https://storage.blob.core.windows.net/container/uuid.jpg"
+                "url": "https://storage.blob.core.windows.net/container/9f86d0...0a08.jpg",
+                "model_url": "https://storage.blob.core.windows.net/container/9f86d0...0a08.model.jpg",
+                "thumbnail_url": "https://storage.blob.core.windows.net/container/9f86d0...0a08.thumb.jpg",
+                "content_hash": "9f86d0...0a08"
             }
         }
\ No newline at end of file
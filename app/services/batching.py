@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+import torch
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.predict import PredictionResult
+from app.services.model_registry import LoadedModel, model_registry
+from app.services.inference_executor import inference_executor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _PendingItem:
+    tensor: torch.Tensor
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher(Generic[T]):
+    """
+    요청마다 (C, H, W) 텐서를 큐에 넣고, max_batch_size가 차거나 max_wait_ms가 지나면
+    한 번의 forward로 묶어 처리한 뒤 결과를 각 요청에 돌려준다.
+
+    forward는 (N, C, H, W) 배치를 받아 N개의 결과 리스트를 반환하는 블로킹 함수이며
+    run_blocking(기본값 asyncio.to_thread)으로 이벤트 루프 밖에서 실행된다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        forward: Callable[[torch.Tensor], List[T]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        run_blocking: Callable[..., Awaitable] = asyncio.to_thread,
+    ):
+        self.name = name
+        self._forward = forward
+        self._run_blocking = run_blocking
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._queue_depth = metrics.gauge("inference_queue_depth", batcher=name)
+        self._batch_size = metrics.histogram("inference_batch_size", batcher=name)
+        self._wait_ms = metrics.histogram("inference_batch_wait_ms", batcher=name)
+        self._forward_ms = metrics.histogram("inference_forward_ms", batcher=name)
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, tensor: torch.Tensor) -> T:
+        queue = self._ensure_worker()
+        item = _PendingItem(tensor=tensor, future=asyncio.get_running_loop().create_future())
+        await queue.put(item)
+        self._queue_depth.set(queue.qsize())
+        return await item.future
+
+    async def _collect(self, queue: asyncio.Queue) -> List[_PendingItem]:
+        batch = [await queue.get()]
+        deadline = time.perf_counter() + self._max_wait
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # 마감 시간이 지났어도 이미 쌓여있는 요청은 같이 처리
+        while len(batch) < self._max_batch_size and not queue.empty():
+            batch.append(queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = await self._collect(queue)
+            self._queue_depth.set(queue.qsize())
+            batch = [item for item in batch if not item.future.cancelled()]
+            if not batch:
+                continue
+
+            flushed_at = time.perf_counter()
+            self._batch_size.observe(len(batch))
+            for item in batch:
+                self._wait_ms.observe((flushed_at - item.enqueued_at) * 1000)
+
+            try:
+                inputs = torch.stack([item.tensor for item in batch])
+                results = await self._execute(inputs)
+            except Exception as e:
+                logger.error(f"Batched inference failed ({self.name}, size={len(batch)}): {str(e)}")
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                continue
+            self._forward_ms.observe((time.perf_counter() - flushed_at) * 1000)
+
+            for item, result in zip(batch, results):
+                if not item.future.done():
+                    item.future.set_result(result)
+
+    async def _execute(self, inputs: torch.Tensor) -> List[T]:
+        return await self._run_blocking(self._forward, inputs)
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+
+def predict_topk(loaded: LoadedModel, inputs: torch.Tensor, k: int = 3) -> List[List[PredictionResult]]:
+    """(N, C, H, W) 배치를 한 번에 추론하고 항목별 상위 k개 결과를 반환"""
+    if loaded.channels_last:
+        inputs = inputs.contiguous(memory_format=torch.channels_last)
+    with torch.no_grad():
+        outputs = loaded.model(inputs)
+        # 앙상블인 경우 이미 평균 처리됨
+        probs = torch.softmax(outputs, dim=1)
+
+    # 만약 클래스 수가 k개 미만인 경우도 대비하려면 min() 처리
+    topk = min(k, len(loaded.labels))
+    top_probs, top_idxs = torch.topk(probs, topk, dim=1)
+
+    return [
+        [
+            PredictionResult(tag_name=loaded.labels[idx], probability=prob)
+            for prob, idx in zip(row_probs, row_idxs)
+        ]
+        for row_probs, row_idxs in zip(top_probs.tolist(), top_idxs.tolist())
+    ]
+
+
+_batchers: Dict[str, MicroBatcher[List[PredictionResult]]] = {}
+
+
+def get_batcher(pet_type: str) -> MicroBatcher[List[PredictionResult]]:
+    batcher = _batchers.get(pet_type)
+    if batcher is None:
+        batcher = MicroBatcher(
+            name=f"torch-{pet_type}",
+            forward=lambda inputs: predict_topk(model_registry.get_sync(pet_type), inputs),
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+            run_blocking=inference_executor.run,
+        )
+        _batchers[pet_type] = batcher
+    return batcher
+
+
+async def close_batchers() -> None:
+    for batcher in _batchers.values():
+        await batcher.close()
+    _batchers.clear()
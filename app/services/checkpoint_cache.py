@@ -0,0 +1,261 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional, Protocol
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작 (워커 1개일 때만 안전)
+    fcntl = None
+
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotModifiedError
+from azure.storage.blob import BlobServiceClient, ContainerClient
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class BlobSource(Protocol):
+    """체크포인트/라벨 파일을 내려받을 원본 저장소"""
+
+    def download_to(self, name: str, stream: BinaryIO, if_none_match: Optional[str] = None) -> Optional[str]:
+        """
+        stream에 blob 내용을 쓰고 새 ETag를 반환한다.
+        if_none_match와 ETag가 같으면(변경 없음) 아무것도 쓰지 않고 None을 반환한다.
+        """
+        ...
+
+
+class AzureBlobSource:
+    def __init__(self, container_client: ContainerClient):
+        self._container_client = container_client
+
+    def download_to(self, name: str, stream: BinaryIO, if_none_match: Optional[str] = None) -> Optional[str]:
+        blob_client = self._container_client.get_blob_client(name)
+        try:
+            if if_none_match:
+                downloader = blob_client.download_blob(etag=if_none_match, match_condition=MatchConditions.IfModified)
+            else:
+                downloader = blob_client.download_blob()
+        except ResourceNotModifiedError:
+            return None
+        downloader.readinto(stream)
+        return downloader.properties.etag
+
+
+class LocalBlobSource:
+    """로컬 디렉토리를 blob 컨테이너처럼 사용하는 대체 구현 (개발/테스트용)"""
+
+    def __init__(self, root: str):
+        self._root = Path(root)
+
+    def etag(self, name: str) -> str:
+        stat = (self._root / name).stat()
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def download_to(self, name: str, stream: BinaryIO, if_none_match: Optional[str] = None) -> Optional[str]:
+        etag = self.etag(name)
+        if if_none_match == etag:
+            return None
+        with open(self._root / name, "rb") as f:
+            shutil.copyfileobj(f, stream, _CHUNK_SIZE)
+        return etag
+
+
+@dataclass
+class CacheEntry:
+    etag: str
+    sha256: str
+    size: int
+    validated_at: float
+    last_access: float
+
+
+class _HashingWriter:
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.hasher.update(data)
+        self.size += len(data)
+        return self._stream.write(data)
+
+
+class CheckpointCache:
+    """
+    Blob에 있는 체크포인트/라벨 파일을 로컬 디스크에 캐시한다.
+    - objects/{sha256} 에 내용 주소 방식으로 저장 (임시 파일에 쓴 뒤 os.replace로 원자적 교체)
+    - index.json 에 blob 이름 -> ETag/해시 매핑 보관
+    - revalidate_seconds 안에 검증된 항목은 stat()만으로 사용, 이후에는 ETag 조건부 요청으로 재검증
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 쓰지 않은 객체부터 삭제 (LRU)
+    - 여러 워커가 같은 디렉토리를 공유할 수 있다. index.json 은 lock 파일에 flock 을 잡고 다시 읽어서
+      자기 변경만 합친 뒤 저장하고, 최근 grace_seconds 안에 쓰였거나 만들어진 객체는 지우지 않는다
+      (다른 워커가 막 내려받았거나 torch.load 로 여는 중일 수 있음)
+    """
+
+    def __init__(
+        self,
+        source: BlobSource,
+        cache_dir: str,
+        max_bytes: int,
+        revalidate_seconds: float,
+        grace_seconds: float = 600,
+    ):
+        self._source = source
+        self._root = Path(cache_dir)
+        self._objects = self._root / "objects"
+        self._index_path = self._root / "index.json"
+        self._lock_path = self._root / ".lock"
+        self._max_bytes = max_bytes
+        self._revalidate_seconds = revalidate_seconds
+        self._grace_seconds = grace_seconds
+        self._lock = threading.Lock()
+        self._objects.mkdir(parents=True, exist_ok=True)
+
+    def get_path(self, name: str) -> Path:
+        with self._locked():
+            entry = self._load_index().get(name)
+            now = time.time()
+            path = self._objects / entry.sha256 if entry else None
+            if entry and path.exists() and now - entry.validated_at < self._revalidate_seconds:
+                self._update_entry(name, lambda e: setattr(e, "last_access", now))
+                return path
+            known_etag = entry.etag if entry and path.exists() else None
+
+        path = self._download(name, known_etag)
+        if path is None:
+            # 재검증하는 사이에 다른 워커가 객체를 지웠으면 조건 없이 다시 받는다
+            path = self._download(name, None)
+        return path
+
+    def read_bytes(self, name: str) -> bytes:
+        return self.get_path(name).read_bytes()
+
+    def _download(self, name: str, known_etag: Optional[str]) -> Optional[Path]:
+        # 내려받는 동안에는 잠그지 않는다 (다른 워커가 다른 파일을 쓰는 것을 막지 않도록)
+        fd, tmp_name = tempfile.mkstemp(dir=self._root, prefix=".download-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                writer = _HashingWriter(tmp)
+                etag = self._source.download_to(name, writer, if_none_match=known_etag)
+
+            with self._locked():
+                index = self._load_index()
+                now = time.time()
+                if etag is None:
+                    entry = index.get(name)
+                    if entry is None or not (self._objects / entry.sha256).exists():
+                        return None
+                    logger.info(f"Checkpoint cache revalidated: {name}")
+                    entry.validated_at = entry.last_access = now
+                else:
+                    sha256 = writer.hasher.hexdigest()
+                    os.replace(tmp_name, self._objects / sha256)
+                    logger.info(f"Checkpoint cache stored: {name} ({writer.size} bytes, etag={etag})")
+                    entry = CacheEntry(etag=etag, sha256=sha256, size=writer.size, validated_at=now, last_access=now)
+                    index[name] = entry
+                self._evict(index, keep=entry.sha256)
+                self._save_index(index)
+                return self._objects / entry.sha256
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    @contextmanager
+    def _locked(self):
+        """같은 프로세스의 스레드끼리는 threading.Lock, 워커(프로세스)끼리는 lock 파일 flock 으로 직렬화"""
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _update_entry(self, name: str, update: Callable[[CacheEntry], None]) -> None:
+        # 잠금 안에서 호출: 디스크의 최신 인덱스에 이 항목 변경만 반영
+        index = self._load_index()
+        entry = index.get(name)
+        if entry is not None:
+            update(entry)
+            self._save_index(index)
+
+    def _evict(self, index: Dict[str, CacheEntry], keep: str) -> None:
+        # 같은 내용을 여러 이름이 공유할 수 있으므로 객체 단위로 최근 사용 시각을 계산
+        objects: Dict[str, CacheEntry] = {}
+        for entry in index.values():
+            current = objects.get(entry.sha256)
+            if current is None or entry.last_access > current.last_access:
+                objects[entry.sha256] = entry
+
+        now = time.time()
+        # 인덱스에 없는 객체(쓰다 만 파일 등)는 유예 시간이 지난 것만 정리
+        for path in self._objects.iterdir():
+            if path.name in objects:
+                continue
+            try:
+                if now - path.stat().st_mtime >= self._grace_seconds:
+                    path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+
+        total = sum(entry.size for entry in objects.values())
+        for sha256, entry in sorted(objects.items(), key=lambda item: item[1].last_access):
+            if total <= self._max_bytes:
+                break
+            if sha256 == keep or now - entry.last_access < self._grace_seconds:
+                continue
+            (self._objects / sha256).unlink(missing_ok=True)
+            for name in [name for name, e in index.items() if e.sha256 == sha256]:
+                del index[name]
+            total -= entry.size
+            logger.info(f"Checkpoint cache evicted: {sha256} ({entry.size} bytes)")
+
+    def _load_index(self) -> Dict[str, CacheEntry]:
+        try:
+            raw = json.loads(self._index_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+        return {name: CacheEntry(**entry) for name, entry in raw.items()}
+
+    def _save_index(self, index: Dict[str, CacheEntry]) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self._root, prefix=".index-")
+        with os.fdopen(fd, "w") as f:
+            json.dump({name: asdict(entry) for name, entry in index.items()}, f)
+        os.replace(tmp_name, self._index_path)
+
+
+_checkpoint_cache: Optional[CheckpointCache] = None
+
+
+def get_checkpoint_cache() -> CheckpointCache:
+    global _checkpoint_cache
+    if _checkpoint_cache is None:
+        if settings.MODEL_BLOB_LOCAL_DIR:
+            source = LocalBlobSource(settings.MODEL_BLOB_LOCAL_DIR)
+        else:
+            blob_service_client = BlobServiceClient.from_connection_string(settings.BLOB_CONNECTION_STRING)
+            source = AzureBlobSource(blob_service_client.get_container_client(settings.BLOB_CONTAINER_NAME))
+        _checkpoint_cache = CheckpointCache(
+            source=source,
+            cache_dir=settings.CHECKPOINT_CACHE_DIR,
+            max_bytes=settings.CHECKPOINT_CACHE_MAX_BYTES,
+            revalidate_seconds=settings.CHECKPOINT_CACHE_REVALIDATE_SECONDS,
+            grace_seconds=settings.CHECKPOINT_CACHE_EVICT_GRACE_SECONDS,
+        )
+    return _checkpoint_cache
@@ -0,0 +1,230 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from azure.cognitiveservices.vision.customvision.prediction import CustomVisionPredictionClient
+from fastapi import HTTPException, status
+from msrest.authentication import ApiKeyCredentials
+from msrest.exceptions import ClientRequestError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# 잠시 후 다시 시도하면 성공할 수 있는 응답
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# URL 분류에서 Custom Vision 이 이미지를 가져오지 못했을 때의 오류 코드 (바이트로 보내면 성공할 수 있음)
+IMAGE_URL_ERROR_CODES = {"BadRequestImageUrl"}
+
+
+class ImageUrlUnreadableError(HTTPException):
+    """Custom Vision 이 넘겨받은 이미지 URL 을 읽지 못함"""
+
+
+def create_prediction_client(endpoint: str, prediction_key: str) -> CustomVisionPredictionClient:
+    credentials = ApiKeyCredentials(in_headers={"Prediction-key": prediction_key})
+    client = CustomVisionPredictionClient(endpoint=endpoint, credentials=credentials)
+    # 재시도는 CustomVisionClient 에서 직접 하므로 SDK 자체 재시도는 끈다
+    client.config.retry_policy.retries = 0
+    # keep_alive 가 꺼져 있으면 SDK가 요청마다 HTTP 세션을 닫아서 연결을 재사용하지 못한다
+    client.config.keep_alive = True
+    return client
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    # CustomVisionErrorException.error 는 응답 본문의 CustomVisionError(code, message)
+    return getattr(getattr(error, "error", None), "code", None)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class CustomVisionClient:
+    """
+    엔드포인트 하나에 대해 프로세스 전체가 공유하는 Custom Vision 예측 클라이언트
+    - SDK 클라이언트(HTTP 연결 풀)를 한 번만 만들어 재사용
+    - 동기 SDK 호출은 전용 스레드 풀에서 실행하고, 동시에 max_concurrency 개까지만 보낸다
+      (SDK의 HTTP 세션은 스레드별이라 스레드 수를 고정해야 세션/연결이 재사용된다)
+    - 호출마다 timeout_seconds 제한, 429/5xx/타임아웃은 jitter 백오프로 max_retries 번까지 재시도
+    - 재시도해도 429/5xx 가 계속되면 503 + Retry-After, 이런 호출이 이어지면 circuit breaker가 열려 한동안 바로 503을 반환
+    - URL 분류에서 Custom Vision 이 이미지를 읽지 못한 경우만 ImageUrlUnreadableError 로 구분
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        prediction_key: str,
+        max_concurrency: int,
+        timeout_seconds: float,
+        max_retries: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        breaker: CircuitBreaker,
+        client_factory: Callable[[str, str], Any] = create_prediction_client,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self._endpoint = endpoint
+        self._prediction_key = prediction_key
+        self._max_concurrency = max_concurrency
+        self._timeout_seconds = timeout_seconds
+        self._max_retries = max_retries
+        self._backoff_base_seconds = backoff_base_seconds
+        self._backoff_max_seconds = backoff_max_seconds
+        self._breaker = breaker
+        self._client_factory = client_factory
+        self._sleep = sleep
+
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._limiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="custom-vision")
+
+        self._latency = metrics.histogram("custom_vision_ms")
+        self._retries = metrics.counter("custom_vision_retries_total")
+        self._errors = metrics.counter("custom_vision_errors_total")
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = self._client_factory(self._endpoint, self._prediction_key)
+            return self._client
+
+    def _get_limiter(self) -> asyncio.Semaphore:
+        # 세마포어는 이벤트 루프에 묶이므로 루프가 바뀌면(테스트 등) 새로 만든다
+        loop = asyncio.get_running_loop()
+        if self._limiter is None or self._limiter[0] is not loop:
+            self._limiter = (loop, asyncio.Semaphore(self._max_concurrency))
+        return self._limiter[1]
+
+    async def classify_image(self, project_id: str, published_name: str, image_data: bytes):
+        return await self._call(
+            "classify_image",
+            project_id=project_id,
+            published_name=published_name,
+            image_data=image_data,
+        )
+
+    async def classify_image_url(self, project_id: str, published_name: str, url: str):
+        """Custom Vision이 이미지를 직접 가져가도록 URL만 보낸다 (공개 URL이어야 함)"""
+        return await self._call(
+            "classify_image_url",
+            project_id=project_id,
+            published_name=published_name,
+            url=url,
+        )
+
+    async def _call(self, operation: str, **kwargs):
+        try:
+            self._breaker.before_call()
+        except CircuitOpenError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="예측 서비스가 일시적으로 불안정합니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": str(max(int(e.retry_after), 1))},
+            ) from e
+
+        attempt = 0
+        while True:
+            try:
+                result = await self._call_once(operation, **kwargs)
+                self._breaker.record_success()
+                return result
+            except Exception as e:
+                code = _status_code(e)
+                is_timeout = isinstance(e, asyncio.TimeoutError)
+                # ClientRequestError: 연결 실패/읽기 타임아웃 등 응답을 받지 못한 경우
+                retryable = is_timeout or code in RETRYABLE_STATUS_CODES or isinstance(e, (ClientRequestError, OSError))
+
+                if not retryable:
+                    # 잘못된 이미지 등 요청 자체의 문제는 upstream 장애로 보지 않는다
+                    self._breaker.record_success()
+                    raise self._to_http_exception(e, exhausted=False)
+                if attempt >= self._max_retries:
+                    logger.error(f"Custom Vision {operation} 실패 (status: {code or type(e).__name__}): {str(e)}")
+                    self._errors.inc()
+                    self._breaker.record_failure()
+                    raise self._to_http_exception(e, exhausted=True)
+
+                delay = _retry_after(e) if code == 429 else None
+                if delay is None:
+                    delay = backoff_delay(attempt, self._backoff_base_seconds, self._backoff_max_seconds)
+                logger.warning(f"Custom Vision {operation} 재시도 ({attempt + 1}/{self._max_retries}, status: {code or type(e).__name__})")
+                self._retries.inc()
+                attempt += 1
+                await self._sleep(min(delay, self._backoff_max_seconds))
+
+    async def _call_once(self, operation: str, **kwargs):
+        async with self._get_limiter():
+            client = self._get_client()
+            started = time.perf_counter()
+            try:
+                # requests 타임아웃으로 스레드도 곧 끝나고, wait_for는 그 전에라도 응답을 돌려주기 위한 상한
+                call = functools.partial(getattr(client, operation), timeout=self._timeout_seconds, **kwargs)
+                return await asyncio.wait_for(
+                    asyncio.get_running_loop().run_in_executor(self._executor, call),
+                    timeout=self._timeout_seconds,
+                )
+            finally:
+                self._latency.observe((time.perf_counter() - started) * 1000)
+
+    def _to_http_exception(self, error: Exception, exhausted: bool) -> HTTPException:
+        if isinstance(error, asyncio.TimeoutError):
+            return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="예측 서비스 응답 시간 초과")
+        if exhausted:
+            # 429/5xx/연결 실패가 재시도 후에도 계속됨: upstream 이 바쁘거나 불안정하므로 나중에 다시 시도하도록
+            retry_after = _retry_after(error) or self._backoff_max_seconds
+            return HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="예측 서비스가 일시적으로 불안정합니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": str(max(int(retry_after), 1))},
+            )
+        if _error_code(error) in IMAGE_URL_ERROR_CODES:
+            return ImageUrlUnreadableError(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"예측 서비스가 이미지 URL 을 읽지 못했습니다: {str(error)}"
+            )
+        return HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"예측 서비스 오류: {str(error)}"
+        )
+
+    def close(self) -> None:
+        with self._client_lock:
+            self._client = None
+        # 스레드별 HTTP 세션은 스레드와 함께 정리된다
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix="custom-vision")
+
+
+custom_vision_client = CustomVisionClient(
+    endpoint=settings.PREDICTION_ENDPOINT,
+    prediction_key=settings.PREDICTION_KEY,
+    max_concurrency=settings.CUSTOM_VISION_MAX_CONCURRENCY,
+    timeout_seconds=settings.CUSTOM_VISION_TIMEOUT_SECONDS,
+    max_retries=settings.CUSTOM_VISION_MAX_RETRIES,
+    backoff_base_seconds=settings.CUSTOM_VISION_BACKOFF_BASE_SECONDS,
+    backoff_max_seconds=settings.CUSTOM_VISION_BACKOFF_MAX_SECONDS,
+    breaker=CircuitBreaker(
+        "custom_vision",
+        failure_threshold=settings.CUSTOM_VISION_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.CUSTOM_VISION_BREAKER_RESET_SECONDS,
+    ),
+)
@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import posixpath
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Awaitable, BinaryIO, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.upload_storage import UploadStorage, upload_storage
+
+# 업로드를 허용하는 실제 이미지 형식 (확장자가 아니라 디코더가 판단한 형식)
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF"}
+
+MODEL_DERIVATIVE = "model"
+THUMBNAIL_DERIVATIVE = "thumb"
+
+# 파일 시그니처 -> 저장할 확장자 (PIL 디코더가 형식을 판단하는 것과 같은 시그니처)
+_SIGNATURE_EXTENSIONS = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+_SIGNATURE_BYTES = max(len(signature) for signature, _ in _SIGNATURE_EXTENSIONS)
+
+
+def image_extension(head: bytes, fallback: str) -> str:
+    """
+    내용의 앞부분으로 정한 확장자. 클라이언트 파일 이름(.jpeg/.JPG 등)과 무관하게 같은 형식은 같은 확장자라
+    같은 이미지가 확장자만 다른 이름으로 두 번 저장되지 않는다. 알 수 없는 형식이면 fallback
+    """
+    for signature, ext in _SIGNATURE_EXTENSIONS:
+        if head.startswith(signature):
+            return ext
+    return fallback
+
+
+def derivative_name(name: str, kind: str) -> str:
+    """원본 blob 이름 옆에 저장할 파생 이미지 이름: {uuid}.jpg -> {uuid}.model.jpg"""
+    return f"{posixpath.splitext(name)[0]}.{kind}.jpg"
+
+
+def derivative_url(url: str, kind: str) -> str:
+    # SAS 토큰 등 쿼리 문자열은 그대로 두고 경로의 파일 이름만 바꾼다
+    parts = urlsplit(url)
+    head, _, name = parts.path.rpartition("/")
+    return urlunsplit(parts._replace(path=f"{head}/{derivative_name(name, kind)}"))
+
+
+@dataclass
+class ImageDerivatives:
+    format: str
+    width: int
+    height: int
+    model: bytes  # 짧은 변이 model_size 인 JPEG (EXIF 회전 적용)
+    thumbnail: bytes  # 긴 변이 thumbnail_size 이하인 JPEG
+
+
+def _encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def make_derivatives(source: BinaryIO, model_size: int, thumbnail_size: int) -> ImageDerivatives:
+    """
+    실제로 디코딩해서 이미지인지 확인하고 EXIF 방향을 적용한 모델용 축소본과 썸네일을 만든다.
+    이미지가 아니거나 깨졌으면 ValueError
+    """
+    try:
+        with Image.open(source) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise ValueError(f"지원되지 않는 이미지 형식: {image.format}")
+            image_format = image.format
+            if image_format == "JPEG":
+                # 큰 사진도 필요한 해상도(의 2배)까지만 축소 디코딩
+                image.draft("RGB", (model_size * 2, model_size * 2))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ValueError(f"이미지를 읽을 수 없습니다: {str(e)}") from e
+
+    width, height = image.size
+    scale = model_size / min(width, height)
+    model_image = image
+    if scale < 1:
+        model_image = image.resize((max(round(width * scale), 1), max(round(height * scale), 1)), Image.LANCZOS)
+
+    thumbnail = model_image.copy()
+    thumbnail.thumbnail((thumbnail_size, thumbnail_size), Image.LANCZOS)
+
+    return ImageDerivatives(
+        format=image_format,
+        width=width,
+        height=height,
+        model=_encode_jpeg(model_image, quality=90),
+        thumbnail=_encode_jpeg(thumbnail, quality=80),
+    )
+
+
+async def _iter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+async def _peek(chunks: AsyncIterator[bytes]) -> Tuple[bytes, AsyncIterator[bytes]]:
+    """첫 조각과, 그 조각부터 다시 시작하는 스트림"""
+    first = b""
+    async for chunk in chunks:
+        first = chunk
+        break
+
+    async def rest() -> AsyncIterator[bytes]:
+        if first:
+            yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return first, rest()
+
+
+async def _iter_file(file: BinaryIO, chunk_size: int) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await asyncio.to_thread(file.read, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+@dataclass
+class StoredUpload:
+    url: str
+    model_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    content_hash: Optional[str] = None  # 원본의 sha256
+
+
+def upload_content_hash(url: str) -> Optional[str]:
+    """내용 해시로 이름 붙인 업로드 URL이면 그 해시 ({sha256}.jpg, {sha256}.model.jpg)"""
+    name = urlsplit(url).path.rpartition("/")[2].split(".", 1)[0]
+    if len(name) == 64 and all(c in "0123456789abcdef" for c in name):
+        return name
+    return None
+
+
+def _write_and_hash(spool: Optional[BinaryIO], digest, chunk: bytes) -> None:
+    # 해시 계산은 GIL을 놓으므로 쓰기와 함께 스레드에서 한다
+    digest.update(chunk)
+    if spool is not None:
+        spool.write(chunk)
+
+
+class UploadPipeline:
+    """
+    업로드 이미지의 sha256을 계산하고 검증/파생 이미지 생성을 위한 사본을 임시 저장(spool)한다.
+    - deduplicate=False(기본 설정): 이름({uuid}{ext})을 미리 정할 수 있으므로 받는 대로 블록 단위로 저장소에 올리고,
+      해시 계산과 spool 쓰기는 그동안 스레드에서 함께 한다. 다 받은 뒤 spool 을 디코딩해서 검증하고
+      이미지가 아니면 올린 원본을 지운다.
+    - deduplicate=True: blob 이름을 {sha256}{ext} 로 정하므로 해시가 나올 때까지(다 받을 때까지) spool 에 모은 뒤 올린다.
+      이미 있는 이미지면 쓰지 않고 기존 URL을 돌려준다 (최근 업로드는 해시 -> URL 인덱스, 그 외에는 저장소에 존재 여부 확인)
+    - derivatives: 디코딩으로 검증하고, 원본 옆에 모델용 축소본과 썸네일을 함께 저장한다
+    원본은 spool_memory_bytes 까지만 메모리에 두고 나머지는 임시 파일에 받는다.
+    """
+
+    def __init__(
+        self,
+        storage: UploadStorage,
+        model_size: int,
+        thumbnail_size: int,
+        spool_memory_bytes: int,
+        derivatives: bool = True,
+        deduplicate: bool = True,
+        index_size: int = 10000,
+        chunk_size: int = 1024 * 1024,
+    ):
+        self._storage = storage
+        self._model_size = model_size
+        self._thumbnail_size = thumbnail_size
+        self._spool_memory_bytes = spool_memory_bytes
+        self._derivatives = derivatives
+        self._deduplicate = deduplicate
+        self._index_size = index_size
+        self._chunk_size = chunk_size
+        self._index: "OrderedDict[str, StoredUpload]" = OrderedDict()
+        self._process_ms = metrics.histogram("upload_derivatives_ms")
+        self._dedup_hits = metrics.counter("upload_dedup_hits_total")
+
+    async def save(self, file_ext: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> StoredUpload:
+        """file_ext 는 내용으로 형식을 알 수 없을 때만 쓴다 (저장 확장자는 image_extension 으로 정함)"""
+        if not self._deduplicate:
+            first, chunks = await _peek(chunks)
+            return await self._stream(f"{uuid.uuid4()}{image_extension(first, file_ext)}", chunks, content_type)
+
+        with SpooledTemporaryFile(max_size=self._spool_memory_bytes) as spool:
+            digest = hashlib.sha256()
+            async for chunk in chunks:
+                await asyncio.to_thread(_write_and_hash, spool, digest, chunk)
+            image_hash = digest.hexdigest()
+            spool.seek(0)
+            file_ext = image_extension(spool.read(_SIGNATURE_BYTES), file_ext)
+
+            stored = self._index.get(image_hash)
+            if stored is not None:
+                self._index.move_to_end(image_hash)
+                self._dedup_hits.inc()
+                return stored
+
+            name = f"{image_hash}{file_ext}"
+            original_exists = await self._storage.exists(name)
+            if original_exists and (
+                not self._derivatives or await self._storage.exists(derivative_name(name, MODEL_DERIVATIVE))
+            ):
+                self._dedup_hits.inc()
+                stored = self._existing(name, image_hash)
+            else:
+                stored = await self._store(name, spool, content_type, image_hash, skip_original=original_exists)
+
+        self._index[image_hash] = stored
+        if len(self._index) > self._index_size:
+            self._index.popitem(last=False)
+        return stored
+
+    def _existing(self, name: str, image_hash: str) -> StoredUpload:
+        prefix = self._storage.url_prefix
+        stored = StoredUpload(url=f"{prefix}{name}", content_hash=image_hash)
+        if self._derivatives:
+            stored.model_url = f"{prefix}{derivative_name(name, MODEL_DERIVATIVE)}"
+            stored.thumbnail_url = f"{prefix}{derivative_name(name, THUMBNAIL_DERIVATIVE)}"
+        return stored
+
+    async def _stream(self, name: str, chunks: AsyncIterator[bytes], content_type: Optional[str]) -> StoredUpload:
+        with SpooledTemporaryFile(max_size=self._spool_memory_bytes) as spool:
+            digest = hashlib.sha256()
+            copy = spool if self._derivatives else None
+
+            async def tee() -> AsyncIterator[bytes]:
+                async for chunk in chunks:
+                    # 이 조각을 해시/spool 에 쓰는 동안 앞서 넘긴 블록은 저장소로 올라가는 중
+                    await asyncio.to_thread(_write_and_hash, copy, digest, chunk)
+                    yield chunk
+
+            url = await self._storage.save(name, tee(), content_type=content_type)
+            stored = StoredUpload(url=url, content_hash=digest.hexdigest())
+            if self._derivatives:
+                try:
+                    saves = await self._derivative_saves(name, spool)
+                except ValueError:
+                    await self._storage.delete(name)
+                    raise
+                stored.model_url, stored.thumbnail_url = await asyncio.gather(*saves.values())
+        return stored
+
+    async def _derivative_saves(self, name: str, spool: BinaryIO) -> Dict[str, Awaitable[str]]:
+        """spool 을 디코딩해서 검증하고 (이미지가 아니면 ValueError) 파생 이미지 저장 작업을 돌려준다"""
+        spool.seek(0)
+        started = asyncio.get_running_loop().time()
+        derivatives = await asyncio.to_thread(make_derivatives, spool, self._model_size, self._thumbnail_size)
+        self._process_ms.observe((asyncio.get_running_loop().time() - started) * 1000)
+        return {
+            "model_url": self._storage.save(
+                derivative_name(name, MODEL_DERIVATIVE), _iter_bytes(derivatives.model), content_type="image/jpeg"
+            ),
+            "thumbnail_url": self._storage.save(
+                derivative_name(name, THUMBNAIL_DERIVATIVE), _iter_bytes(derivatives.thumbnail), content_type="image/jpeg"
+            ),
+        }
+
+    async def _store(
+        self,
+        name: str,
+        spool: BinaryIO,
+        content_type: Optional[str],
+        image_hash: str,
+        skip_original: bool = False,
+    ) -> StoredUpload:
+        stored = StoredUpload(url=f"{self._storage.url_prefix}{name}", content_hash=image_hash)
+        saves = await self._derivative_saves(name, spool) if self._derivatives else {}
+        if not skip_original:
+            spool.seek(0)
+            saves["url"] = self._storage.save(name, _iter_file(spool, self._chunk_size), content_type=content_type)
+
+        for field_name, url in zip(saves, await asyncio.gather(*saves.values())):
+            setattr(stored, field_name, url)
+        return stored
+
+
+upload_pipeline = UploadPipeline(
+    storage=upload_storage,
+    model_size=settings.UPLOAD_MODEL_DERIVATIVE_SIZE,
+    thumbnail_size=settings.UPLOAD_THUMBNAIL_SIZE,
+    spool_memory_bytes=settings.UPLOAD_SPOOL_MEMORY_BYTES,
+    derivatives=settings.UPLOAD_DERIVATIVES_ENABLED,
+    deduplicate=settings.UPLOAD_DEDUP_ENABLED,
+    index_size=settings.UPLOAD_DEDUP_INDEX_SIZE,
+)
@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.image_derivatives import MODEL_DERIVATIVE, derivative_url
+from app.services.singleflight import SingleFlight
+from app.services.upload_storage import upload_storage
+
+logger = logging.getLogger(__name__)
+
+
+class ImageNotFoundError(HTTPException):
+    """이미지 URL 이 404 (요청한 쪽의 잘못이라 400 으로 응답)"""
+
+
+@dataclass
+class FetchedImage:
+    url: str
+    data: bytes
+    content_type: Optional[str] = None
+
+
+@lru_cache(maxsize=1)
+def hosted_image_url_prefix() -> Optional[str]:
+    """업로드 API가 돌려주는 이미지 URL의 접두사 (우리 Blob Storage에 있는 이미지인지 판단용)"""
+    try:
+        return upload_storage.url_prefix
+    except Exception as e:
+        logger.warning(f"업로드 스토리지 URL을 알 수 없습니다: {str(e)}")
+        return None
+
+
+def is_hosted_image_url(url: str) -> bool:
+    prefix = hosted_image_url_prefix()
+    return prefix is not None and url.startswith(prefix)
+
+
+class FetchedImageBuffer:
+    """
+    최근에 받은 이미지를 URL 기준으로 잠깐 보관하는 LRU 버퍼
+    같은 이미지를 여러 백엔드(torch, Custom Vision)나 연달아 오는 요청이 다시 다운로드하지 않도록 한다.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, FetchedImage]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[FetchedImage]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            expires_at, image = entry
+            if expires_at <= self._clock():
+                self._remove(url)
+                return None
+            self._entries.move_to_end(url)
+            return image
+
+    def put(self, image: FetchedImage) -> None:
+        if len(image.data) > self._max_bytes:
+            return
+        with self._lock:
+            if image.url in self._entries:
+                self._remove(image.url)
+            self._entries[image.url] = (self._clock() + self._ttl_seconds, image)
+            self._bytes += len(image.data)
+            while self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, url: str) -> None:
+        _, image = self._entries.pop(url)
+        self._bytes -= len(image.data)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+
+class ImageFetcher:
+    """
+    image_url 다운로드용 공유 비동기 HTTP 클라이언트
+    - keep-alive 커넥션 풀, 호스트별 동시 연결 수 제한
+    - connect/read 타임아웃
+    - 스트리밍으로 받으면서 max_bytes 초과 시 즉시 중단
+    - 같은 URL 동시 다운로드는 한 번으로 합치고, 받은 이미지는 buffer에 잠깐 보관
+    - prefer_derivatives 이면 추론용 이미지는 업로드 때 만든 모델용 축소본을 먼저 받는다
+    """
+
+    # 축소본이 없다고 확인된 원본 URL을 기억해 두는 최대 개수 (업로드 파이프라인 도입 전 이미지)
+    MAX_MISSING_DERIVATIVES = 4096
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_connections_per_host: int,
+        connect_timeout: float,
+        read_timeout: float,
+        max_bytes: int,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        buffer: Optional[FetchedImageBuffer] = None,
+        prefer_derivatives: bool = False,
+    ):
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._max_connections_per_host = max_connections_per_host
+        self._max_bytes = max_bytes
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buffer = buffer
+        self._flight = SingleFlight("image_fetch")
+        self._prefer_derivatives = prefer_derivatives
+        self._missing_derivatives: "OrderedDict[str, None]" = OrderedDict()
+
+        self._fetch_ms = metrics.histogram("image_fetch_ms")
+        self._fetch_bytes = metrics.histogram("image_fetch_bytes")
+        self._fetch_errors = metrics.counter("image_fetch_errors_total")
+        self._buffer_hits = metrics.counter("image_buffer_hits_total")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # 커넥션 풀은 이벤트 루프에 묶이므로 루프가 바뀌면 새로 만든다
+            self._loop = loop
+            self._host_limits = {}
+            self._client = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=self._timeout,
+                follow_redirects=True,
+                transport=self._transport,
+            )
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self._max_connections_per_host)
+        return limit
+
+    async def fetch(self, url: str) -> FetchedImage:
+        if self._buffer is not None:
+            image = self._buffer.get(url)
+            if image is not None:
+                self._buffer_hits.inc()
+                return image
+        return await self._flight.do(url, lambda: self._download(url))
+
+    async def fetch_model_image(self, url: str) -> FetchedImage:
+        """추론에 쓸 이미지. 업로드 스토리지 이미지에 모델용 축소본이 있으면 원본 대신 그것을 받는다."""
+        if not self._prefer_derivatives or url in self._missing_derivatives or not is_hosted_image_url(url):
+            return await self.fetch(url)
+        try:
+            return await self.fetch(derivative_url(url, MODEL_DERIVATIVE))
+        except ImageNotFoundError:
+            # 축소본이 없는 이미지(업로드 파이프라인 도입 전)는 기억해 두고 다음부터 바로 원본
+            self._missing_derivatives[url] = None
+            if len(self._missing_derivatives) > self.MAX_MISSING_DERIVATIVES:
+                self._missing_derivatives.popitem(last=False)
+        except HTTPException as e:
+            # 일시적인 실패(연결 오류, 스토리지 5xx)는 이번만 원본으로, 시간 초과/크기 초과는 그대로 올린다
+            if e.status_code not in (status.HTTP_400_BAD_REQUEST, status.HTTP_502_BAD_GATEWAY):
+                raise
+        return await self.fetch(url)
+
+    async def _download(self, url: str) -> FetchedImage:
+        client = self._get_client()
+        started_at = asyncio.get_running_loop().time()
+        try:
+            async with self._host_limit(url):
+                async with client.stream("GET", url) as response:
+                    response.raise_for_status()
+
+                    # 헤더가 잘못됐으면 무시 (받으면서 크기를 다시 확인한다)
+                    content_length = response.headers.get("content-length", "")
+                    if content_length.isdigit() and int(content_length) > self._max_bytes:
+                        raise self._too_large(url)
+
+                    chunks = []
+                    received = 0
+                    async for chunk in response.aiter_bytes():
+                        received += len(chunk)
+                        if received > self._max_bytes:
+                            raise self._too_large(url)
+                        chunks.append(chunk)
+                    content_type = response.headers.get("content-type")
+        except httpx.TimeoutException as e:
+            self._fetch_errors.inc()
+            logger.error(f"이미지 다운로드 시간 초과 (URL: {url}): {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="이미지 다운로드 시간 초과"
+            ) from e
+        except httpx.HTTPStatusError as e:
+            self._fetch_errors.inc()
+            logger.error(f"이미지 다운로드 실패 (URL: {url}): {str(e)}")
+            code = e.response.status_code
+            if code == status.HTTP_404_NOT_FOUND:
+                raise ImageNotFoundError(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"이미지 다운로드 실패: {str(e)}"
+                ) from e
+            # 이미지 서버/스토리지 쪽 오류는 요청 잘못이 아니므로 502
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY if code >= 500 else status.HTTP_400_BAD_REQUEST,
+                detail=f"이미지 다운로드 실패: {str(e)}"
+            ) from e
+        except httpx.HTTPError as e:
+            self._fetch_errors.inc()
+            logger.error(f"이미지 다운로드 실패 (URL: {url}): {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"이미지 다운로드 실패: {str(e)}"
+            ) from e
+
+        # 한 번만 합쳐서 디코더(BytesIO)가 추가 복사 없이 그대로 읽도록 bytes로 넘긴다
+        data = b"".join(chunks)
+        self._fetch_ms.observe((asyncio.get_running_loop().time() - started_at) * 1000)
+        self._fetch_bytes.observe(len(data))
+        image = FetchedImage(url=url, data=data, content_type=content_type)
+        if self._buffer is not None:
+            self._buffer.put(image)
+        return image
+
+    def _too_large(self, url: str) -> HTTPException:
+        self._fetch_errors.inc()
+        logger.error(f"이미지 크기 초과 (URL: {url}, limit: {self._max_bytes})")
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="이미지 크기가 허용 범위를 초과했습니다"
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+image_fetcher = ImageFetcher(
+    max_connections=settings.IMAGE_FETCH_MAX_CONNECTIONS,
+    max_connections_per_host=settings.IMAGE_FETCH_MAX_CONNECTIONS_PER_HOST,
+    connect_timeout=settings.IMAGE_FETCH_CONNECT_TIMEOUT,
+    read_timeout=settings.IMAGE_FETCH_READ_TIMEOUT,
+    max_bytes=settings.IMAGE_FETCH_MAX_BYTES,
+    buffer=FetchedImageBuffer(
+        max_bytes=settings.IMAGE_BUFFER_MAX_BYTES,
+        ttl_seconds=settings.IMAGE_BUFFER_TTL_SECONDS,
+    ),
+    prefer_derivatives=settings.UPLOAD_DERIVATIVES_ENABLED,
+)
@@ -0,0 +1,84 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, TypeVar
+
+import torch
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class InferenceExecutor:
+    """
+    이미지 디코딩/전처리/모델 forward 같은 CPU 작업을 이벤트 루프 밖의 전용 스레드 풀에서 실행한다.
+    동시에 처리 중인 예측 수를 max_pending으로 제한하고, 넘치면 503 + Retry-After로 거절한다.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, torch_threads: int, retry_after_seconds: int):
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._retry_after_seconds = retry_after_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+
+        if torch_threads > 0:
+            torch.set_num_threads(torch_threads)
+        # intra-op 스레드 수(OpenMP)는 스레드별 설정이라 워커 스레드마다 명시한다
+        # (병렬 앙상블이 멤버 스레드에서 줄여 쓰는 값을 새 워커가 물려받지 않도록)
+        self._torch_threads = torch.get_num_threads()
+
+        self._in_flight_gauge = metrics.gauge("inference_in_flight")
+        self._rejected = metrics.counter("inference_rejected_total")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="inference",
+                initializer=torch.set_num_threads,
+                initargs=(self._torch_threads,),
+            )
+        return self._executor
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """예측 한 건을 수락한다. 대기열이 가득 차면 503을 발생시킨다."""
+        if self._in_flight >= self._max_pending:
+            self._rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="예측 요청이 많아 잠시 후 다시 시도해주세요",
+                headers={"Retry-After": str(self._retry_after_seconds)},
+            )
+        self._in_flight += 1
+        self._in_flight_gauge.set(self._in_flight)
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._in_flight_gauge.set(self._in_flight)
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_WORKERS,
+    max_pending=settings.INFERENCE_MAX_PENDING,
+    torch_threads=settings.INFERENCE_TORCH_THREADS,
+    retry_after_seconds=settings.INFERENCE_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+import torch
+import torch.nn as nn
+from fastapi import HTTPException, status
+
+from app.ai_models.architectures import build_model_from_checkpoint, is_ensemble_checkpoint
+from app.ai_models.compiled import artifact_format, load_compiled_model
+from app.core.config import settings
+from app.services.checkpoint_cache import get_checkpoint_cache
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """pet_type 별로 어떤 체크포인트/라벨/버전을 사용할지"""
+    pet_type: str
+    checkpoint_name: str
+    labels_name: str
+    version: str
+
+    @property
+    def key(self) -> ModelKey:
+        return (self.pet_type, self.checkpoint_name, self.version)
+
+
+@dataclass
+class LoadedModel:
+    """eval 모드로 메모리에 상주하는 모델과 라벨"""
+    spec: ModelSpec
+    model: nn.Module
+    labels: List[str]
+    is_ensemble: bool
+    channels_last: bool = False
+
+    @property
+    def model_version(self) -> str:
+        """예측 결과 캐시 키에 쓰는 버전. 결과가 달라지는 앙상블 설정도 포함한다."""
+        version = f"{self.spec.checkpoint_name}@{self.spec.version}"
+        variant = getattr(self.model, "variant", "")
+        return f"{version}:{variant}" if variant else version
+
+
+def resolve_spec(pet_type: str) -> ModelSpec:
+    if pet_type == "dog":
+        return ModelSpec(
+            pet_type=pet_type,
+            checkpoint_name=settings.TORCH_DOG_ARTIFACT_NAME or settings.TORCH_DOG_MODEL_NAME,
+            labels_name=f"{settings.DOG_LABELS}.json",
+            version=settings.TORCH_DOG_MODEL_VERSION,
+        )
+    if pet_type == "cat":
+        return ModelSpec(
+            pet_type=pet_type,
+            checkpoint_name=settings.TORCH_CAT_ARTIFACT_NAME or settings.TORCH_CAT_MODEL_NAME,
+            labels_name=f"{settings.CAT_LABELS}.json",
+            version=settings.TORCH_CAT_MODEL_VERSION,
+        )
+    raise ValueError(f"지원되지 않는 pet_type: {pet_type}")
+
+
+def load_model_from_blob(spec: ModelSpec) -> LoadedModel:
+    """
+    체크포인트와 라벨을 로컬 캐시(없거나 변경됐으면 Blob Storage)에서 읽어 모델을 만든다. (블로킹 함수)
+    """
+    cache = get_checkpoint_cache()
+    checkpoint_path = cache.get_path(spec.checkpoint_name)
+
+    format = artifact_format(spec.checkpoint_name)
+    if format != "checkpoint":
+        # 변환된 아티팩트는 라벨을 파일 안에 포함하고 있음
+        return build_compiled_model(spec, checkpoint_path, format)
+
+    try:
+        label_bytes = cache.read_bytes(spec.labels_name)
+        labels = json.loads(label_bytes.decode('utf-8'))
+        logger.info(f"Loaded labels from Blob Storage: {labels}")
+    except Exception as e:
+        logger.error(f"라벨 파일 로드 실패: {spec.labels_name}, {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"라벨 정보 로드 실패: {str(e)}"
+        )
+
+    return build_loaded_model(spec, checkpoint_path, labels)
+
+
+def build_loaded_model(spec: ModelSpec, checkpoint_file: Union[str, Path, BinaryIO], labels: List[str]) -> LoadedModel:
+    try:
+        checkpoint = torch.load(checkpoint_file, map_location=torch.device('cpu'))
+        model = build_model_from_checkpoint(
+            checkpoint,
+            len(labels),
+            spec.checkpoint_name,
+            ensemble_weights=settings.ENSEMBLE_WEIGHTS,
+            ensemble_parallel=settings.ENSEMBLE_PARALLEL,
+            ensemble_early_exit_threshold=settings.ENSEMBLE_EARLY_EXIT_THRESHOLD,
+            ensemble_concurrent_calls=settings.INFERENCE_WORKERS,
+            pet_type=spec.pet_type,
+        )
+    except (RuntimeError, ValueError) as e:
+        logger.error(f"모델 로드 실패 (pet_type: {spec.pet_type}, model: {spec.checkpoint_name}): {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"모델 로드 중 오류 발생: {str(e)}"
+        ) from e
+
+    model.eval()
+    return LoadedModel(
+        spec=spec,
+        model=model,
+        labels=labels,
+        is_ensemble=is_ensemble_checkpoint(checkpoint),
+    )
+
+
+def build_compiled_model(spec: ModelSpec, artifact_path: Path, format: str) -> LoadedModel:
+    try:
+        model, labels, metadata = load_compiled_model(artifact_path, format)
+    except Exception as e:
+        logger.error(f"모델 로드 실패 (pet_type: {spec.pet_type}, model: {spec.checkpoint_name}): {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"모델 로드 중 오류 발생: {str(e)}"
+        ) from e
+
+    logger.info(f"Loaded compiled model {spec.checkpoint_name}: {metadata}")
+    return LoadedModel(
+        spec=spec,
+        model=model,
+        labels=labels,
+        is_ensemble=False,
+        channels_last=metadata.channels_last,
+    )
+
+
+class ModelRegistry:
+    """
+    (pet_type, 체크포인트 이름, 버전) 별로 모델을 한 번만 로드해서
+    프로세스 전체 요청이 공유하도록 보관한다.
+    """
+
+    def __init__(self, loader: Callable[[ModelSpec], LoadedModel] = load_model_from_blob):
+        self._loader = loader
+        self._models: Dict[ModelKey, LoadedModel] = {}
+        self._locks: Dict[ModelKey, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def peek(self, pet_type: str) -> Optional[LoadedModel]:
+        return self._models.get(resolve_spec(pet_type).key)
+
+    def get_sync(self, pet_type: str) -> LoadedModel:
+        spec = resolve_spec(pet_type)
+        loaded = self._models.get(spec.key)
+        if loaded is not None:
+            return loaded
+
+        with self._guard:
+            lock = self._locks.setdefault(spec.key, threading.Lock())
+
+        # 같은 키에 대한 동시 로드는 한 번만 수행
+        with lock:
+            loaded = self._models.get(spec.key)
+            if loaded is not None:
+                return loaded
+
+            logger.info(f"Loading model {spec.key}")
+            loaded = self._loader(spec)
+            with self._guard:
+                # 같은 pet_type의 이전 버전은 내려서 메모리를 돌려준다
+                for key in [k for k in self._models if k[0] == spec.pet_type]:
+                    del self._models[key]
+                self._models[spec.key] = loaded
+            return loaded
+
+    async def get(self, pet_type: str) -> LoadedModel:
+        loaded = self.peek(pet_type)
+        if loaded is not None:
+            return loaded
+        return await asyncio.to_thread(self.get_sync, pet_type)
+
+    async def warmup(self, pet_types: Optional[List[str]] = None) -> None:
+        """
+        애플리케이션 시작 시 모델을 미리 올리고 더미 입력으로 한 번 추론해둔다.
+        실패해도 서비스는 뜨도록 로그만 남기고, 첫 요청에서 다시 로드를 시도한다.
+        """
+        for pet_type in pet_types if pet_types is not None else settings.MODEL_WARMUP_PET_TYPES:
+            try:
+                loaded = await self.get(pet_type)
+                await asyncio.to_thread(_dummy_forward, loaded.model)
+                logger.info(f"Model warm-up finished: {loaded.spec.key}")
+            except Exception as e:
+                logger.error(f"Model warm-up failed (pet_type: {pet_type}): {str(e)}")
+
+    def clear(self) -> None:
+        with self._guard:
+            self._models.clear()
+            self._locks.clear()
+
+
+def _dummy_forward(model: nn.Module) -> None:
+    with torch.no_grad():
+        model(torch.zeros(1, 3, 224, 224))
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,118 @@
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from fastapi import HTTPException, Request, status
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+class MultipartFileStream:
+    """
+    multipart/form-data 요청 본문에서 파일 필드 하나를 임시 파일이나 메모리에 모으지 않고 조각 단위로 읽는다.
+    (UploadFile 은 본문 전체를 받은 뒤에야 핸들러가 실행되므로 크기 제한도 전부 받은 뒤에야 확인할 수 있다)
+    """
+
+    def __init__(self, request: Request, field_name: str, max_bytes: int):
+        content_type = request.headers.get("content-type", "")
+        _, params = parse_options_header(content_type)
+        if not content_type.startswith("multipart/form-data") or b"boundary" not in params:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="multipart/form-data 요청이 아닙니다")
+
+        self._field_name = field_name
+        self._max_bytes = max_bytes
+        self._stream = request.stream()
+        self._parser = MultipartParser(params[b"boundary"], callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file = False
+        self._file_finished = False
+        self._eof = False
+        self._pending: Deque[bytes] = deque()
+
+    # python-multipart 콜백 (parser.write 안에서 동기로 호출된다)
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if self.filename is None and name == self._field_name and b"filename" in options:
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+            content_type = self._headers.get(b"content-type")
+            self.content_type = content_type.decode("latin-1") if content_type else None
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self._file_finished = True
+
+    async def _feed(self) -> None:
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._eof = True
+            chunk = b""
+        try:
+            if chunk:
+                self._parser.write(chunk)
+            if self._eof:
+                self._parser.finalize()
+        except FormParserError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"잘못된 multipart 요청: {str(e)}") from e
+
+    async def open(self) -> "MultipartFileStream":
+        """파일 필드의 헤더까지 읽어서 filename/content_type 을 채운다"""
+        while self.filename is None and not self._eof:
+            await self._feed()
+        if self.filename is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"'{self._field_name}' 파일 필드가 없습니다"
+            )
+        return self
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """파일 내용을 받는 대로 돌려준다. max_bytes 를 넘는 순간 413"""
+        total = 0
+        while True:
+            while self._pending:
+                data = self._pending.popleft()
+                total += len(data)
+                if total > self._max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size exceeds maximum limit ({self._max_bytes} bytes)"
+                    )
+                yield data
+            if self._file_finished:
+                return
+            if self._eof:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="파일 업로드가 중간에 끊겼습니다")
+            await self._feed()
@@ -1,182 +1,110 @@
+import asyncio
 import torch
-import requests
-from io import BytesIO
-from typing import List
-from PIL import Image
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from fastapi import HTTPException, status
 import logging
-import torch.nn as nn
-from torchvision import models
-import json
 
-from azure.storage.blob import BlobServiceClient
-import torchvision.transforms as transforms
-
-from app.schemas.predict import PredictionResult
+from app.schemas.predict import (
+    PredictionResult,
+    ImagePredictionRequest,
+    BatchPredictionItemResult,
+    CombinedPredictionResult,
+)
+from app.ai_models.preprocessing import default_preprocessor
 from app.core.config import settings
 
-from azure.cognitiveservices.vision.customvision.prediction import CustomVisionPredictionClient
-from msrest.authentication import ApiKeyCredentials
-
-from app.ai_models.architectures import EnsembleModel
+from app.services.model_registry import model_registry
+from app.services.batching import get_batcher
+from app.services.inference_executor import inference_executor
+from app.services.image_derivatives import upload_content_hash
+from app.services.image_fetcher import image_fetcher, is_hosted_image_url
+from app.services.prediction_cache import prediction_cache, content_hash
+from app.services.singleflight import SingleFlight
+from app.services.custom_vision import ImageUrlUnreadableError, custom_vision_client
 
 logger = logging.getLogger(__name__)
 
+# 동시에 들어온 같은 예측 요청(같은 URL, 또는 URL이 달라도 같은 이미지 내용)을 한 번만 처리
+prediction_flight = SingleFlight("prediction")
+
 async def predict_pet_disease_torch(image_url: str, pet_type: str) -> List[PredictionResult]:
     """
-    1) pet_type에 따라 Azure Blob Storage에서 모델 파일 다운로드
-    2) 모델 로드(PyTorch)
-    3) image_url에서 이미지를 가져와 전처리
-    4) 추론 & 확률 계산
-    5) 상위 3개의 결과(PredictionResult)를 반환
+    1) pet_type에 해당하는 모델을 레지스트리에서 가져옴 (최초 1회만 Blob Storage에서 로드)
+    2) image_url에서 이미지를 가져와 같은 이미지/모델 버전의 캐시된 결과가 있으면 반환
+    3) 전처리 후 마이크로 배처를 통해 다른 요청과 묶어서 추론
+    4) 상위 3개의 결과(PredictionResult)를 캐시에 저장하고 반환
     """
+    return await prediction_flight.do(
+        ("torch", "url", image_url, pet_type),
+        lambda: _predict_pet_disease_torch(image_url, pet_type)
+    )
 
+async def _predict_pet_disease_torch(image_url: str, pet_type: str) -> List[PredictionResult]:
     # -----------------------------
-    # (A) pet_type에 따라 모델 & 라벨 선택
+    # (A) pet_type에 해당하는 상주 모델 (pet_type 검증 겸 최초 로드)
     # -----------------------------
-    if pet_type == "dog":
-        model_file_name = settings.TORCH_DOG_MODEL_NAME
-        disease_labels = settings.DOG_LABELS
-    elif pet_type == "cat":
-        model_file_name = settings.TORCH_CAT_MODEL_NAME
-        disease_labels = settings.CAT_LABELS
-    else:
-        raise ValueError(f"지원되지 않는 pet_type: {pet_type}")
+    loaded = await model_registry.get(pet_type)
 
     # -----------------------------
-    # (B) Blob Storage에서 모델 및 라벨 다운로드
+    # (B) 캐시 키 계산
+    # 내용 해시로 이름 붙인 업로드 이미지는 URL에서 해시를 알 수 있어 다운로드 전에 캐시를 확인한다.
+    # 그 외에는 이미지를 가져와서 해시 계산 (업로드 이미지는 모델용 축소본)
     # -----------------------------
-    blob_service_client = BlobServiceClient.from_connection_string(settings.BLOB_CONNECTION_STRING)
-    container_client = blob_service_client.get_container_client(settings.BLOB_CONTAINER_NAME)
-    
-    # 모델 파일 다운로드
-    model_blob_client = container_client.get_blob_client(model_file_name)
-    model_bytes = model_blob_client.download_blob().readall()
+    upload_hash = upload_content_hash(image_url) if is_hosted_image_url(image_url) else None
+    if upload_hash is not None:
+        cache_key = prediction_cache.make_key("torch", pet_type, loaded.model_version, "upload:" + upload_hash)
 
-    # 라벨 파일 다운로드 (모델 파일명 + .json)
-    label_file_name = f"{disease_labels}.json"
-    label_blob_client = container_client.get_blob_client(label_file_name)
+        async def load_image() -> bytes:
+            return (await image_fetcher.fetch_model_image(image_url)).data
+    else:
+        image = await image_fetcher.fetch_model_image(image_url)
+        image_hash = await asyncio.to_thread(content_hash, image.data)
+        cache_key = prediction_cache.make_key("torch", pet_type, loaded.model_version, image_hash)
 
-    try:
-        label_bytes = label_blob_client.download_blob().readall()
-        disease_labels = json.loads(label_bytes.decode('utf-8'))
-        logger.info(f"Loaded labels from Blob Storage: {disease_labels}")
-    except Exception as e:
-        logger.error(f"라벨 파일 로드 실패: {label_file_name}, {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"라벨 정보 로드 실패: {str(e)}"
-        )
+        async def load_image() -> bytes:
+            return image.data
 
-    # -----------------------------
-    # (C) PyTorch 모델 로드
-    # -----------------------------
-    # 아키텍처 분리 후 간소화된 모델 생성
-    try:
-        checkpoint = torch.load(BytesIO(model_bytes), map_location=torch.device('cpu'))
-        
-        if 'resnet' in checkpoint and 'efficientnet' in checkpoint:
-            is_ensemble = True
-            # 개별 모델 초기화 (num_classes 파라미터 사용)
-            resnet = models.resnet18(weights=None)
-            resnet.fc = nn.Sequential(
-                nn.Dropout(0.7),
-                nn.Linear(resnet.fc.in_features, len(disease_labels))
-            )
-            resnet.load_state_dict(checkpoint['resnet'])
-
-            efficientnet = models.efficientnet_b0(weights=None)
-            efficientnet.classifier[1] = nn.Sequential(
-                nn.Dropout(0.7),
-                nn.Linear(efficientnet.classifier[1].in_features, 256),
-                nn.ReLU(),
-                nn.Linear(256, len(disease_labels))
-            )
-            efficientnet.load_state_dict(checkpoint['efficientnet'])
+    return await prediction_flight.do(
+        ("torch", "content", cache_key),
+        lambda: _run_torch_inference(cache_key, pet_type, load_image)
+    )
 
-            # 앙상블 모델 초기화 방식 수정 (num_classes 파라미터 제거)
-            model = EnsembleModel(models=[resnet, efficientnet])
-        else:
-            is_ensemble = False
-            # 단일 모델 초기화 (num_classes 파라미터 사용)
-            if "resnet" in model_file_name.lower():
-                model = models.resnet18(weights=None)
-                model.fc = nn.Sequential(
-                    nn.Dropout(0.7),
-                    nn.Linear(model.fc.in_features, len(disease_labels))
-                )
-                model.load_state_dict(checkpoint)
-            elif "efficientnet" in model_file_name.lower():
-                model = models.efficientnet_b0(weights=None)
-                model.classifier[1] = nn.Sequential(
-                    nn.Dropout(0.7),
-                    nn.Linear(model.classifier[1].in_features, 256),
-                    nn.ReLU(),
-                    nn.Linear(256, len(disease_labels))
-                )
-                model.load_state_dict(checkpoint)
-            model.load_state_dict(checkpoint)
-    except RuntimeError as e:
-        logger.error(f"모델 로드 실패 (pet_type: {pet_type}, model: {model_file_name}): {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"모델 로드 중 오류 발생: {str(e)}"
-        ) from e
-        
-    model.eval()
+async def _run_torch_inference(
+    cache_key: str,
+    pet_type: str,
+    load_image: Callable[[], Awaitable[bytes]],
+) -> List[PredictionResult]:
+    cached = await prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    image_data = await load_image()
 
-    # -----------------------------
-    # (D) image_url에서 이미지를 가져와 전처리
-    # -----------------------------
-    response = requests.get(image_url)
-    image_data = response.content
-
-    # PIL Image 로딩
-    image = Image.open(BytesIO(image_data)).convert("RGB")
-
-    # 전처리 파이프라인 (예시)
-    transform = transforms.Compose([
-        transforms.Resize((224, 224)),  # 모델 입력 크기에 맞춤
-        transforms.ToTensor(),
-        transforms.Normalize(
-            mean=[0.485, 0.456, 0.406],
-            std=[0.229, 0.224, 0.225]
-        ),
-    ])
-    input_tensor = transform(image).unsqueeze(0)  # (1, C, H, W)
+    # 대기열이 가득 찼으면 여기서 503으로 거절
+    async with inference_executor.slot():
+        # -----------------------------
+        # (C) 전처리 (이벤트 루프 밖에서 실행)
+        # -----------------------------
+        input_tensor = await inference_executor.run(_load_and_preprocess, image_data)
 
-    # -----------------------------
-    # (E) 모델 추론
-    # -----------------------------
-    with torch.no_grad():
-        outputs = model(input_tensor)
-        # 앙상블인 경우 이미 평균 처리됨
-        probs_tensor = torch.softmax(outputs, dim=1) 
-        probs = probs_tensor[0]
+        # -----------------------------
+        # (D) 모델 추론 & 상위 3개 결과 선별
+        # -----------------------------
+        results = await get_batcher(pet_type).submit(input_tensor)
 
-    # -----------------------------
-    # (F) 상위 3개 결과 선별
-    # -----------------------------
-    # 만약 클래스 수가 3개 미만인 경우도 대비하려면 min() 처리
-    topk = min(3, len(disease_labels))
-
-    top_probs, top_idxs = torch.topk(probs, topk)
-    top_probs = top_probs.tolist()
-    top_idxs = top_idxs.tolist()
-
-    # PredictionResult 리스트 생성
-    prediction_results = []
-    for i in range(topk):
-        idx = top_idxs[i]
-        label_name = disease_labels[idx]
-        probability = top_probs[i]
-        prediction_results.append(
-            PredictionResult(tag_name=label_name, probability=probability)
-        )
+    await prediction_cache.set(cache_key, results)
+    return results
 
-    return prediction_results
+def _load_and_preprocess(image_data: bytes) -> torch.Tensor:
+    # 디코딩 + 224x224 리사이즈 + 정규화
+    return default_preprocessor.preprocess(image_data)  # (C, H, W)
 
 async def predict_pet_disease_custom_vision(image_url: str, pet_type: str) -> List[PredictionResult]:
+    return await prediction_flight.do(
+        ("vision", "url", image_url, pet_type),
+        lambda: _predict_pet_disease_custom_vision(image_url, pet_type)
+    )
+
+async def _predict_pet_disease_custom_vision(image_url: str, pet_type: str) -> List[PredictionResult]:
     if pet_type == "dog":
         model_name = settings.DOG_MODEL_NAME
         project_id = settings.DOG_PROJECT_ID
@@ -186,42 +114,151 @@ async def predict_pet_disease_custom_vision(image_url: str, pet_type: str) -> Li
     else:
         # 그 외의 경우 예외 처리하거나, 기본값 지정
         raise ValueError(f"지원되지 않는 pet_type: {pet_type}")
-    
-    credentials = ApiKeyCredentials(in_headers={"Prediction-key": settings.PREDICTION_KEY})
+    model_version = f"{project_id}@{model_name}"
 
-# 클라이언트 초기화
-    prediction_client = CustomVisionPredictionClient(
-        endpoint=settings.PREDICTION_ENDPOINT,
-        credentials=credentials
-    )
-
-    try:
-        response = requests.get(image_url)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"이미지 다운로드 실패 (URL: {image_url}): {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"이미지 다운로드 실패: {str(e)}"
-        ) from e
+    if settings.CUSTOM_VISION_USE_IMAGE_URL and is_hosted_image_url(image_url):
+        # 업로드 스토리지의 이미지는 내려받았다가 다시 올리지 않고 URL만 넘긴다.
+        # 업로드 blob 이름은 uuid 또는 내용 해시라 URL 자체를 캐시 키로 사용
+        url_key = prediction_cache.make_key("vision", pet_type, model_version, "url:" + content_hash(image_url.encode("utf-8")))
+        try:
+            return await _run_custom_vision(
+                url_key,
+                pet_type,
+                lambda: custom_vision_client.classify_image_url(
+                    project_id=project_id,
+                    published_name=model_name,
+                    url=image_url
+                )
+            )
+        except ImageUrlUnreadableError as e:
+            # Custom Vision이 URL을 읽지 못한 경우에만 바이트 전송으로 다시 시도
+            # (throttling/장애로 인한 503/504 등은 호출을 두 배로 늘리지 않도록 그대로 반환)
+            logger.warning(f"Custom Vision URL 분류 실패, 이미지 바이트로 재시도 (URL: {image_url}): {e.detail}")
 
-    # 예측 요청
-    try:
-        image_data = response.content  # 바이트 스트림으로 이미지 데이터 가져오기
+    image = await image_fetcher.fetch_model_image(image_url)
+    image_hash = await asyncio.to_thread(content_hash, image.data)
+    cache_key = prediction_cache.make_key("vision", pet_type, model_version, image_hash)
 
-        results = prediction_client.classify_image(
-            project_id=project_id,
-            published_name=model_name,
-            image_data=image_data
+    return await prediction_flight.do(
+        ("vision", "content", cache_key),
+        lambda: _run_custom_vision(
+            cache_key,
+            pet_type,
+            lambda: custom_vision_client.classify_image(
+                project_id=project_id,
+                published_name=model_name,
+                image_data=image.data
+            )
         )
+    )
+
+async def _run_custom_vision(cache_key: str, pet_type: str, classify: Callable[[], Awaitable]) -> List[PredictionResult]:
+    cached = await prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-        # 예측 결과 처리, 확률로 정렬하고 상위 3개 선택
-        top_predictions = sorted(results.predictions, key=lambda p: p.probability, reverse=True)[:3]
-        
-        return [PredictionResult(tag_name=pred.tag_name, probability=pred.probability) for pred in top_predictions]
+    # 예측 요청 (공유 클라이언트: 동시 호출 제한/타임아웃/재시도/circuit breaker 적용)
+    try:
+        results = await classify()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Custom Vision 예측 실패 (pet_type: {pet_type}): {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"예측 서비스 오류: {str(e)}"
-        ) from e
\ No newline at end of file
+        ) from e
+
+    # 예측 결과 처리, 확률로 정렬하고 상위 3개 선택
+    top_predictions = sorted(results.predictions, key=lambda p: p.probability, reverse=True)[:3]
+
+    predictions = [PredictionResult(tag_name=pred.tag_name, probability=pred.probability) for pred in top_predictions]
+
+    await prediction_cache.set(cache_key, predictions)
+    return predictions
+
+async def predict_pet_disease_both(image_url: str, pet_type: str) -> CombinedPredictionResult:
+    """
+    torch 모델과 Custom Vision을 동시에 실행한다.
+    이미지는 image_fetcher 에서 한 번만 받아 두 백엔드가 공유하고
+    (업로드 스토리지 이미지라면 Custom Vision은 URL로 직접 가져감),
+    한쪽이 실패해도 다른 쪽 결과와 errors 를 함께 반환한다. 둘 다 실패하면 torch 쪽 오류를 그대로 올린다.
+    """
+    torch_result, vision_result = await asyncio.gather(
+        predict_pet_disease_torch(image_url, pet_type),
+        predict_pet_disease_custom_vision(image_url, pet_type),
+        return_exceptions=True
+    )
+
+    combined = CombinedPredictionResult()
+    for backend, result in (("torch", torch_result), ("vision", vision_result)):
+        if isinstance(result, Exception):
+            combined.errors[backend] = prediction_error(result)[1]
+        else:
+            setattr(combined, backend, result)
+
+    if isinstance(torch_result, Exception) and isinstance(vision_result, Exception):
+        raise torch_result
+    return combined
+
+PredictFn = Callable[[str, str], Awaitable[List[PredictionResult]]]
+
+# 모든 배치 요청이 함께 쓰는 동시 처리 한도 (이벤트 루프, 세마포어)
+_batch_limiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+def _get_batch_limiter() -> asyncio.Semaphore:
+    """
+    배치 요청이 여러 개여도 합쳐서 PREDICTION_BATCH_CONCURRENCY 개까지만 추론 대기열에 넣는다.
+    나머지 INFERENCE_MAX_PENDING 자리는 단건 요청 몫으로 남는다.
+    세마포어는 이벤트 루프에 묶이므로 루프가 바뀌면(테스트 등) 새로 만든다.
+    """
+    global _batch_limiter
+    loop = asyncio.get_running_loop()
+    if _batch_limiter is None or _batch_limiter[0] is not loop:
+        _batch_limiter = (loop, asyncio.Semaphore(settings.PREDICTION_BATCH_CONCURRENCY))
+    return _batch_limiter[1]
+
+def prediction_error(e: Exception) -> Tuple[int, str]:
+    """예측 중 발생한 예외를 엔드포인트와 같은 (status_code, 메시지)로 변환"""
+    if isinstance(e, HTTPException):
+        return e.status_code, str(e.detail)
+    if isinstance(e, ValueError):  # pet_type 오류
+        return status.HTTP_400_BAD_REQUEST, str(e)
+    return status.HTTP_500_INTERNAL_SERVER_ERROR, f"Prediction failed: {str(e)}"
+
+async def predict_batch(
+    items: List[ImagePredictionRequest],
+    predict: PredictFn,
+    concurrency: int = None
+) -> AsyncIterator[BatchPredictionItemResult]:
+    """
+    여러 이미지를 동시에 예측하고 끝나는 순서대로 항목별 결과를 돌려준다.
+    - 이미지 다운로드는 동시에 진행하고, 같은 pet_type 항목을 연달아 시작해서
+      마이크로 배처에서 같은 모델 배치로 묶이게 한다
+    - 한 항목의 실패는 그 항목의 status_code/error 로만 기록하고 나머지는 계속 처리
+    - 소비자가 중간에 멈추면(스트리밍 연결 종료 등) 남은 작업을 취소한다
+      (다른 요청과 합쳐진 다운로드/추론은 그 요청이 기다리는 동안 계속되고, 기다리는 요청이 없으면 함께 취소된다)
+    - 동시 처리 수는 프로세스의 모든 배치 요청이 공유한다 (concurrency 를 주면 이 호출만의 한도)
+    """
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else _get_batch_limiter()
+
+    async def run(index: int, item: ImagePredictionRequest) -> BatchPredictionItemResult:
+        result = BatchPredictionItemResult(index=index, image_url=item.image_url, pet_type=item.pet_type)
+        async with semaphore:
+            try:
+                result.predictions = await predict(item.image_url, item.pet_type)
+            except Exception as e:
+                result.status_code, result.error = prediction_error(e)
+                if result.status_code >= 500:
+                    logger.error(f"배치 예측 항목 실패 (URL: {item.image_url}): {str(e)}", exc_info=True)
+        return result
+
+    # 세마포어는 대기 순서대로 풀리므로 pet_type 순으로 정렬해서 시작
+    order = sorted(range(len(items)), key=lambda i: items[i].pet_type)
+    tasks = [asyncio.ensure_future(run(i, items[i])) for i in order]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Protocol, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.predict import PredictionResult
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class PredictionCacheBackend(Protocol):
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        ...
+
+
+class InMemoryPredictionCache:
+    """프로세스 내 LRU + TTL 캐시"""
+
+    def __init__(self, max_entries: int, clock=time.monotonic):
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisPredictionCache:
+    """
+    Redis 호환 서버(로컬 redis/valkey 등)를 사용하는 캐시. 워커 간에 결과를 공유한다.
+    redis 패키지는 선택 의존성이라 이 백엔드를 쓸 때만 import 한다.
+    """
+
+    def __init__(self, url: str, prefix: str = "prediction:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("PREDICTION_CACHE_BACKEND=redis 를 사용하려면 redis 패키지가 필요합니다") from e
+        self._client = redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._client.get(self._prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        await self._client.set(self._prefix + key, value, ex=ttl_seconds)
+
+
+class PredictionCache:
+    """
+    (이미지 내용 해시, pet_type, 모델 버전) 단위로 예측 결과를 캐시한다.
+    캐시 백엔드 장애가 예측 실패로 이어지지 않도록 오류는 로그만 남기고 miss로 처리한다.
+    """
+
+    def __init__(self, backend: Optional[PredictionCacheBackend], ttl_seconds: int):
+        self._backend = backend
+        self._ttl_seconds = ttl_seconds
+        self._hits = metrics.counter("prediction_cache_hits_total")
+        self._misses = metrics.counter("prediction_cache_misses_total")
+        self._errors = metrics.counter("prediction_cache_errors_total")
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None
+
+    @staticmethod
+    def make_key(backend: str, pet_type: str, model_version: str, image_hash: str) -> str:
+        return f"{backend}:{pet_type}:{model_version}:{image_hash}"
+
+    async def get(self, key: str) -> Optional[List[PredictionResult]]:
+        if self._backend is None:
+            return None
+        try:
+            value = await self._backend.get(key)
+        except Exception as e:
+            self._errors.inc()
+            logger.warning(f"Prediction cache get failed: {str(e)}")
+            return None
+        if value is None:
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        return [PredictionResult(**item) for item in json.loads(value)]
+
+    async def set(self, key: str, results: List[PredictionResult]) -> None:
+        if self._backend is None:
+            return
+        try:
+            value = json.dumps([result.model_dump() for result in results])
+            await self._backend.set(key, value, self._ttl_seconds)
+        except Exception as e:
+            self._errors.inc()
+            logger.warning(f"Prediction cache set failed: {str(e)}")
+
+
+def create_prediction_cache() -> PredictionCache:
+    if settings.PREDICTION_CACHE_BACKEND == "redis":
+        backend = RedisPredictionCache(settings.REDIS_URL)
+    elif settings.PREDICTION_CACHE_BACKEND == "memory":
+        backend = InMemoryPredictionCache(max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES)
+    else:
+        backend = None
+    return PredictionCache(backend=backend, ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS)
+
+
+prediction_cache = create_prediction_cache()
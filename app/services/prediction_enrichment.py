@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.crud import disease as disease_crud
+from app.db.base import async_session_maker
+from app.schemas.predict import EnrichedPredictionResult, PredictionResult
+from app.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_disease_types(pet_type: str) -> List[str]:
+    """
+    예측 결과로 나올 수 있는 tag_name 목록 (이미 로드된 모델의 라벨).
+    모델이 아직 로드되지 않았거나 pet_type 이 잘못됐으면 빈 목록 (검증은 예측 쪽에서 한다)
+    """
+    try:
+        loaded = model_registry.peek(pet_type)
+    except ValueError:
+        return []
+    return list(loaded.labels) if loaded is not None else []
+
+
+async def predict_and_enrich(
+    image_url: str,
+    pet_type: str,
+    predict: Callable[[str, str], Awaitable[List[PredictionResult]]],
+    prefetch: bool = True,
+    sessions: async_sessionmaker = async_session_maker,
+) -> List[EnrichedPredictionResult]:
+    """
+    예측 결과 상위 k개에 질병 정보(상세/병원/보험)를 붙여서 돌려준다.
+    - prefetch 면 추론이 도는 동안 torch 모델 라벨 전체의 질병 정보를 한 번에 미리 조회 (카탈로그 캐시 우선)
+      (Custom Vision 만 쓰면 태그가 torch 라벨과 다르므로 prefetch=False)
+    - 미리 조회하지 못한 tag_name 이 있으면 추론이 끝난 뒤 그것만 한 번 더 조회
+    DB 세션은 캐시에 없는 질병을 조회하는 동안만 연다.
+    """
+    candidates = candidate_disease_types(pet_type) if prefetch else []
+    prediction_task = asyncio.ensure_future(predict(image_url, pet_type))
+    try:
+        diseases = await disease_crud.get_diseases_by_types(candidates, sessions) if candidates else {}
+        predictions = await prediction_task
+    except BaseException:
+        prediction_task.cancel()
+        raise
+
+    looked_up = set(candidates)
+    missing = [p.tag_name for p in predictions if p.tag_name not in looked_up]
+    if missing:
+        diseases.update(await disease_crud.get_diseases_by_types(missing, sessions))
+
+    return [
+        EnrichedPredictionResult(**prediction.model_dump(), disease=diseases.get(prediction.tag_name))
+        for prediction in predictions
+    ]
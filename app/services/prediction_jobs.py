@@ -0,0 +1,449 @@
+import asyncio
+import itertools
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.prediction_job import PredictionJobCreate, PredictionJobSchema
+from app.services.predict_service import (
+    PredictFn,
+    prediction_error,
+    predict_pet_disease_torch,
+    predict_pet_disease_custom_vision,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionJobStore(Protocol):
+    """
+    작업 상태 저장소. 끝난 작업은 expires_at 이후 조회되지 않는다.
+    끝나지 않은 작업은 owner(워커 프로세스)와 lease_expires_at 을 갖는다. owner 는 lease 를 주기적으로 연장하고,
+    lease 가 끝난 작업(owner 가 죽은 작업)만 다른 워커가 가져가서(adopt) 다시 처리한다.
+    """
+
+    async def create(self, job: PredictionJobSchema, owner: str, lease_expires_at: float) -> None:
+        ...
+
+    async def get(self, job_id: str) -> Optional[PredictionJobSchema]:
+        ...
+
+    async def update(self, job: PredictionJobSchema, expires_at: Optional[float] = None) -> None:
+        """expires_at 을 주면(작업이 끝났으면) owner/lease 도 지운다"""
+        ...
+
+    async def claim(self, job_id: str, owner: str, lease_expires_at: float) -> bool:
+        """owner 가 가진 대기 중 작업을 원자적으로 running 으로 바꾼다. 다른 워커가 가져갔으면 False"""
+        ...
+
+    async def renew(self, owner: str, lease_expires_at: float) -> None:
+        ...
+
+    async def adopt_expired(self, owner: str, lease_expires_at: float, now: float) -> List[PredictionJobSchema]:
+        """lease 가 끝난 미완료 작업을 원자적으로 owner 의 대기 작업으로 가져오고 그 목록을 반환"""
+        ...
+
+    async def release(self, owner: str) -> None:
+        """정상 종료 시 lease 를 바로 만료시켜 다른 워커가 곧바로 가져갈 수 있게 한다"""
+        ...
+
+    async def delete_expired(self, now: float) -> int:
+        ...
+
+
+class _MemoryEntry:
+    __slots__ = ("job", "expires_at", "owner", "lease_expires_at")
+
+    def __init__(self, job: PredictionJobSchema, owner: Optional[str], lease_expires_at: Optional[float]):
+        self.job = job
+        self.expires_at: Optional[float] = None
+        self.owner = owner
+        self.lease_expires_at = lease_expires_at
+
+
+class InMemoryJobStore:
+    """프로세스 내 저장소 (단일 워커/테스트용)"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._jobs: Dict[str, _MemoryEntry] = {}
+
+    async def create(self, job: PredictionJobSchema, owner: str, lease_expires_at: float) -> None:
+        self._jobs[job.id] = _MemoryEntry(job.model_copy(deep=True), owner, lease_expires_at)
+
+    async def get(self, job_id: str) -> Optional[PredictionJobSchema]:
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= self._clock():
+            del self._jobs[job_id]
+            return None
+        return entry.job.model_copy(deep=True)
+
+    async def update(self, job: PredictionJobSchema, expires_at: Optional[float] = None) -> None:
+        entry = self._jobs.get(job.id)
+        if entry is None:
+            return
+        entry.job = job.model_copy(deep=True)
+        entry.expires_at = expires_at
+        if expires_at is not None:
+            entry.owner = entry.lease_expires_at = None
+
+    async def claim(self, job_id: str, owner: str, lease_expires_at: float) -> bool:
+        entry = self._jobs.get(job_id)
+        if entry is None or entry.owner != owner or entry.job.status != "queued":
+            return False
+        entry.job.status = "running"
+        entry.lease_expires_at = lease_expires_at
+        return True
+
+    async def renew(self, owner: str, lease_expires_at: float) -> None:
+        for entry in self._jobs.values():
+            if entry.owner == owner:
+                entry.lease_expires_at = lease_expires_at
+
+    async def adopt_expired(self, owner: str, lease_expires_at: float, now: float) -> List[PredictionJobSchema]:
+        adopted = []
+        for entry in self._jobs.values():
+            if entry.owner is not None and entry.lease_expires_at < now:
+                entry.owner, entry.lease_expires_at = owner, lease_expires_at
+                entry.job.status, entry.job.started_at = "queued", None
+                adopted.append(entry.job.model_copy(deep=True))
+        return adopted
+
+    async def release(self, owner: str) -> None:
+        for entry in self._jobs.values():
+            if entry.owner == owner:
+                entry.lease_expires_at = 0
+
+    async def delete_expired(self, now: float) -> int:
+        expired = [job_id for job_id, entry in self._jobs.items() if entry.expires_at is not None and entry.expires_at <= now]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+
+class SqliteJobStore:
+    """
+    SQLite 파일 저장소. 재시작해도 작업이 남아 있고, 같은 파일을 쓰는 워커 프로세스끼리 결과를 조회할 수 있다.
+    sqlite3 호출은 블로킹이라 스레드에서 실행한다.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prediction_jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, expires_at REAL, "
+            "owner TEXT, lease_expires_at REAL)"
+        )
+        # lease 컬럼이 없던 이전 파일에 컬럼 추가
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(prediction_jobs)")}
+        for column, type in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE prediction_jobs ADD COLUMN {column} {type}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_prediction_jobs_expires_at ON prediction_jobs (expires_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_prediction_jobs_lease ON prediction_jobs (lease_expires_at)")
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _rowcount(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    async def create(self, job: PredictionJobSchema, owner: str, lease_expires_at: float) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO prediction_jobs (id, status, payload, expires_at, owner, lease_expires_at) "
+            "VALUES (?, ?, ?, NULL, ?, ?)",
+            (job.id, job.status, job.model_dump_json(), owner, lease_expires_at),
+        )
+
+    async def get(self, job_id: str) -> Optional[PredictionJobSchema]:
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT payload FROM prediction_jobs WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, self._clock()),
+        )
+        return PredictionJobSchema.model_validate_json(rows[0][0]) if rows else None
+
+    async def update(self, job: PredictionJobSchema, expires_at: Optional[float] = None) -> None:
+        if expires_at is None:
+            sql, params = "UPDATE prediction_jobs SET status = ?, payload = ? WHERE id = ?", (job.status, job.model_dump_json(), job.id)
+        else:
+            sql = (
+                "UPDATE prediction_jobs SET status = ?, payload = ?, expires_at = ?, owner = NULL, lease_expires_at = NULL "
+                "WHERE id = ?"
+            )
+            params = (job.status, job.model_dump_json(), expires_at, job.id)
+        await asyncio.to_thread(self._execute, sql, params)
+
+    async def claim(self, job_id: str, owner: str, lease_expires_at: float) -> bool:
+        claimed = await asyncio.to_thread(
+            self._rowcount,
+            "UPDATE prediction_jobs SET status = 'running', lease_expires_at = ? "
+            "WHERE id = ? AND owner = ? AND status = 'queued'",
+            (lease_expires_at, job_id, owner),
+        )
+        return claimed == 1
+
+    async def renew(self, owner: str, lease_expires_at: float) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE prediction_jobs SET lease_expires_at = ? WHERE owner = ?",
+            (lease_expires_at, owner),
+        )
+
+    async def adopt_expired(self, owner: str, lease_expires_at: float, now: float) -> List[PredictionJobSchema]:
+        def adopt() -> List[PredictionJobSchema]:
+            with self._lock:
+                # 같은 파일을 쓰는 다른 워커와 동시에 가져가지 않도록 쓰기 잠금을 먼저 잡는다
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    rows = self._conn.execute(
+                        "SELECT payload FROM prediction_jobs WHERE owner IS NOT NULL AND lease_expires_at < ?", (now,)
+                    ).fetchall()
+                    jobs = []
+                    for (payload,) in rows:
+                        job = PredictionJobSchema.model_validate_json(payload)
+                        job.status, job.started_at = "queued", None
+                        self._conn.execute(
+                            "UPDATE prediction_jobs SET status = ?, payload = ?, owner = ?, lease_expires_at = ? WHERE id = ?",
+                            (job.status, job.model_dump_json(), owner, lease_expires_at, job.id),
+                        )
+                        jobs.append(job)
+                    self._conn.execute("COMMIT")
+                    return jobs
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+        return await asyncio.to_thread(adopt)
+
+    async def release(self, owner: str) -> None:
+        await asyncio.to_thread(self._execute, "UPDATE prediction_jobs SET lease_expires_at = 0 WHERE owner = ?", (owner,))
+
+    async def delete_expired(self, now: float) -> int:
+        return await asyncio.to_thread(self._rowcount, "DELETE FROM prediction_jobs WHERE expires_at <= ?", (now,))
+
+
+class PredictionJobQueue:
+    """
+    예측 작업 큐
+    - submit 은 작업을 저장소에 기록하고 바로 반환, 워커들이 priority가 높은 순(같으면 먼저 들어온 순)으로 처리
+    - 대기 중인 작업이 max_queued 를 넘으면 503 + Retry-After 로 거절
+    - 끝난 작업은 result_ttl_seconds 동안만 조회 가능
+    - get(wait=...) 으로 결과가 나올 때까지 long polling
+    - 저장소를 여러 워커가 공유할 수 있다. 작업마다 lease 를 두고 lease_seconds / 3 마다 연장하며,
+      lease 가 끝난 작업(죽은 워커의 작업)만 가져와서 다시 처리한다
+    """
+
+    def __init__(
+        self,
+        store: PredictionJobStore,
+        predictors: Dict[str, PredictFn],
+        workers: int,
+        max_queued: int,
+        result_ttl_seconds: int,
+        retry_after_seconds: int = 1,
+        lease_seconds: float = 30,
+        poll_interval: float = 0.5,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._store = store
+        self._predictors = predictors
+        self._worker_count = workers
+        self._max_queued = max_queued
+        self._result_ttl_seconds = result_ttl_seconds
+        self._retry_after_seconds = retry_after_seconds
+        self._lease_seconds = lease_seconds
+        self._poll_interval = poll_interval
+        self._owner = uuid.uuid4().hex
+        self._clock = clock
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._events: Dict[str, asyncio.Event] = {}
+        self._sequence = itertools.count()
+
+        self._queued = metrics.gauge("prediction_jobs_queued")
+        self._rejected = metrics.counter("prediction_jobs_rejected_total")
+        self._queue_ms = metrics.histogram("prediction_job_queue_ms")
+
+    async def start(self) -> None:
+        """
+        워커를 띄운다. 저장소에 남아 있는 미완료 작업 중 lease 가 끝난 것(죽었거나 정상 종료한 워커의 작업)만
+        가져와서 다시 큐에 넣는다. 살아 있는 다른 워커가 처리 중인 작업은 건드리지 않는다.
+        """
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._tasks:
+                return
+            self._queue = asyncio.PriorityQueue()
+            await self._adopt_expired()
+
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._worker_count)]
+            self._tasks.append(asyncio.create_task(self._purge_expired()))
+            self._tasks.append(asyncio.create_task(self._keep_leases()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._tasks:
+            try:
+                await self._store.release(self._owner)
+            except Exception as e:
+                logger.warning(f"Prediction job lease release failed: {str(e)}")
+        self._tasks = []
+        self._queue = None
+        self._start_lock = None
+        self._queued.set(0)
+
+    async def submit(self, request: PredictionJobCreate) -> PredictionJobSchema:
+        if request.backend not in self._predictors:
+            raise ValueError(f"지원되지 않는 backend: {request.backend}")
+        await self.start()
+
+        if self._queue.qsize() >= self._max_queued:
+            self._rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="예측 작업 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": str(self._retry_after_seconds)},
+            )
+
+        job = PredictionJobSchema(
+            id=uuid.uuid4().hex,
+            status="queued",
+            backend=request.backend,
+            image_url=request.image_url,
+            pet_type=request.pet_type,
+            priority=request.priority,
+            created_at=datetime.now(timezone.utc),
+        )
+        await self._store.create(job, self._owner, self._lease_deadline())
+        self._enqueue(job)
+        return job
+
+    async def get(self, job_id: str, wait: float = 0) -> Optional[PredictionJobSchema]:
+        """작업 상태 조회. wait 초 동안 작업이 끝나기를 기다린다."""
+        deadline = time.monotonic() + wait
+        job = await self._store.get(job_id)
+        while job is not None and not job.finished:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # 다른 프로세스가 처리하는 작업일 수도 있어 이벤트와 별개로 주기적으로 저장소를 다시 읽는다
+            event = self._events.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, self._poll_interval))
+            except asyncio.TimeoutError:
+                pass
+            job = await self._store.get(job_id)
+        if job is None or not job.finished:
+            # 이 프로세스가 끝내지 않는 작업의 이벤트가 남지 않도록 정리 (다른 대기자는 주기적 조회로 확인)
+            self._events.pop(job_id, None)
+        return job
+
+    def _lease_deadline(self) -> float:
+        return self._clock() + self._lease_seconds
+
+    async def _adopt_expired(self) -> None:
+        for job in await self._store.adopt_expired(self._owner, self._lease_deadline(), self._clock()):
+            logger.info(f"Prediction job adopted after lease expiry: {job.id}")
+            self._enqueue(job)
+
+    def _enqueue(self, job: PredictionJobSchema) -> None:
+        self._queue.put_nowait((-job.priority, next(self._sequence), job.id))
+        self._queued.set(self._queue.qsize())
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            self._queued.set(self._queue.qsize())
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"예측 작업 처리 실패 (job: {job_id}): {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await self._store.get(job_id)
+        if job is None or job.finished:
+            return
+        # 다른 워커가 lease 만료 후 가져갔으면 건너뛴다
+        if not await self._store.claim(job_id, self._owner, self._lease_deadline()):
+            return
+
+        job.status, job.started_at = "running", datetime.now(timezone.utc)
+        self._queue_ms.observe((job.started_at - job.created_at).total_seconds() * 1000)
+        await self._store.update(job)
+
+        try:
+            job.predictions = await self._predictors[job.backend](job.image_url, job.pet_type)
+            job.status = "succeeded"
+        except Exception as e:
+            job.status = "failed"
+            job.status_code, job.error = prediction_error(e)
+        job.finished_at = datetime.now(timezone.utc)
+        metrics.counter("prediction_jobs_total", status=job.status).inc()
+
+        await self._store.update(job, expires_at=self._clock() + self._result_ttl_seconds)
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _keep_leases(self) -> None:
+        """이 워커가 가진 작업의 lease 를 연장하고, 다른 워커가 죽어서 lease 가 끝난 작업을 가져온다"""
+        while True:
+            await asyncio.sleep(self._lease_seconds / 3)
+            try:
+                await self._store.renew(self._owner, self._lease_deadline())
+                await self._adopt_expired()
+            except Exception as e:
+                logger.warning(f"Prediction job lease renewal failed: {str(e)}")
+
+    async def _purge_expired(self) -> None:
+        while True:
+            await asyncio.sleep(min(self._result_ttl_seconds, 60))
+            try:
+                deleted = await self._store.delete_expired(self._clock())
+                if deleted:
+                    logger.info(f"Expired prediction jobs deleted: {deleted}")
+            except Exception as e:
+                logger.warning(f"Prediction job purge failed: {str(e)}")
+
+
+def create_prediction_job_store() -> PredictionJobStore:
+    if settings.PREDICTION_JOB_STORE == "sqlite":
+        return SqliteJobStore(settings.PREDICTION_JOB_SQLITE_PATH)
+    return InMemoryJobStore()
+
+
+prediction_job_queue = PredictionJobQueue(
+    store=create_prediction_job_store(),
+    predictors={"torch": predict_pet_disease_torch, "vision": predict_pet_disease_custom_vision},
+    workers=settings.PREDICTION_JOB_WORKERS,
+    max_queued=settings.PREDICTION_JOB_MAX_QUEUED,
+    result_ttl_seconds=settings.PREDICTION_JOB_RESULT_TTL_SECONDS,
+    retry_after_seconds=settings.INFERENCE_RETRY_AFTER_SECONDS,
+    lease_seconds=settings.PREDICTION_JOB_LEASE_SECONDS,
+)
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import Histogram, metrics
+from app.schemas.predict import PredictionResult
+from app.services.predict_service import (
+    PredictFn,
+    prediction_error,
+    predict_pet_disease_torch,
+    predict_pet_disease_custom_vision,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackendStats:
+    """(backend, pet_type) 별 최근 지연 시간과 성공/실패 기록"""
+    latency: Histogram  # 라우팅 판단용 (최근 latency_window 건)
+    exported: Histogram  # /metrics 노출용
+    outcomes: Deque[bool] = field(default_factory=deque)
+    last_failure_at: Optional[float] = None
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes)
+
+
+class PredictionRouter:
+    """
+    여러 예측 백엔드 중 빠르고 정상인 쪽으로 요청을 보낸다. (pet_type 별로 따로 판단)
+    - 순서: 정상 백엔드 우선, 그 안에서 최근 p50 지연 시간이 짧은 순 (기록이 부족하면 설정 순서)
+    - hedging: 첫 백엔드가 자신의 p95 안에 응답하지 않으면 다음 백엔드도 동시에 호출해 먼저 온 결과 사용
+      (취소된 느린 호출도 그때까지 걸린 시간을 지연 시간 기록에 남김)
+    - fallback: 백엔드가 5xx로 실패하면 바로 다음 백엔드 호출 (4xx는 요청 문제라 그대로 반환)
+    - 전체 요청은 budget_ms 안에 끝나야 하며, 넘으면 504
+    - 최근 error_window 건 중 실패 비율이 max_error_rate 를 넘으면 cooldown 동안 비정상으로 보고 뒤로 미룬다
+    """
+
+    def __init__(
+        self,
+        backends: Dict[str, PredictFn],
+        budget_ms: float,
+        hedge_quantile: float,
+        default_hedge_ms: float,
+        min_samples: int,
+        latency_window: int,
+        error_window: int,
+        max_error_rate: float,
+        unhealthy_cooldown_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._backends = backends
+        self._budget_ms = budget_ms
+        self._hedge_quantile = hedge_quantile
+        self._default_hedge_ms = default_hedge_ms
+        self._min_samples = min_samples
+        self._latency_window = latency_window
+        self._error_window = error_window
+        self._max_error_rate = max_error_rate
+        self._unhealthy_cooldown_seconds = unhealthy_cooldown_seconds
+        self._clock = clock
+        self._stats: Dict[Tuple[str, str], BackendStats] = {}
+
+    def _get_stats(self, backend: str, pet_type: str) -> BackendStats:
+        # 지표 라벨이 잘못된 pet_type으로 늘어나지 않도록 결과를 기록할 때만 만든다
+        key = (backend, pet_type)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = BackendStats(
+                latency=Histogram(window=self._latency_window),
+                exported=metrics.histogram("prediction_backend_ms", backend=backend, pet_type=pet_type),
+                outcomes=deque(maxlen=self._error_window),
+            )
+        return stats
+
+    def is_healthy(self, backend: str, pet_type: str) -> bool:
+        stats = self._stats.get((backend, pet_type))
+        if stats is None or len(stats.outcomes) < min(self._min_samples, self._error_window):
+            return True
+        if stats.error_rate() <= self._max_error_rate:
+            return True
+        # 비정상이어도 cooldown이 지나면 다시 시도해서 회복 여부를 확인
+        return self._clock() - stats.last_failure_at >= self._unhealthy_cooldown_seconds
+
+    def _typical_ms(self, backend: str, pet_type: str, q: float) -> Optional[float]:
+        stats = self._stats.get((backend, pet_type))
+        if stats is None or stats.latency.count < self._min_samples:
+            return None
+        return stats.latency.quantile(q)
+
+    def route(self, pet_type: str) -> List[str]:
+        """이번 요청에서 시도할 백엔드 순서"""
+        names = list(self._backends)
+
+        def sort_key(name: str):
+            p50 = self._typical_ms(name, pet_type, 0.5)
+            return (not self.is_healthy(name, pet_type), p50 if p50 is not None else float("inf"), names.index(name))
+
+        return sorted(names, key=sort_key)
+
+    def _hedge_after_ms(self, backend: str, pet_type: str) -> float:
+        p95 = self._typical_ms(backend, pet_type, self._hedge_quantile)
+        return p95 if p95 is not None else self._default_hedge_ms
+
+    async def _call(self, backend: str, image_url: str, pet_type: str) -> List[PredictionResult]:
+        started = self._clock()
+        try:
+            results = await self._backends[backend](image_url, pet_type)
+        except asyncio.CancelledError:
+            # hedging/제한 시간으로 취소된 호출은 predict 에서 _record_cancelled 로 기록
+            raise
+        except Exception as e:
+            if prediction_error(e)[0] >= 500:
+                stats = self._get_stats(backend, pet_type)
+                stats.outcomes.append(False)
+                stats.last_failure_at = self._clock()
+            raise
+        elapsed_ms = (self._clock() - started) * 1000
+        stats = self._get_stats(backend, pet_type)
+        stats.latency.observe(elapsed_ms)
+        stats.exported.observe(elapsed_ms)
+        stats.outcomes.append(True)
+        return results
+
+    def _record_cancelled(self, backend: str, pet_type: str, started: float, hedge_after_ms: float) -> None:
+        """
+        취소된 호출의 지연 시간은 최소 지금까지 걸린 시간이라는 기록(censored)으로 남긴다.
+        남기지 않으면 느려진 백엔드가 예전의 빠른 p50/p95를 유지해서 계속 먼저 선택된다.
+        (hedge 기준보다 먼저 취소된 호출은 느리다는 근거가 없으므로 제외)
+        """
+        elapsed_ms = (self._clock() - started) * 1000
+        if elapsed_ms >= hedge_after_ms:
+            self._get_stats(backend, pet_type).latency.observe(elapsed_ms)
+
+    async def predict(self, image_url: str, pet_type: str) -> Tuple[str, List[PredictionResult]]:
+        """(결과를 낸 백엔드 이름, 예측 결과)"""
+        order = self.route(pet_type)
+        deadline = self._clock() + self._budget_ms / 1000
+        pending: Dict[asyncio.Task, str] = {}
+        launched: Dict[asyncio.Task, Tuple[float, float]] = {}  # task -> (시작 시각, hedge 기준 ms)
+        last_error: Optional[Exception] = None
+
+        def launch() -> float:
+            """다음 백엔드를 시작하고, 그 다음 hedge 시각을 돌려준다"""
+            backend = order.pop(0)
+            hedge_after_ms = self._hedge_after_ms(backend, pet_type)
+            task = asyncio.ensure_future(self._call(backend, image_url, pet_type))
+            pending[task] = backend
+            launched[task] = (self._clock(), hedge_after_ms)
+            if len(pending) > 1 or last_error is not None:
+                metrics.counter("prediction_router_fallbacks_total", reason="hedge" if last_error is None else "error").inc()
+            return self._clock() + hedge_after_ms / 1000
+
+        try:
+            next_hedge_at = launch()
+            while pending:
+                wake_at = min(next_hedge_at, deadline) if order else deadline
+                done, _ = await asyncio.wait(
+                    pending, timeout=max(wake_at - self._clock(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    backend = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        metrics.counter("prediction_router_requests_total", backend=backend).inc()
+                        return backend, task.result()
+                    if prediction_error(error)[0] < 500:
+                        raise error  # 잘못된 요청은 다른 백엔드도 똑같이 실패
+                    logger.warning(f"Prediction backend {backend} failed (pet_type: {pet_type}): {str(error)}")
+                    last_error = error
+
+                if self._clock() >= deadline:
+                    break
+                if order and (not pending or self._clock() >= next_hedge_at):
+                    next_hedge_at = launch()
+
+            if last_error is not None and not pending:
+                raise last_error
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"예측이 제한 시간({self._budget_ms:g}ms) 안에 끝나지 않았습니다"
+            )
+        finally:
+            for task, backend in pending.items():
+                if not task.done():
+                    task.cancel()
+                    self._record_cancelled(backend, pet_type, *launched[task])
+
+
+prediction_router = PredictionRouter(
+    backends={
+        name: {"torch": predict_pet_disease_torch, "vision": predict_pet_disease_custom_vision}[name]
+        for name in settings.ROUTING_BACKENDS
+    },
+    budget_ms=settings.ROUTING_LATENCY_BUDGET_MS,
+    hedge_quantile=settings.ROUTING_HEDGE_QUANTILE,
+    default_hedge_ms=settings.ROUTING_DEFAULT_HEDGE_MS,
+    min_samples=settings.ROUTING_MIN_SAMPLES,
+    latency_window=settings.ROUTING_LATENCY_WINDOW,
+    error_window=settings.ROUTING_ERROR_WINDOW,
+    max_error_rate=settings.ROUTING_MAX_ERROR_RATE,
+    unhealthy_cooldown_seconds=settings.ROUTING_UNHEALTHY_COOLDOWN_SECONDS,
+)
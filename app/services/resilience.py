@@ -0,0 +1,87 @@
+import random
+import threading
+import time
+from typing import Callable
+
+from app.core.metrics import metrics
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit '{name}' is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold 번 쌓이면 reset_timeout 동안 호출을 바로 거절(open)하고,
+    그 뒤 한 번의 시험 호출(half-open)이 성공하면 다시 닫는다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+        self._open_gauge = metrics.gauge("circuit_breaker_open", breaker=name)
+        self._rejected = metrics.counter("circuit_breaker_rejected_total", breaker=name)
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self._reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        """호출 전에 확인. 열려 있으면 CircuitOpenError"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            now = self._clock()
+            # 시험 호출은 하나만 허용 (취소되어 결과가 기록되지 않은 시험 호출은 reset_timeout 후 다시 허용)
+            if state == "half_open" and (
+                self._probe_started_at is None or now - self._probe_started_at >= self._reset_timeout
+            ):
+                self._probe_started_at = now
+                return
+            self._rejected.inc()
+            retry_after = max(self._opened_at + self._reset_timeout - now, 0.0)
+            raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started_at = None
+            self._open_gauge.set(0)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probe_started_at is not None or self._failures >= self._failure_threshold:
+                self._opened_at = self._clock()
+                self._open_gauge.set(1)
+            self._probe_started_at = None
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    maximum: float,
+    rand: Callable[[], float] = random.random,
+) -> float:
+    """지수 백오프 + full jitter: [0, min(maximum, base * 2^attempt)) 사이의 임의 시간"""
+    return rand() * min(maximum, base * (2 ** attempt))
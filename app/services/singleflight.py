@@ -0,0 +1,62 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class _Call:
+    """진행 중인 작업 하나와 그 결과를 기다리는 호출 수"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나의 작업으로 합친다.
+    첫 호출(leader)만 fn을 실행하고 나머지는 같은 결과(또는 예외)를 기다린다.
+    작업은 별도 태스크로 실행되므로 leader 요청이 취소돼도 다른 요청은 영향을 받지 않는다.
+    기다리는 호출이 모두 취소되면 결과를 받을 곳이 없으므로 작업도 취소한다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._leaders = metrics.counter("singleflight_leaders_total", group=name)
+        self._coalesced = metrics.counter("singleflight_coalesced_total", group=name)
+        self._abandoned = metrics.counter("singleflight_abandoned_total", group=name)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            self._leaders.inc()
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda t: self._forget(key, call))
+        else:
+            self._coalesced.inc()
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # 취소 중인 작업에 새 호출이 붙지 않도록 먼저 키에서 뺀다
+                self._abandoned.inc()
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # 기다리던 요청이 모두 취소된 경우에도 예외가 처리되지 않았다는 경고가 남지 않도록 조회
+        if call.task.done() and not call.task.cancelled():
+            call.task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,189 @@
+import asyncio
+import base64
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional, Protocol, Set
+
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobBlock, BlobServiceClient, ContentSettings
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class UploadStorage(Protocol):
+    """업로드 이미지 저장소. save 는 조각(chunk) 스트림을 받아 저장하고 공개 URL을 돌려준다."""
+
+    @property
+    def url_prefix(self) -> str:
+        ...
+
+    async def save(self, name: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> str:
+        ...
+
+    async def exists(self, name: str) -> bool:
+        ...
+
+    async def delete(self, name: str) -> None:
+        """없으면 아무것도 하지 않는다"""
+        ...
+
+
+class AzureBlobUploadStorage:
+    """
+    Azure Blob Storage(또는 Azurite) 저장소
+    - BlobServiceClient(HTTP 연결 풀)는 한 번만 만들어 모든 요청이 공유
+    - 파일을 block_size 단위 블록으로 나눠 받는 대로 stage_block 하고 마지막에 commit_block_list
+      (업로드 하나가 쥐는 메모리는 block_size * (max_concurrency + 1) 이하)
+    - block_size 보다 작은 파일은 upload_blob 한 번으로 올린다
+    SDK가 동기 API라 호출은 스레드에서 실행한다. (비동기 SDK는 aiohttp 의존성이 필요)
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        container: str,
+        block_size: int,
+        max_concurrency: int,
+        client_factory: Callable[[str], BlobServiceClient] = BlobServiceClient.from_connection_string,
+    ):
+        self._connection_string = connection_string
+        self._container = container
+        self._block_size = block_size
+        self._max_concurrency = max_concurrency
+        self._client_factory = client_factory
+        self._client: Optional[BlobServiceClient] = None
+        self._client_lock = threading.Lock()
+        self._bytes = metrics.counter("upload_bytes_total", backend="azure")
+
+    def _get_client(self) -> BlobServiceClient:
+        with self._client_lock:
+            if self._client is None:
+                self._client = self._client_factory(self._connection_string)
+            return self._client
+
+    @property
+    def url_prefix(self) -> str:
+        return f"{self._get_client().url.rstrip('/')}/{self._container}/"
+
+    async def exists(self, name: str) -> bool:
+        blob_client = self._get_client().get_blob_client(container=self._container, blob=name)
+        return await asyncio.to_thread(blob_client.exists)
+
+    async def delete(self, name: str) -> None:
+        blob_client = self._get_client().get_blob_client(container=self._container, blob=name)
+        try:
+            await asyncio.to_thread(blob_client.delete_blob)
+        except ResourceNotFoundError:
+            pass
+
+    async def save(self, name: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> str:
+        blob_client = self._get_client().get_blob_client(container=self._container, blob=name)
+        content_settings = ContentSettings(content_type=content_type) if content_type else None
+
+        buffer = bytearray()
+        block_ids = []
+        in_flight: Set[asyncio.Future] = set()
+
+        async def stage(data: bytes) -> None:
+            # 블록 ID는 base64 이고 한 blob 안에서 길이가 모두 같아야 한다
+            block_id = base64.b64encode(f"{len(block_ids):08d}".encode()).decode()
+            block_ids.append(block_id)
+            while len(in_flight) >= self._max_concurrency:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                in_flight.difference_update(done)
+                for task in done:
+                    task.result()
+            in_flight.add(asyncio.ensure_future(asyncio.to_thread(blob_client.stage_block, block_id, data, length=len(data))))
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                self._bytes.inc(len(chunk))
+                while len(buffer) >= self._block_size:
+                    block = bytes(buffer[:self._block_size])
+                    del buffer[:self._block_size]
+                    await stage(block)
+
+            if not block_ids:
+                # 같은 이름이면 내용도 같으므로(uuid 또는 내용 해시) 덮어써도 된다
+                await asyncio.to_thread(
+                    blob_client.upload_blob, bytes(buffer), overwrite=True, content_settings=content_settings
+                )
+            else:
+                if buffer:
+                    await stage(bytes(buffer))
+                for task in asyncio.as_completed(in_flight):
+                    await task
+                in_flight.clear()
+                await asyncio.to_thread(
+                    blob_client.commit_block_list,
+                    [BlobBlock(block_id=block_id) for block_id in block_ids],
+                    content_settings=content_settings,
+                )
+        finally:
+            # 커밋되지 않은 블록은 Azure가 일정 기간 뒤 알아서 지운다
+            for task in in_flight:
+                task.cancel()
+        return blob_client.url
+
+
+class FilesystemUploadStorage:
+    """로컬 디렉토리 저장소 (개발/테스트용). base_url 아래에서 파일을 서빙한다고 가정한다."""
+
+    def __init__(self, root_dir: str, base_url: str):
+        self._root = Path(root_dir)
+        self._base_url = base_url.rstrip("/")
+        self._bytes = metrics.counter("upload_bytes_total", backend="filesystem")
+
+    @property
+    def root_dir(self) -> Path:
+        return self._root
+
+    @property
+    def url_prefix(self) -> str:
+        return f"{self._base_url}/"
+
+    async def exists(self, name: str) -> bool:
+        return await asyncio.to_thread((self._root / name).exists)
+
+    async def delete(self, name: str) -> None:
+        await asyncio.to_thread((self._root / name).unlink, missing_ok=True)
+
+    async def save(self, name: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> str:
+        await asyncio.to_thread(self._root.mkdir, parents=True, exist_ok=True)
+        path = self._root / name
+        # 다 받기 전에는 다른 요청이 반쯤 쓴 파일을 보지 않도록 임시 파일에 쓰고 마지막에 옮긴다
+        partial = path.with_name(f".{name}.{uuid.uuid4().hex}.part")
+        handle = await asyncio.to_thread(open, partial, "wb")
+        try:
+            try:
+                async for chunk in chunks:
+                    await asyncio.to_thread(handle.write, chunk)
+                    self._bytes.inc(len(chunk))
+            finally:
+                await asyncio.to_thread(handle.close)
+            await asyncio.to_thread(os.replace, partial, path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        return f"{self._base_url}/{name}"
+
+
+def create_upload_storage() -> UploadStorage:
+    if settings.UPLOAD_BACKEND == "filesystem":
+        return FilesystemUploadStorage(settings.UPLOAD_LOCAL_DIR, settings.UPLOAD_LOCAL_BASE_URL)
+    return AzureBlobUploadStorage(
+        connection_string=settings.AZURE_CONNECTION_STRING,
+        container=settings.STORAGE_NAME,
+        block_size=settings.UPLOAD_BLOCK_SIZE,
+        max_concurrency=settings.UPLOAD_MAX_CONCURRENCY,
+    )
+
+
+upload_storage = create_upload_storage()
@@ -0,0 +1,85 @@
+"""
+image_url 다운로드 비교 벤치마크: 기존 requests.get 순차 호출 vs 공유 ImageFetcher 동시 호출
+
+로컬 HTTP 서버를 띄워 임의 이미지를 내려주므로 외부 네트워크 없이 실행된다.
+    python -m benchmarks.bench_image_fetch --requests 200 --concurrency 20 --size-kb 2048
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.services.image_fetcher import ImageFetcher
+
+
+def start_server(payload: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_requests(url: str, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        requests.get(url).content
+    return time.perf_counter() - started
+
+
+async def bench_fetcher(url: str, count: int, concurrency: int) -> float:
+    fetcher = ImageFetcher(
+        max_connections=concurrency,
+        max_connections_per_host=concurrency,
+        connect_timeout=3.0,
+        read_timeout=10.0,
+        max_bytes=64 * 1024 * 1024,
+    )
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            await fetcher.fetch(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(count)])
+    elapsed = time.perf_counter() - started
+    await fetcher.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--size-kb", type=int, default=2048)
+    args = parser.parse_args()
+
+    server = start_server(os.urandom(args.size_kb * 1024))
+    url = f"http://127.0.0.1:{server.server_address[1]}/image.jpg"
+
+    baseline = bench_requests(url, args.requests)
+    pooled = asyncio.run(bench_fetcher(url, args.requests, args.concurrency))
+    server.shutdown()
+
+    print(f"requests.get (sequential): {baseline:.3f}s ({args.requests / baseline:.1f} req/s)")
+    print(f"ImageFetcher (concurrency={args.concurrency}): {pooled:.3f}s ({args.requests / pooled:.1f} req/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+이미지 전처리 비교 벤치마크: 기존 transforms.Compose 경로 vs ImagePreprocessor
+
+휴대폰 사진 크기(12MP 이상)의 JPEG을 메모리에서 만들어 비교하므로 별도 데이터 없이 실행된다.
+    python -m benchmarks.bench_preprocess --megapixels 12 24 --repeat 10 --batch-size 8
+"""
+import argparse
+import time
+from io import BytesIO
+from typing import Callable, List
+
+import numpy as np
+import torch
+import torchvision.transforms as transforms
+from PIL import Image
+
+from app.ai_models.preprocessing import ImagePreprocessor
+
+# 변경 전 predict_service 의 전처리
+legacy_transform = transforms.Compose([
+    transforms.Resize((224, 224)),
+    transforms.ToTensor(),
+    transforms.Normalize(
+        mean=[0.485, 0.456, 0.406],
+        std=[0.229, 0.224, 0.225]
+    ),
+])
+
+
+def legacy_preprocess(data: bytes) -> torch.Tensor:
+    return legacy_transform(Image.open(BytesIO(data)).convert("RGB"))
+
+
+def make_photo(megapixels: float, seed: int) -> bytes:
+    """부드러운 그라데이션 + 노이즈로 사진과 비슷한 압축률의 4:3 JPEG을 만든다."""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    noise = rng.integers(-12, 12, size=(height, width, 3))
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # 워밍업
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[12, 24])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    preprocessor = ImagePreprocessor()
+    for megapixels in args.megapixels:
+        images: List[bytes] = [make_photo(megapixels, seed) for seed in range(args.batch_size)]
+        size_mb = sum(len(data) for data in images) / len(images) / 1024 / 1024
+
+        legacy_ms = timed(lambda: legacy_preprocess(images[0]), args.repeat)
+        single_ms = timed(lambda: preprocessor.preprocess(images[0]), args.repeat)
+
+        legacy_batch_ms = timed(lambda: torch.stack([legacy_preprocess(data) for data in images]), args.repeat)
+        buffer = preprocessor.new_batch(len(images))
+        batch_ms = timed(lambda: preprocessor.preprocess_batch(images, out=buffer), args.repeat)
+
+        diff = (legacy_preprocess(images[0]) - preprocessor.preprocess(images[0])).abs()
+        print(f"[{megapixels:g}MP, {size_mb:.1f}MB JPEG]")
+        print(f"  single  legacy={legacy_ms:8.1f} ms  new={single_ms:8.1f} ms  x{legacy_ms / single_ms:.1f}")
+        print(
+            f"  batch{len(images):<2d} legacy={legacy_batch_ms:8.1f} ms  new={batch_ms:8.1f} ms  "
+            f"x{legacy_batch_ms / batch_ms:.1f}"
+        )
+        print(f"  output diff  max={float(diff.max()):.4f}  mean={float(diff.mean()):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""목록 페이지네이션 인덱스 추가
+
+Revision ID: 4b7e2c9a1f03
+Revises: d6fbf9b1fcbb
+Create Date: 2026-10-18 10:12:45.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2c9a1f03'
+down_revision: Union[str, None] = 'd6fbf9b1fcbb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 목록 API의 (created_at, id) keyset 페이지네이션용 복합 인덱스
+    op.create_index('ix_diseases_created_at_id', 'diseases', ['created_at', 'id'], unique=False)
+    op.create_index('ix_hospitals_created_at_id', 'hospitals', ['created_at', 'id'], unique=False)
+    op.create_index('ix_insurances_created_at_id', 'insurances', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_insurances_created_at_id', table_name='insurances')
+    op.drop_index('ix_hospitals_created_at_id', table_name='hospitals')
+    op.drop_index('ix_diseases_created_at_id', table_name='diseases')
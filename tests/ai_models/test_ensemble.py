@@ -0,0 +1,123 @@
+import pytest
+import torch
+import torch.nn as nn
+from app.ai_models.architectures import EnsembleModel
+from app.core.metrics import metrics
+
+class FixedLogits(nn.Module):
+    """입력 행마다 정해진 logits를 돌려주는 테스트용 멤버 모델"""
+    def __init__(self, logits):
+        super().__init__()
+        self.logits = torch.tensor(logits, dtype=torch.float32)
+        self.calls = 0
+        self.rows = 0
+
+    def forward(self, x):
+        self.calls += 1
+        self.rows += x.shape[0]
+        return self.logits[x[:, 0].long()]
+
+def make_members():
+    # 입력 행 0: 첫 번째 모델이 확신, 행 1: 첫 번째 모델이 애매함
+    first = FixedLogits([[10.0, 0.0, 0.0], [1.0, 1.0, 0.0]])
+    second = FixedLogits([[0.0, 2.0, 0.0], [0.0, 3.0, 0.0]])
+    return first, second
+
+INPUT = torch.tensor([[0.0], [1.0]])
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_ensemble_equal_weights_is_mean(parallel):
+    first, second = make_members()
+    model = EnsembleModel([first, second], parallel=parallel)
+
+    with torch.no_grad():
+        output = model(INPUT)
+
+    expected = torch.mean(torch.stack([first(INPUT), second(INPUT)]), dim=0)
+    assert torch.allclose(output, expected)
+    assert model.variant == ""
+
+def test_ensemble_weighted_average():
+    first, second = make_members()
+    model = EnsembleModel([first, second], weights=[3, 1])
+
+    output = model(INPUT)
+
+    assert torch.allclose(output, 0.75 * first(INPUT) + 0.25 * second(INPUT))
+    assert model.variant == "w=0.75,0.25"
+
+def test_ensemble_early_exit_skips_confident_rows():
+    first, second = make_members()
+    model = EnsembleModel([first, second], early_exit_threshold=0.9, names=["first", "second"])
+    skipped_before = metrics.counter("ensemble_early_exit_rows_total").value
+
+    output = model(INPUT)
+
+    # 행 0은 첫 번째 모델 결과 그대로, 행 1만 두 번째 모델까지 실행해서 평균
+    assert torch.allclose(output[0], first.logits[0])
+    assert torch.allclose(output[1], (first.logits[1] + second.logits[1]) / 2)
+    assert second.rows == 1
+    assert metrics.counter("ensemble_early_exit_rows_total").value == skipped_before + 1
+    assert metrics.histogram("ensemble_member_ms", member="second").count >= 1
+
+def test_ensemble_metrics_are_split_by_pet_type():
+    first, second = make_members()
+    model = EnsembleModel([first, second], names=["first", "second"], pet_type="cat")
+    dog_before = metrics.histogram("ensemble_member_ms", member="first", pet_type="dog").count
+
+    model(INPUT)
+
+    assert metrics.histogram("ensemble_member_ms", member="first", pet_type="cat").count == 1
+    assert metrics.histogram("ensemble_member_ms", member="first", pet_type="dog").count == dog_before
+
+def test_ensemble_early_exit_all_confident_skips_second_model():
+    first, second = make_members()
+    model = EnsembleModel([first, second], early_exit_threshold=0.9)
+
+    output = model(INPUT[:1])
+
+    assert torch.allclose(output, first.logits[:1])
+    assert second.calls == 0
+
+def test_ensemble_rejects_invalid_weights():
+    with pytest.raises(ValueError):
+        EnsembleModel(list(make_members()), weights=[1.0])
+
+def test_ensemble_fx_trace_skips_metrics_and_early_exit():
+    torch.manual_seed(0)
+    model = EnsembleModel([nn.Linear(4, 3), nn.Linear(4, 3)], early_exit_threshold=0.9)
+    rows_before = metrics.counter("ensemble_rows_total").value
+
+    # prepare_fx(정적 양자화) 가 쓰는 것과 같은 FX symbolic trace
+    traced = torch.fx.symbolic_trace(model)
+
+    assert metrics.counter("ensemble_rows_total").value == rows_before
+    x = torch.randn(5, 4)
+    expected = EnsembleModel._combine([m(x) for m in model.models], model.weights)
+    assert torch.allclose(traced(x), expected)
+
+class ThreadProbe(nn.Module):
+    """forward 가 실행될 때의 intra-op 스레드 수를 기록"""
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def forward(self, x):
+        self.threads.append(torch.get_num_threads())
+        return x
+
+def test_parallel_ensemble_splits_intra_op_threads_between_members():
+    before = torch.get_num_threads()
+    torch.set_num_threads(4)
+    try:
+        first, second = ThreadProbe(), ThreadProbe()
+        model = EnsembleModel([first, second], parallel=True)
+
+        with torch.no_grad():
+            model(torch.ones(2, 3))
+
+        # 멤버마다 호출한 스레드 몫(4)의 절반, 끝나면 호출한 스레드는 원래대로
+        assert first.threads == second.threads == [2]
+        assert torch.get_num_threads() == 4
+    finally:
+        torch.set_num_threads(before)
@@ -0,0 +1,52 @@
+import json
+import pytest
+import torch
+from PIL import Image
+from app.ai_models.architectures import build_resnet18
+from app.ai_models.compiled import load_compiled_model
+from app.ai_models.export import main
+
+LABELS = ["피부염", "결막염", "정상"]
+
+@pytest.fixture
+def checkpoint_dir(tmp_path):
+    torch.manual_seed(0)
+    torch.save(build_resnet18(len(LABELS)).state_dict(), tmp_path / "dog_resnet.pth")
+    (tmp_path / "labels.json").write_text(json.dumps(LABELS))
+    eval_dir = tmp_path / "eval"
+    eval_dir.mkdir()
+    for i in range(3):
+        Image.new("RGB", (320, 240), (i * 80, 100, 200 - i * 60)).save(eval_dir / f"{i}.jpg")
+    return tmp_path
+
+def run_export(checkpoint_dir, output, *extra):
+    return main([
+        "--checkpoint", str(checkpoint_dir / "dog_resnet.pth"),
+        "--labels", str(checkpoint_dir / "labels.json"),
+        "--output", str(output),
+        "--eval-dir", str(checkpoint_dir / "eval"),
+        *extra,
+    ])
+
+def test_export_torchscript_with_quantization(checkpoint_dir):
+    output = checkpoint_dir / "dog.ts"
+
+    assert run_export(checkpoint_dir, output, "--quantize", "dynamic", "--channels-last") == 0
+
+    model, labels, metadata = load_compiled_model(output, "torchscript")
+    assert labels == LABELS
+    assert metadata.quantize == "dynamic"
+    assert metadata.channels_last
+    assert model(torch.zeros(2, 3, 224, 224)).shape == (2, len(LABELS))
+
+    report = json.loads((checkpoint_dir / "dog.ts.report.json").read_text())
+    assert report["passed"]
+    assert report["images"] == 3
+
+def test_export_is_not_written_when_accuracy_gate_fails(checkpoint_dir):
+    output = checkpoint_dir / "dog.ts"
+
+    assert run_export(checkpoint_dir, output, "--quantize", "dynamic", "--max-prob-delta", "-1") == 1
+
+    assert not output.exists()
+    assert not json.loads((checkpoint_dir / "dog.ts.report.json").read_text())["passed"]
@@ -0,0 +1,59 @@
+from io import BytesIO
+import numpy as np
+import pytest
+import torch
+import torchvision.transforms as transforms
+from PIL import Image
+from app.ai_models.preprocessing import ImagePreprocessor, default_preprocessor
+
+legacy_transform = transforms.Compose([
+    transforms.Resize((224, 224)),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+])
+
+def encode(image: Image.Image, format: str) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format)
+    return buffer.getvalue()
+
+def random_image(width: int, height: int, mode: str = "RGB") -> Image.Image:
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 255, (height, width, 3), dtype=np.uint8)).convert(mode)
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "L", "P"])
+def test_preprocess_matches_legacy_transform(mode):
+    data = encode(random_image(640, 480, mode), "PNG")
+
+    expected = legacy_transform(Image.open(BytesIO(data)).convert("RGB"))
+    actual = default_preprocessor.preprocess(data)
+
+    assert actual.shape == (3, 224, 224)
+    assert torch.allclose(actual, expected, atol=1e-5)
+
+def test_preprocess_large_jpeg_uses_draft_decoding():
+    image = Image.fromarray(np.kron(
+        np.random.default_rng(1).integers(0, 255, (75, 100, 3), dtype=np.uint8),
+        np.ones((40, 40, 1), dtype=np.uint8),
+    ))  # 4000x3000 (12MP)
+    data = encode(image, "JPEG")
+
+    preprocessor = ImagePreprocessor()
+    assert max(preprocessor.decode(data).size) <= 1000
+
+    expected = legacy_transform(Image.open(BytesIO(data)).convert("RGB"))
+    assert (preprocessor.preprocess(data) - expected).abs().mean() < 0.02
+
+def test_preprocess_batch_writes_into_buffer():
+    images = [encode(random_image(300 + i * 50, 200), "PNG") for i in range(3)]
+    buffer = default_preprocessor.new_batch(4)
+
+    batch = default_preprocessor.preprocess_batch(images, out=buffer)
+
+    assert batch.shape == (3, 3, 224, 224)
+    assert batch.data_ptr() == buffer.data_ptr()
+    for data, row in zip(images, batch):
+        assert torch.equal(row, default_preprocessor.preprocess(data))
+
+    with pytest.raises(ValueError):
+        default_preprocessor.preprocess_batch(images, out=default_preprocessor.new_batch(2))
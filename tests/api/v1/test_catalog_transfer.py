@@ -0,0 +1,120 @@
+import asyncio
+import json
+import pytest
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.crud import catalog_io
+from app.crud.cache import catalog_cache
+from app.db.session import get_db
+from app.main import app
+from app.models.base import Base
+
+@pytest.fixture
+def client(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'test.sqlite3'}"
+
+    async def create_tables():
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(create_tables())
+    catalog_cache.clear()
+    engine = create_async_engine(url, poolclass=NullPool)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = override_get_db
+    test_client = TestClient(app)
+    # 실행된 SQL 문 (캐시에서 응답했는지 확인용)
+    test_client.queries = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: test_client.queries.append(args[2]))
+    yield test_client
+    app.dependency_overrides.clear()
+    catalog_cache.clear()
+
+def test_import_then_export_ndjson(client):
+    records = [
+        {"name": f"질병 {i}", "type": f"type-{i}", "details": [{"detail_type": "증상", "detail_value": "설명"}]}
+        for i in range(3)
+    ]
+    body = "\n".join(json.dumps(r, ensure_ascii=False) for r in records) + "\n{broken\n"
+
+    imported = client.post(
+        "/api/v1/diseases/import",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    exported = client.get("/api/v1/diseases/export")
+
+    assert imported.status_code == 200
+    assert imported.json()["imported"] == 3
+    assert imported.json()["errors"][0]["line"] == 4
+    assert exported.status_code == 200
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    assert sorted(json.loads(line)["name"] for line in exported.text.splitlines()) == ["질병 0", "질병 1", "질병 2"]
+
+def test_export_csv_has_header(client):
+    response = client.get("/api/v1/diseases/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.text.splitlines() == ["name,type,details,hospitals,insurances"]
+
+def test_import_returns_partial_result_when_stopped(client, monkeypatch):
+    write_batch = catalog_io._write_batch
+
+    async def failing_write(db, batch, result, mode):
+        if result.imported:
+            raise ConnectionError("DB 연결 끊김")
+        await write_batch(db, batch, result, mode)
+
+    monkeypatch.setattr(catalog_io, "_write_batch", failing_write)
+    body = "\n".join(json.dumps({"name": f"질병 {i}", "type": f"type-{i}"}, ensure_ascii=False) for i in range(3))
+
+    response = client.post(
+        "/api/v1/diseases/import",
+        params={"batch_size": 1},
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 500
+    assert response.json()["imported"] == 1
+    assert response.json()["aborted"] is True
+
+def test_hospitals_and_insurances_by_disease_are_served_from_cache(client):
+    record = {
+        "name": "피부염",
+        "type": "dermatitis",
+        "hospitals": [{"hospital_name": "동물병원", "address": "서울", "contact_info": "02-000-0000"}],
+        "insurances": [{"insurance_name": "펫보험", "policy_details": "보장"}],
+    }
+    client.post(
+        "/api/v1/diseases/import",
+        content=json.dumps(record, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    disease_id = client.get("/api/v1/diseases/", params={"include": ""}).json()[0]["id"]
+
+    first = client.get(f"/api/v1/diseases/{disease_id}/hospitals")
+    client.queries.clear()
+    second = client.get(f"/api/v1/diseases/{disease_id}/hospitals")
+    insurances = client.get(f"/api/v1/diseases/{disease_id}/insurances")
+
+    assert first.json() == second.json()
+    assert [h["hospital_name"] for h in second.json()] == ["동물병원"]
+    assert [i["insurance_name"] for i in insurances.json()] == ["펫보험"]
+    assert client.queries == []  # 두 번째 병원 조회와 보험 조회 모두 질병 캐시에서
+
+def test_hospitals_by_unknown_disease_is_empty(client):
+    response = client.get("/api/v1/diseases/00000000-0000-0000-0000-000000000000/hospitals")
+
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.db.session import get_db
+from app.main import app
+from app.models.base import Base
+from app.models.disease import Disease
+
+@pytest.fixture
+def client(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'test.sqlite3'}"
+
+    async def seed():
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+            session.add_all([Disease(name=f"질병 {i}") for i in range(5)])
+            await session.commit()
+        await engine.dispose()
+
+    asyncio.run(seed())
+    session_maker = async_sessionmaker(create_async_engine(url, poolclass=NullPool), class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def test_disease_list_returns_next_cursor_header(client):
+    first = client.get("/api/v1/diseases/", params={"limit": 3})
+    second = client.get("/api/v1/diseases/", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+
+    assert first.status_code == second.status_code == 200
+    assert len(first.json()) == 3
+    assert len(second.json()) == 2
+    assert "X-Next-Cursor" not in second.headers
+    assert {d["id"] for d in first.json()}.isdisjoint(d["id"] for d in second.json())
+
+def test_invalid_cursor_returns_400(client):
+    response = client.get("/api/v1/diseases/", params={"cursor": "garbage"})
+
+    assert response.status_code == 400
+
+def test_disease_list_include_controls_relations(client):
+    full = client.get("/api/v1/diseases/", params={"limit": 1})
+    summary = client.get("/api/v1/diseases/", params={"limit": 1, "include": ""})
+    details = client.get("/api/v1/diseases/", params={"limit": 1, "include": "details"})
+
+    assert {"details", "hospitals", "insurances"} <= full.json()[0].keys()
+    assert summary.json()[0].keys() == {"id", "name", "type", "created_at", "updated_at"}
+    assert details.json()[0]["details"] == []
+    assert "hospitals" not in details.json()[0]
+
+def test_unknown_include_returns_400(client):
+    response = client.get("/api/v1/diseases/", params={"include": "owners"})
+
+    assert response.status_code == 400
@@ -0,0 +1,50 @@
+import json
+from fastapi.testclient import TestClient
+from app.api.v1.endpoints import prediction
+from app.main import app
+from app.schemas.predict import PredictionResult
+
+async def fake_predict(image_url: str, pet_type: str):
+    if pet_type not in ("dog", "cat"):
+        raise ValueError(f"지원되지 않는 pet_type: {pet_type}")
+    return [PredictionResult(tag_name=f"{pet_type}-{image_url}", probability=0.9)]
+
+BODY = {
+    "items": [
+        {"image_url": "a.jpg", "pet_type": "dog"},
+        {"image_url": "b.jpg", "pet_type": "bird"},
+        {"image_url": "c.jpg", "pet_type": "cat"},
+    ]
+}
+
+def test_torch_batch_returns_results_in_request_order(monkeypatch):
+    monkeypatch.setattr(prediction, "predict_pet_disease_torch", fake_predict)
+    client = TestClient(app)
+
+    response = client.post("/api/v1/prediction/torch/batch", json=BODY)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["index"] for item in data] == [0, 1, 2]
+    assert data[0]["predictions"][0]["tag_name"] == "dog-a.jpg"
+    assert data[1]["status_code"] == 400
+    assert data[2]["predictions"][0]["tag_name"] == "cat-c.jpg"
+
+def test_torch_batch_streams_ndjson(monkeypatch):
+    monkeypatch.setattr(prediction, "predict_pet_disease_torch", fake_predict)
+    client = TestClient(app)
+
+    response = client.post("/api/v1/prediction/torch/batch?stream=true", json=BODY)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+
+def test_torch_batch_rejects_too_many_items(monkeypatch):
+    monkeypatch.setattr(prediction.settings, "PREDICTION_BATCH_MAX_ITEMS", 2)
+    client = TestClient(app)
+
+    response = client.post("/api/v1/prediction/torch/batch", json=BODY)
+
+    assert response.status_code == 400
@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+from app.api.v1.endpoints import upload
+from app.core.config import settings
+from app.main import app
+from app.services.image_derivatives import UploadPipeline
+from app.services.upload_storage import FilesystemUploadStorage
+import hashlib
+from PIL import Image
+from conftest import make_jpeg
+
+def make_client(monkeypatch, tmp_path):
+    storage = FilesystemUploadStorage(str(tmp_path), "http://testserver/uploads")
+    monkeypatch.setattr(upload, "upload_storage", storage)
+    monkeypatch.setattr(upload, "upload_pipeline", UploadPipeline(storage, model_size=64, thumbnail_size=32, spool_memory_bytes=1024))
+    return TestClient(app)
+
+def test_upload_streams_file_to_storage(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_DERIVATIVES_ENABLED", False)
+    monkeypatch.setattr(settings, "UPLOAD_DEDUP_ENABLED", False)
+    client = make_client(monkeypatch, tmp_path)
+    data = b"\xff\xd8" + b"x" * 200_000
+
+    response = client.post("/api/v1/upload/", files={"file": ("cat.JPG", data, "image/jpeg")})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["filename"] == "cat.JPG"
+    name = body["url"].rsplit("/", 1)[1]
+    assert name.endswith(".jpg")
+    assert (tmp_path / name).read_bytes() == data
+
+def test_upload_rejects_file_over_limit(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1000)
+    client = make_client(monkeypatch, tmp_path)
+
+    response = client.post("/api/v1/upload/", files={"file": ("cat.jpg", b"x" * 5000, "image/jpeg")})
+
+    assert response.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+def test_upload_rejects_disallowed_extension(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, tmp_path)
+
+    response = client.post("/api/v1/upload/", files={"file": ("run.exe", b"MZ", "application/octet-stream")})
+
+    assert response.status_code == 400
+
+def test_upload_requires_file_field(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, tmp_path)
+
+    response = client.post("/api/v1/upload/", data={"other": "value"}, files={"other_file": ("a.jpg", b"x")})
+
+    assert response.status_code == 400
+
+def test_upload_stores_model_derivative_and_thumbnail(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, tmp_path)
+    data = make_jpeg()
+
+    response = client.post("/api/v1/upload/", files={"file": ("dog.jpg", data, "image/jpeg")})
+
+    assert response.status_code == 200
+    body = response.json()
+    name = body["url"].rsplit("/", 1)[1]
+    assert (tmp_path / name).read_bytes() == data
+    assert body["model_url"].endswith(name.replace(".jpg", ".model.jpg"))
+    assert body["thumbnail_url"].endswith(name.replace(".jpg", ".thumb.jpg"))
+    with Image.open(tmp_path / body["model_url"].rsplit("/", 1)[1]) as model_image:
+        assert min(model_image.size) == 64
+
+def test_upload_rejects_file_that_is_not_an_image(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, tmp_path)
+
+    response = client.post("/api/v1/upload/", files={"file": ("fake.png", b"not really a png", "image/png")})
+
+    assert response.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+def test_repeated_upload_returns_existing_url(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, tmp_path)
+    data = make_jpeg()
+
+    first = client.post("/api/v1/upload/", files={"file": ("a.jpg", data, "image/jpeg")}).json()
+    second = client.post("/api/v1/upload/", files={"file": ("b.jpg", data, "image/jpeg")}).json()
+
+    assert first["content_hash"] == hashlib.sha256(data).hexdigest()
+    assert second["url"] == first["url"]
+    assert second["filename"] == "b.jpg"
+    assert len(list(tmp_path.iterdir())) == 3
@@ -1,11 +1,42 @@
+import asyncio
 import pytest
+from io import BytesIO
+from PIL import Image
 from typing import AsyncGenerator, Generator
 from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event
 from app.main import app
+from app.crud.cache import catalog_cache
 from app.db.session import get_db
+from app.models.base import Base as ModelBase
+
+# 여러 테스트 모듈이 같이 쓰는 도우미 (from conftest import ...)
+class FakeClock:
+    """clock 인자로 넘기는 가짜 시계. now 를 직접 바꿔서 시간을 흐르게 한다"""
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+async def chunks(data: bytes, size: int = 1000):
+    """바이트를 size 씩 나눠 주는 업로드 본문 스트림 (조각마다 이벤트 루프에 양보)"""
+    for start in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[start:start + size]
+
+def make_jpeg(size=(300, 200), orientation=None) -> bytes:
+    image = Image.new("RGB", size, (200, 120, 40))
+    buffer = BytesIO()
+    if orientation is None:
+        image.save(buffer, format="JPEG")
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
 
 # SQLite in-memory 데이터베이스 사용
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -66,4 +97,32 @@ def client() -> Generator[TestClient, None, None]:
     # TestClient 초기화 수정
     with TestClient(app, base_url="http://test") as test_client:
         yield test_client
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+# 질병 카탈로그(crud/서비스) 테스트용: 앱 모델 테이블을 만든 in-memory DB를 테스트마다 새로 쓴다
+@pytest.fixture
+async def catalog_engine():
+    catalog_cache.clear()
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(ModelBase.metadata.create_all)
+    yield engine
+    await engine.dispose()
+    catalog_cache.clear()
+
+@pytest.fixture
+def sessions(catalog_engine):
+    # 요청마다 세션이 새로 열리는 것처럼 호출마다 새 세션을 쓴다
+    return async_sessionmaker(catalog_engine, class_=AsyncSession, expire_on_commit=False)
+
+@pytest.fixture
+async def db(sessions):
+    async with sessions() as session:
+        yield session
+
+@pytest.fixture
+def queries(catalog_engine):
+    # 이 fixture 를 요청한 뒤 실행된 SQL 문
+    recorded = []
+    event.listen(catalog_engine.sync_engine, "before_cursor_execute", lambda *args: recorded.append(args[2]))
+    return recorded
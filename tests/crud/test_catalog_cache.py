@@ -0,0 +1,122 @@
+from datetime import datetime
+from uuid import uuid4
+import pytest
+from app.crud import disease as disease_crud
+from app.crud import hospital as hospital_crud
+from app.crud.cache import CatalogCache, LocalInvalidationChannel, catalog_cache, disease_key
+from app.schemas.disease import DiseaseCreate, DiseaseDetailCreate, DiseaseSchema, DiseaseUpdate
+from app.schemas.hospital import HospitalCreate
+from conftest import FakeClock
+
+def make_schema(name="피부염"):
+    now = datetime(2025, 1, 1)
+    return DiseaseSchema(id=uuid4(), name=name, type="skin", created_at=now, updated_at=now, details=[])
+
+async def create(sessions, type="dermatitis"):
+    async with sessions() as db:
+        return await disease_crud.create_disease(
+            db, DiseaseCreate(name="피부염", type=type, details=[DiseaseDetailCreate(detail_type="증상", detail_value="가려움")])
+        )
+
+async def read(sessions, read_fn, *args):
+    async with sessions() as db:
+        return await read_fn(db, *args)
+
+@pytest.mark.asyncio
+async def test_second_read_is_served_from_cache():
+    cache = CatalogCache(ttl_seconds=60, max_entries=10)
+    schema = make_schema()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        return schema
+
+    first = await cache.get_or_load(disease_key(schema.id), load)
+    second = await cache.get_or_load(disease_key(schema.id), load)
+
+    assert loads == 1
+    assert first == second == schema
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = CatalogCache(ttl_seconds=60, max_entries=10, clock=clock)
+    schema = make_schema()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        return schema
+
+    await cache.get_or_load("k", load)
+    clock.now = 61
+    await cache.get_or_load("k", load)
+
+    assert loads == 2
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_is_not_overwritten_by_stale_value():
+    cache = CatalogCache(ttl_seconds=60, max_entries=10)
+    schema = make_schema()
+
+    async def load():
+        # DB 를 읽는 사이에 다른 요청이 같은 질병을 수정
+        await cache.invalidate(schema.id)
+        return schema
+
+    await cache.get_or_load(disease_key(schema.id), load)
+
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_other_workers_through_channel():
+    channel = LocalInvalidationChannel()
+    worker_a = CatalogCache(ttl_seconds=60, max_entries=10, channel=channel)
+    worker_b = CatalogCache(ttl_seconds=60, max_entries=10, channel=channel)
+    schema = make_schema()
+
+    async def load():
+        return schema
+
+    await worker_a.get_or_load(disease_key(schema.id), load)
+    await worker_b.get_or_load(disease_key(schema.id), load)
+    await worker_a.invalidate(schema.id)
+
+    assert len(worker_a) == 0
+    assert len(worker_b) == 0
+
+@pytest.mark.asyncio
+async def test_update_invalidates_id_and_previous_type_keys(sessions):
+    disease = await create(sessions)
+    await read(sessions, disease_crud.get_disease_cached, disease.id)
+    await read(sessions, disease_crud.get_disease_by_type_cached, "dermatitis")
+
+    async with sessions() as db:
+        await disease_crud.update_disease(db, disease.id, DiseaseUpdate(name="아토피", type="atopy", details=[]))
+
+    assert (await read(sessions, disease_crud.get_disease_cached, disease.id)).name == "아토피"
+    assert await read(sessions, disease_crud.get_disease_by_type_cached, "dermatitis") is None
+    assert (await read(sessions, disease_crud.get_disease_by_type_cached, "atopy")).id == disease.id
+
+@pytest.mark.asyncio
+async def test_hospital_write_invalidates_parent_disease(sessions):
+    disease = await create(sessions)
+    assert (await read(sessions, disease_crud.get_disease_cached, disease.id)).hospitals == []
+
+    async with sessions() as db:
+        await hospital_crud.create_hospital(db, HospitalCreate(hospital_name="24시 동물병원", address="서울", contact_info="02-000-0000"), disease.id)
+
+    cached = await read(sessions, disease_crud.get_disease_cached, disease.id)
+    assert [h.hospital_name for h in cached.hospitals] == ["24시 동물병원"]
+
+@pytest.mark.asyncio
+async def test_absent_type_is_cached_until_a_disease_of_that_type_is_created(sessions):
+    assert await read(sessions, disease_crud.get_disease_by_type_cached, "otitis") is None
+    assert len(catalog_cache) == 1
+
+    disease = await create(sessions, type="otitis")
+
+    assert (await read(sessions, disease_crud.get_disease_by_type_cached, "otitis")).id == disease.id
@@ -0,0 +1,157 @@
+import json
+import pytest
+from sqlalchemy import func, select
+from app.crud import catalog_io
+from app.crud import disease as disease_crud
+from app.models.disease import Disease, DiseaseDetail
+from app.models.hospital import Hospital
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+async def import_text(sessions, text, format="ndjson", batch_size=2, chunk_size=7, mode="skip"):
+    async with sessions() as db:
+        lines = catalog_io.iter_lines(chunked(text.encode("utf-8"), chunk_size))
+        return await catalog_io.import_catalog(db, lines, format, batch_size, mode)
+
+async def export_text(sessions, format):
+    async with sessions() as db:
+        return "".join([text async for text in catalog_io.export_catalog(db, format, batch_size=2)])
+
+async def count(sessions, model):
+    async with sessions() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+def record(i, details=2):
+    return {
+        "name": f"질병 {i}",
+        "type": f"type-{i}",
+        "details": [{"detail_type": "증상", "detail_value": f"설명 {j}"} for j in range(details)],
+        "hospitals": [{"hospital_name": "동물병원", "address": "서울", "contact_info": "02-000-0000"}],
+    }
+
+@pytest.mark.asyncio
+async def test_ndjson_import_reports_bad_records_and_keeps_the_rest(sessions):
+    text = "\n".join([
+        json.dumps(record(0), ensure_ascii=False),
+        "{not json",
+        json.dumps({"type": "이름 없음"}),
+        "",
+        json.dumps(record(1), ensure_ascii=False),
+        json.dumps(record(2), ensure_ascii=False),
+    ])
+
+    result = await import_text(sessions, text)
+
+    assert (result.imported, result.failed) == (3, 2)
+    assert [error.line for error in result.errors] == [2, 3]
+    assert await count(sessions, Disease) == 3
+    assert await count(sessions, DiseaseDetail) == 6
+    assert await count(sessions, Hospital) == 3
+
+@pytest.mark.asyncio
+async def test_csv_import_handles_quoted_newlines(sessions):
+    details = json.dumps([{"detail_type": "증상", "detail_value": "첫 줄\n둘째 줄"}], ensure_ascii=False)
+    text = (
+        "name,type,details,hospitals,insurances\n"
+        f'"피부염",dermatitis,"{details.replace(chr(34), chr(34) * 2)}",,\n'
+        '"여러 줄\n이름",,[],[],[]\n'
+        "열이 모자람\n"
+    )
+
+    result = await import_text(sessions, text, format="csv")
+
+    assert (result.imported, result.failed) == (2, 1)
+    assert result.errors[0].line == 5
+    async with sessions() as db:
+        values = (await db.execute(select(DiseaseDetail.detail_value))).scalars().all()
+    assert values == ["첫 줄\n둘째 줄"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+async def test_export_can_be_imported_again(sessions, format):
+    await import_text(sessions, "\n".join(json.dumps(record(i), ensure_ascii=False) for i in range(5)))
+
+    exported = await export_text(sessions, format)
+    async with sessions() as db:
+        await db.execute(Disease.__table__.delete())
+        await db.execute(DiseaseDetail.__table__.delete())
+        await db.execute(Hospital.__table__.delete())
+        await db.commit()
+    result = await import_text(sessions, exported, format=format)
+
+    assert (result.imported, result.failed) == (5, 0)
+    # 같은 배치의 행은 created_at 이 같을 수 있어 순서는 비교하지 않는다
+    assert sorted((await export_text(sessions, format)).splitlines()) == sorted(exported.splitlines())
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_per_record(sessions, monkeypatch):
+    insert_batch = catalog_io._insert_batch
+
+    async def flaky_insert(db, diseases, mode):
+        if any(d.name == "질병 1" for d in diseases):
+            raise RuntimeError("제약 조건 위반")
+        return await insert_batch(db, diseases, mode)
+
+    monkeypatch.setattr(catalog_io, "_insert_batch", flaky_insert)
+    text = "\n".join(json.dumps(record(i), ensure_ascii=False) for i in range(4))
+
+    result = await import_text(sessions, text, batch_size=4)
+
+    assert (result.imported, result.failed) == (3, 1)
+    assert result.errors[0].line == 2
+    assert await count(sessions, Disease) == 3
+
+def ndjson(records):
+    return "\n".join(json.dumps(r, ensure_ascii=False) for r in records)
+
+@pytest.mark.asyncio
+async def test_reimport_skips_existing_types(sessions):
+    await import_text(sessions, ndjson(record(i) for i in range(3)))
+
+    # 파일 안에서 같은 type 이 두 번 나와도 한 번만 저장
+    result = await import_text(sessions, ndjson([record(1), record(3), record(3)]))
+
+    assert (result.imported, result.skipped, result.failed) == (1, 2, 0)
+    assert await count(sessions, Disease) == 4
+    assert await count(sessions, DiseaseDetail) == 8
+    async with sessions() as db:
+        assert (await disease_crud.get_disease_by_type_cached(db, "type-3")).name == "질병 3"
+
+@pytest.mark.asyncio
+async def test_reimport_with_replace_updates_existing_disease(sessions):
+    await import_text(sessions, ndjson([record(0)]))
+    async with sessions() as db:
+        before = await disease_crud.get_disease_by_type_cached(db, "type-0")
+        # 예전 가져오기로 같은 type 이 중복 저장된 상태
+        db.add(Disease(name="중복", type="type-0"))
+        await db.commit()
+
+    result = await import_text(sessions, ndjson([{**record(0, details=1), "name": "새 이름"}]), mode="replace")
+
+    assert (result.imported, result.skipped) == (1, 0)
+    async with sessions() as db:
+        after = await disease_crud.get_disease_by_type_cached(db, "type-0")
+    assert after.id == before.id
+    assert after.name == "새 이름"
+    assert [d.detail_value for d in after.details] == ["설명 0"]
+    assert await count(sessions, Disease) == 1
+    assert await count(sessions, Hospital) == 1
+
+@pytest.mark.asyncio
+async def test_import_stopped_midway_returns_partial_result(sessions, monkeypatch):
+    write_batch = catalog_io._write_batch
+
+    async def failing_write(db, batch, result, mode):
+        if result.imported:
+            raise ConnectionError("DB 연결 끊김")
+        await write_batch(db, batch, result, mode)
+
+    monkeypatch.setattr(catalog_io, "_write_batch", failing_write)
+
+    result = await import_text(sessions, ndjson(record(i) for i in range(4)), batch_size=2)
+
+    assert result.aborted is True
+    assert result.imported == 2
+    assert await count(sessions, Disease) == 2
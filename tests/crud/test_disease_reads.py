@@ -0,0 +1,48 @@
+import pytest
+from app.crud import disease as disease_crud
+from app.models.disease import Disease, DiseaseDetail
+from app.models.hospital import Hospital
+
+@pytest.fixture(autouse=True)
+async def seed(sessions, queries):
+    async with sessions() as session:
+        for i in range(3):
+            disease = Disease(name=f"질병 {i}", type=f"type-{i}")
+            disease.details = [DiseaseDetail(detail_type="증상", detail_value="설명")]
+            disease.hospitals = [Hospital(hospital_name="동물병원", address="서울", contact_info="02-000-0000")]
+            session.add(disease)
+        await session.commit()
+    queries.clear()
+
+def tables(queries):
+    return [q.split("FROM ")[1].split()[0] for q in queries]
+
+@pytest.mark.asyncio
+async def test_summary_list_reads_only_disease_table(sessions, queries):
+    async with sessions() as db:
+        page = await disease_crud.get_diseases(db, include=())
+        schemas = [disease_crud.to_disease_schema(d, ()) for d in page.items]
+
+    assert tables(queries) == ["diseases"]
+    assert schemas[0].model_dump(exclude_unset=True).keys() == {"id", "name", "type", "created_at", "updated_at"}
+
+@pytest.mark.asyncio
+async def test_list_loads_only_requested_relations(sessions, queries):
+    async with sessions() as db:
+        page = await disease_crud.get_diseases(db, include=("hospitals",))
+        schemas = [disease_crud.to_disease_schema(d, ("hospitals",)) for d in page.items]
+
+    assert tables(queries) == ["diseases", "hospitals"]
+    assert "details" not in schemas[0].model_dump(exclude_unset=True)
+    assert schemas[0].hospitals[0].hospital_name == "동물병원"
+
+@pytest.mark.asyncio
+async def test_cached_detail_is_projected_to_include(sessions, queries):
+    async with sessions() as db:
+        full = await disease_crud.get_disease_by_type_cached(db, "type-0")
+        queries.clear()
+        slim = await disease_crud.get_disease_by_type_cached(db, "type-0", ("details",))
+
+    assert queries == []  # 캐시에서 잘라서 돌려줌
+    assert full.model_dump(exclude_unset=True).keys() >= {"details", "hospitals", "insurances"}
+    assert slim.model_dump(exclude_unset=True).keys() == {"id", "name", "type", "created_at", "updated_at", "details"}
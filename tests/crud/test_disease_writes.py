@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import event, func, select
+from app.crud import disease as disease_crud
+from app.crud import hospital as hospital_crud
+from app.crud import insurance as insurance_crud
+from app.models.disease import Disease, DiseaseDetail
+from app.models.hospital import Hospital
+from app.models.insurance import Insurance
+from app.schemas.disease import DiseaseCreate, DiseaseDetailCreate, DiseaseUpdate
+from app.schemas.hospital import HospitalCreate
+from app.schemas.insurance import InsuranceCreate
+
+@pytest.fixture
+def statements(catalog_engine):
+    # 실행된 SQL 문의 첫 단어와 COMMIT
+    recorded = []
+
+    def record(conn, cursor, statement, *args):
+        if not statement.startswith("PRAGMA"):
+            recorded.append(statement.split()[0])
+
+    event.listen(catalog_engine.sync_engine, "before_cursor_execute", record)
+    event.listen(catalog_engine.sync_engine, "commit", lambda conn: recorded.append("COMMIT"))
+    return recorded
+
+def disease_create(details=50):
+    return DiseaseCreate(
+        name="피부염",
+        type="dermatitis",
+        details=[DiseaseDetailCreate(detail_type="증상", detail_value=f"설명 {i}") for i in range(details)],
+        hospitals=[HospitalCreate(hospital_name="동물병원", address="서울", contact_info="02-000-0000")],
+        insurances=[InsuranceCreate(insurance_name="펫보험", policy_details="보장")],
+    )
+
+async def count(db, model, disease_id):
+    return await db.scalar(select(func.count()).select_from(model).where(model.disease_id == disease_id))
+
+@pytest.mark.asyncio
+async def test_create_inserts_children_in_bulk_with_one_commit(db, statements):
+    disease = await disease_crud.create_disease(db, disease_create(details=50))
+    writes = statements[:statements.index("COMMIT") + 1]
+
+    # 질병 1 + 상세/병원/보험 테이블마다 1
+    assert writes == ["INSERT"] * 4 + ["COMMIT"]
+    assert statements.count("COMMIT") == 1
+    assert len(disease.details) == 50
+    assert [h.hospital_name for h in disease.hospitals] == ["동물병원"]
+
+@pytest.mark.asyncio
+async def test_update_replaces_details_with_set_based_statements(db, statements):
+    disease = await disease_crud.create_disease(db, disease_create(details=50))
+    statements.clear()
+
+    updated = await disease_crud.update_disease(
+        db, disease.id,
+        DiseaseUpdate(name="아토피", type="atopy", details=[DiseaseDetailCreate(detail_type="원인", detail_value="알레르기")])
+    )
+
+    assert statements[:statements.index("COMMIT") + 1] == ["UPDATE", "DELETE", "INSERT", "COMMIT"]
+    assert updated.name == "아토피"
+    assert [(d.detail_type, d.detail_value) for d in updated.details] == [("원인", "알레르기")]
+    assert await count(db, Hospital, disease.id) == 1  # 병원/보험은 그대로
+
+@pytest.mark.asyncio
+async def test_update_missing_disease_returns_none(db):
+    disease = await disease_crud.create_disease(db, disease_create(details=1))
+    await disease_crud.delete_disease(db, disease.id)
+
+    assert await disease_crud.update_disease(db, disease.id, DiseaseUpdate(name="x", details=[])) is None
+
+@pytest.mark.asyncio
+async def test_delete_removes_disease_and_children(db, statements):
+    disease = await disease_crud.create_disease(db, disease_create(details=50))
+    statements.clear()
+
+    assert await disease_crud.delete_disease(db, disease.id) is True
+
+    assert statements == ["DELETE"] * 4 + ["COMMIT"]
+    assert await db.scalar(select(func.count()).select_from(Disease)) == 0
+    for model in (DiseaseDetail, Hospital, Insurance):
+        assert await count(db, model, disease.id) == 0
+    assert await disease_crud.delete_disease(db, disease.id) is False
+
+@pytest.mark.asyncio
+async def test_delete_children_by_disease(db):
+    disease = await disease_crud.create_disease(db, disease_create(details=1))
+
+    await hospital_crud.delete_hospitals_by_disease(db, disease.id)
+    await insurance_crud.delete_insurances_by_disease(db, disease.id)
+
+    assert await count(db, Hospital, disease.id) == 0
+    assert await count(db, Insurance, disease.id) == 0
+    assert await count(db, DiseaseDetail, disease.id) == 1
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from app.crud import disease as disease_crud
+from app.crud import hospital as hospital_crud
+from app.crud.pagination import decode_cursor, encode_cursor
+from app.models.disease import Disease
+from app.models.hospital import Hospital
+
+async def add_diseases(db, count):
+    base = datetime(2025, 1, 1)
+    # 같은 created_at 이 섞여 있어도 id 로 순서가 정해진다
+    diseases = [Disease(id=uuid4(), name=f"질병 {i}", created_at=base + timedelta(seconds=i // 3)) for i in range(count)]
+    db.add_all(diseases)
+    await db.commit()
+    return sorted(diseases, key=lambda d: (d.created_at, d.id.hex))
+
+def test_cursor_round_trip():
+    created_at, id = datetime(2025, 2, 3, 4, 5, 6, 789), uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, id)) == (created_at, id)
+
+def test_invalid_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_cursor_pages_cover_all_rows_in_order(db):
+    expected = await add_diseases(db, 25)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = await disease_crud.get_diseases(db, limit=10, cursor=cursor)
+        seen.extend(page.items)
+        pages += 1
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert pages == 3
+    assert [d.id for d in seen] == [d.id for d in expected]
+
+@pytest.mark.asyncio
+async def test_skip_limit_still_supported_with_stable_order(db):
+    expected = await add_diseases(db, 12)
+
+    page = await disease_crud.get_diseases(db, skip=5, limit=5)
+
+    assert [d.id for d in page.items] == [d.id for d in expected[5:10]]
+    assert page.next_cursor == encode_cursor(expected[9].created_at, expected[9].id)
+
+@pytest.mark.asyncio
+async def test_last_page_has_no_cursor(db):
+    disease = (await add_diseases(db, 1))[0]
+    db.add_all([Hospital(disease_id=disease.id, hospital_name=f"병원 {i}") for i in range(3)])
+    await db.commit()
+
+    page = await hospital_crud.get_hospitals(db, limit=3)
+
+    assert len(page.items) == 3
+    assert page.next_cursor is None
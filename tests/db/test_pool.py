@@ -0,0 +1,55 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.base import engine_options
+
+POSTGRES_URL = "postgresql+asyncpg://u:p@db:5432/app"
+
+def test_pooled_mode_sets_pool_and_statement_cache(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_MODE", "pooled")
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_PREPARED_STATEMENT_CACHE_SIZE", 250)
+
+    options = engine_options(POSTGRES_URL)
+
+    assert options["pool_size"] == 7
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+    assert "poolclass" not in options
+    assert options["connect_args"] == {"prepared_statement_cache_size": 250, "statement_cache_size": 250}
+
+def test_null_mode_opens_connection_per_session(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_MODE", "null")
+
+    options = engine_options(POSTGRES_URL)
+
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+
+def test_sqlite_keeps_driver_default_pool(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_MODE", "pooled")
+
+    options = engine_options("sqlite+aiosqlite:///:memory:")
+
+    assert "pool_size" not in options
+    assert "connect_args" not in options
+
+@pytest.mark.asyncio
+async def test_get_db_returns_503_when_pool_is_exhausted(monkeypatch, tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.sqlite3'}", pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    monkeypatch.setattr(db_session, "async_session_maker", async_sessionmaker(engine, class_=AsyncSession))
+    holder = db_session.get_db()
+    held = await holder.__anext__()
+    await held.execute(text("SELECT 1"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await db_session.get_db().__anext__()
+
+    assert exc_info.value.status_code == 503
+    await holder.aclose()
+    await engine.dispose()
@@ -0,0 +1,129 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.schemas.predict import ImagePredictionRequest, PredictionResult
+from app.services import predict_service
+from app.services.predict_service import predict_batch
+from app.services.singleflight import SingleFlight
+
+def items(*pairs):
+    return [ImagePredictionRequest(image_url=url, pet_type=pet_type) for url, pet_type in pairs]
+
+@pytest.mark.asyncio
+async def test_predict_batch_isolates_item_failures():
+    async def predict(image_url, pet_type):
+        if image_url == "missing":
+            raise HTTPException(status_code=400, detail="이미지 다운로드 실패")
+        if pet_type == "bird":
+            raise ValueError(f"지원되지 않는 pet_type: {pet_type}")
+        return [PredictionResult(tag_name=image_url, probability=1.0)]
+
+    results = [r async for r in predict_batch(items(("a", "dog"), ("missing", "dog"), ("c", "bird")), predict)]
+    by_index = {result.index: result for result in results}
+
+    assert by_index[0].status_code == 200
+    assert by_index[0].predictions[0].tag_name == "a"
+    assert (by_index[1].status_code, by_index[1].error) == (400, "이미지 다운로드 실패")
+    assert by_index[2].status_code == 400
+    assert by_index[2].predictions is None
+
+@pytest.mark.asyncio
+async def test_predict_batch_runs_concurrently_grouped_by_pet_type():
+    started = []
+    running = 0
+    max_running = 0
+
+    async def predict(image_url, pet_type):
+        nonlocal running, max_running
+        started.append(pet_type)
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return []
+
+    request = items(("1", "dog"), ("2", "cat"), ("3", "dog"), ("4", "cat"), ("5", "dog"))
+    results = [r async for r in predict_batch(request, predict, concurrency=3)]
+
+    assert sorted(result.index for result in results) == [0, 1, 2, 3, 4]
+    assert started == ["cat", "cat", "dog", "dog", "dog"]
+    assert max_running == 3
+
+@pytest.mark.asyncio
+async def test_predict_batch_cancels_remaining_work_when_consumer_stops():
+    cancelled = []
+
+    async def predict(image_url, pet_type):
+        try:
+            await asyncio.sleep(0 if image_url == "fast" else 10)
+        except asyncio.CancelledError:
+            cancelled.append(image_url)
+            raise
+        return []
+
+    results = predict_batch(items(("fast", "dog"), ("slow", "dog")), predict)
+    first = await results.__anext__()
+    await results.aclose()
+    await asyncio.sleep(0)
+
+    assert first.image_url == "fast"
+    assert cancelled == ["slow"]
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_share_one_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(predict_service.settings, "PREDICTION_BATCH_CONCURRENCY", 2)
+    monkeypatch.setattr(predict_service, "_batch_limiter", None)
+    running = 0
+    max_running = 0
+
+    async def predict(image_url, pet_type):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return []
+
+    async def consume(request):
+        return [r async for r in predict_batch(request, predict)]
+
+    first, second = await asyncio.gather(
+        consume(items(("1", "dog"), ("2", "dog"), ("3", "dog"))),
+        consume(items(("4", "cat"), ("5", "cat"), ("6", "cat"))),
+    )
+
+    assert len(first) == len(second) == 3
+    # 배치 요청 두 개가 합쳐서 한도를 넘지 않는다
+    assert max_running == 2
+
+@pytest.mark.asyncio
+async def test_disconnected_stream_stops_shared_prediction_work():
+    # 실제 예측 함수처럼 다운로드/추론을 SingleFlight 작업으로 실행
+    flight = SingleFlight("test-batch-disconnect")
+    invoked = []
+    cancelled = []
+
+    async def work(image_url):
+        invoked.append(image_url)
+        try:
+            await asyncio.sleep(0 if image_url == "0" else 10)
+        except asyncio.CancelledError:
+            cancelled.append(image_url)
+            raise
+        return []
+
+    async def predict(image_url, pet_type):
+        return await flight.do(image_url, lambda: work(image_url))
+
+    results = predict_batch(items(*[(str(i), "dog") for i in range(10)]), predict, concurrency=2)
+    first = await results.__anext__()
+    await results.aclose()
+    await asyncio.sleep(0)
+    invoked_at_disconnect = list(invoked)
+    await asyncio.sleep(0.01)
+
+    assert first.image_url == "0"
+    assert invoked == invoked_at_disconnect  # 연결이 끊긴 뒤로는 예측을 시작하지 않음
+    assert len(invoked) < 10
+    assert sorted(cancelled) == sorted(invoked[1:])  # 진행 중이던 공유 작업도 취소
+    assert flight.in_flight() == 0
@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+import torch
+from app.services.batching import MicroBatcher
+
+def make_batcher(batch_sizes: list, max_batch_size=8, max_wait_ms=20):
+    def forward(inputs: torch.Tensor):
+        batch_sizes.append(inputs.shape[0])
+        return [float(row.sum()) for row in inputs]
+
+    return MicroBatcher(name="test", forward=forward, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward():
+    batch_sizes = []
+    batcher = make_batcher(batch_sizes)
+
+    results = await asyncio.gather(*[batcher.submit(torch.full((3, 2, 2), float(i))) for i in range(5)])
+
+    assert batch_sizes == [5]
+    assert results == [i * 12.0 for i in range(5)]
+    await batcher.close()
+
+@pytest.mark.asyncio
+async def test_flushes_at_max_batch_size():
+    batch_sizes = []
+    batcher = make_batcher(batch_sizes, max_batch_size=4, max_wait_ms=1000)
+
+    await asyncio.wait_for(
+        asyncio.gather(*[batcher.submit(torch.zeros(3, 2, 2)) for _ in range(8)]),
+        timeout=1,
+    )
+
+    assert batch_sizes == [4, 4]
+    await batcher.close()
+
+@pytest.mark.asyncio
+async def test_forward_error_is_propagated_to_every_request():
+    def forward(inputs):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(name="failing", forward=forward, max_batch_size=4, max_wait_ms=5)
+    results = await asyncio.gather(
+        *[batcher.submit(torch.zeros(3, 2, 2)) for _ in range(2)],
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    await batcher.close()
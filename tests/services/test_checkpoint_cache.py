@@ -0,0 +1,101 @@
+import os
+import pytest
+from app.services.checkpoint_cache import CheckpointCache, LocalBlobSource
+
+class CountingSource(LocalBlobSource):
+    def __init__(self, root):
+        super().__init__(root)
+        self.downloads = []
+        self.revalidations = []
+
+    def download_to(self, name, stream, if_none_match=None):
+        etag = super().download_to(name, stream, if_none_match=if_none_match)
+        (self.downloads if etag else self.revalidations).append(name)
+        return etag
+
+@pytest.fixture
+def blob_dir(tmp_path):
+    root = tmp_path / "container"
+    root.mkdir()
+    (root / "dog.pth").write_bytes(b"x" * 100)
+    (root / "dog_labels.json").write_bytes(b'["a", "b"]')
+    return root
+
+def make_cache(source, tmp_path, max_bytes=10_000, revalidate_seconds=3600, grace_seconds=0):
+    return CheckpointCache(
+        source=source,
+        cache_dir=str(tmp_path / "cache"),
+        max_bytes=max_bytes,
+        revalidate_seconds=revalidate_seconds,
+        grace_seconds=grace_seconds,
+    )
+
+def test_second_cache_instance_does_not_download(blob_dir, tmp_path):
+    source = CountingSource(blob_dir)
+    assert make_cache(source, tmp_path).read_bytes("dog.pth") == b"x" * 100
+
+    # 워커 재시작: 새 인스턴스여도 디스크 캐시를 그대로 사용
+    assert make_cache(source, tmp_path).read_bytes("dog.pth") == b"x" * 100
+    assert source.downloads == ["dog.pth"]
+    assert source.revalidations == []
+
+def test_revalidation_uses_etag(blob_dir, tmp_path):
+    source = CountingSource(blob_dir)
+    cache = make_cache(source, tmp_path, revalidate_seconds=0)
+
+    cache.get_path("dog.pth")
+    cache.get_path("dog.pth")
+    assert source.downloads == ["dog.pth"]
+    assert source.revalidations == ["dog.pth"]
+
+    (blob_dir / "dog.pth").write_bytes(b"y" * 50)
+    os.utime(blob_dir / "dog.pth", ns=(1, 1))
+    assert cache.read_bytes("dog.pth") == b"y" * 50
+    assert source.downloads == ["dog.pth", "dog.pth"]
+
+def test_objects_are_content_addressed(blob_dir, tmp_path):
+    (blob_dir / "copy.pth").write_bytes(b"x" * 100)
+    cache = make_cache(LocalBlobSource(blob_dir), tmp_path)
+
+    assert cache.get_path("dog.pth") == cache.get_path("copy.pth")
+
+def test_lru_eviction(blob_dir, tmp_path):
+    (blob_dir / "cat.pth").write_bytes(b"z" * 100)
+    cache = make_cache(LocalBlobSource(blob_dir), tmp_path, max_bytes=150)
+
+    dog_path = cache.get_path("dog.pth")
+    cat_path = cache.get_path("cat.pth")
+
+    assert not dog_path.exists()
+    assert cat_path.exists()
+
+def test_workers_sharing_directory_merge_index(blob_dir, tmp_path):
+    (blob_dir / "cat.pth").write_bytes(b"z" * 100)
+    source = CountingSource(blob_dir)
+    worker_a = make_cache(source, tmp_path)
+    worker_b = make_cache(source, tmp_path)
+
+    dog_path = worker_a.get_path("dog.pth")
+    worker_b.get_path("cat.pth")
+
+    # b 가 인덱스를 저장해도 a 가 받은 항목이 남아 있어 다시 받지 않는다
+    assert worker_b.get_path("dog.pth") == dog_path
+    assert source.downloads == ["dog.pth", "cat.pth"]
+
+def test_recent_objects_are_not_evicted(blob_dir, tmp_path):
+    (blob_dir / "cat.pth").write_bytes(b"z" * 100)
+    cache = make_cache(LocalBlobSource(blob_dir), tmp_path, max_bytes=150, grace_seconds=600)
+    # 다른 워커가 방금 받아서 아직 인덱스에 올리지 않은 객체
+    orphan = tmp_path / "cache" / "objects" / ("0" * 64)
+    orphan.write_bytes(b"o")
+
+    dog_path = cache.get_path("dog.pth")
+    cache.get_path("cat.pth")
+
+    # 용량을 넘어도 유예 시간 안에 쓰인 객체는 남겨 둔다
+    assert dog_path.exists()
+    assert orphan.exists()
+
+    os.utime(orphan, (1, 1))
+    make_cache(LocalBlobSource(blob_dir), tmp_path, grace_seconds=600).get_path("dog_labels.json")
+    assert not orphan.exists()
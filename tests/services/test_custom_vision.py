@@ -0,0 +1,174 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from fastapi import HTTPException
+from app.services.custom_vision import CustomVisionClient, ImageUrlUnreadableError
+from app.services.resilience import CircuitBreaker
+
+class FakePredictionServer:
+    """Custom Vision classify_image 엔드포인트를 흉내 내는 로컬 서버"""
+
+    def __init__(self):
+        self.responses = []  # (status, delay_seconds) 순서대로 사용, 다 쓰면 200
+        self.error_code = "Error"  # 오류 응답 본문의 code
+        self.requests = 0
+        self.connections = set()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                fake.requests += 1
+                fake.connections.add(self.client_address)
+                status, delay = fake.responses.pop(0) if fake.responses else (200, 0)
+                time.sleep(delay)
+                if status == 200:
+                    body = json.dumps({
+                        "id": "00000000-0000-0000-0000-000000000001",
+                        "project": "00000000-0000-0000-0000-000000000002",
+                        "iteration": "00000000-0000-0000-0000-000000000003",
+                        "created": "2024-01-01T00:00:00Z",
+                        "predictions": [
+                            {"probability": 0.2, "tagId": "00000000-0000-0000-0000-000000000004", "tagName": "결막염"},
+                            {"probability": 0.7, "tagId": "00000000-0000-0000-0000-000000000005", "tagName": "피부염"},
+                        ],
+                    })
+                else:
+                    body = json.dumps({"code": fake.error_code, "message": f"status {status}"})
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def fake_server():
+    server = FakePredictionServer()
+    yield server
+    server.close()
+
+async def no_sleep(seconds):
+    pass
+
+def make_client(endpoint, **kwargs):
+    options = dict(
+        max_concurrency=4,
+        timeout_seconds=2.0,
+        max_retries=2,
+        backoff_base_seconds=0.01,
+        backoff_max_seconds=0.05,
+        breaker=CircuitBreaker("test-custom-vision", failure_threshold=2, reset_timeout=60),
+        sleep=no_sleep,
+    )
+    options.update(kwargs)
+    return CustomVisionClient(endpoint=endpoint, prediction_key="test-key", **options)
+
+async def classify(client):
+    return await client.classify_image(project_id="00000000-0000-0000-0000-000000000002", published_name="model", image_data=b"image")
+
+@pytest.mark.asyncio
+async def test_reuses_connection_across_calls(fake_server):
+    # HTTP 세션은 스레드별이라 스레드 1개로 고정하면 연결 하나만 사용해야 함
+    client = make_client(fake_server.endpoint, max_concurrency=1)
+    try:
+        for _ in range(3):
+            result = await classify(client)
+        assert max(p.probability for p in result.predictions) == pytest.approx(0.7)
+        assert fake_server.requests == 3
+        assert len(fake_server.connections) == 1
+    finally:
+        client.close()
+
+@pytest.mark.asyncio
+async def test_retries_throttled_and_server_errors(fake_server):
+    fake_server.responses = [(429, 0), (503, 0)]
+    client = make_client(fake_server.endpoint)
+    try:
+        result = await classify(client)
+        assert len(result.predictions) == 2
+        assert fake_server.requests == 3
+    finally:
+        client.close()
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(fake_server):
+    fake_server.responses = [(400, 0)]
+    client = make_client(fake_server.endpoint)
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            await classify(client)
+        assert exc_info.value.status_code == 500
+        assert fake_server.requests == 1
+    finally:
+        client.close()
+
+@pytest.mark.asyncio
+async def test_timeout_returns_504(fake_server):
+    fake_server.responses = [(200, 0.5)]
+    client = make_client(fake_server.endpoint, timeout_seconds=0.1, max_retries=0)
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            await classify(client)
+        assert exc_info.value.status_code == 504
+    finally:
+        client.close()
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_failures(fake_server):
+    fake_server.responses = [(503, 0)] * 2
+    client = make_client(fake_server.endpoint, max_retries=0)
+    try:
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await classify(client)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await classify(client)
+
+        assert exc_info.value.status_code == 503
+        assert "Retry-After" in exc_info.value.headers
+        assert fake_server.requests == 2  # 열린 동안은 upstream으로 보내지 않음
+    finally:
+        client.close()
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_return_503_with_retry_after(fake_server):
+    fake_server.responses = [(429, 0)] * 3
+    client = make_client(fake_server.endpoint)
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            await classify(client)
+        assert exc_info.value.status_code == 503
+        assert "Retry-After" in exc_info.value.headers
+        assert not isinstance(exc_info.value, ImageUrlUnreadableError)
+        assert fake_server.requests == 3
+    finally:
+        client.close()
+
+@pytest.mark.asyncio
+async def test_unreadable_image_url_is_marked(fake_server):
+    fake_server.responses = [(400, 0)]
+    fake_server.error_code = "BadRequestImageUrl"
+    client = make_client(fake_server.endpoint)
+    try:
+        with pytest.raises(ImageUrlUnreadableError):
+            await client.classify_image_url("00000000-0000-0000-0000-000000000002", "dog", "https://example.test/a.jpg")
+        assert fake_server.requests == 1
+    finally:
+        client.close()
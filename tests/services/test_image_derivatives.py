@@ -0,0 +1,157 @@
+import hashlib
+from io import BytesIO
+import pytest
+from PIL import Image
+from app.services.image_derivatives import UploadPipeline, derivative_url, make_derivatives, upload_content_hash
+from app.services.upload_storage import FilesystemUploadStorage
+from conftest import chunks, make_jpeg
+
+def test_derivatives_are_downscaled_by_shortest_side():
+    derivatives = make_derivatives(BytesIO(make_jpeg((1200, 800))), model_size=256, thumbnail_size=64)
+
+    with Image.open(BytesIO(derivatives.model)) as model_image:
+        assert model_image.size == (384, 256)
+    with Image.open(BytesIO(derivatives.thumbnail)) as thumbnail:
+        assert max(thumbnail.size) == 64
+    assert derivatives.format == "JPEG"
+
+def test_derivatives_apply_exif_orientation():
+    # orientation 6: 90도 회전해서 보여줘야 하는 세로 사진
+    derivatives = make_derivatives(BytesIO(make_jpeg((600, 400), orientation=6)), model_size=200, thumbnail_size=50)
+
+    assert (derivatives.width, derivatives.height) == (400, 600)
+    with Image.open(BytesIO(derivatives.model)) as model_image:
+        assert model_image.size == (200, 300)
+
+def test_small_image_is_not_upscaled():
+    derivatives = make_derivatives(BytesIO(make_jpeg((100, 80))), model_size=256, thumbnail_size=64)
+
+    with Image.open(BytesIO(derivatives.model)) as model_image:
+        assert model_image.size == (100, 80)
+
+def test_invalid_image_raises_value_error():
+    with pytest.raises(ValueError):
+        make_derivatives(BytesIO(b"\xff\xd8 definitely not a jpeg"), model_size=256, thumbnail_size=64)
+
+def test_derivative_url_sits_next_to_original():
+    assert derivative_url("https://acc.blob.core.windows.net/c/abc.jpeg", "model") == "https://acc.blob.core.windows.net/c/abc.model.jpg"
+
+def test_derivative_url_keeps_query_string_out_of_name():
+    url = "https://acc.blob.core.windows.net/c/abc.jpg?sv=2024-01-01&sig=a%2Fb"
+
+    assert derivative_url(url, "thumb") == "https://acc.blob.core.windows.net/c/abc.thumb.jpg?sv=2024-01-01&sig=a%2Fb"
+    assert upload_content_hash("https://h/c/" + "ab" * 32 + ".jpg?sig=x") == "ab" * 32
+
+class CountingStorage(FilesystemUploadStorage):
+    def __init__(self, root_dir):
+        super().__init__(root_dir, "http://localhost/uploads")
+        self.saved = []
+
+    async def save(self, name, chunks, content_type=None):
+        self.saved.append(name)
+        return await super().save(name, chunks, content_type)
+
+def make_pipeline(storage, **kwargs):
+    return UploadPipeline(storage, model_size=64, thumbnail_size=16, spool_memory_bytes=512, **kwargs)
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_original_and_derivatives_by_content_hash(tmp_path):
+    storage = CountingStorage(str(tmp_path))
+    data = make_jpeg((640, 480))
+    image_hash = hashlib.sha256(data).hexdigest()
+
+    stored = await make_pipeline(storage).save(".jpg", chunks(data), content_type="image/jpeg")
+
+    assert stored.content_hash == image_hash
+    assert stored.url == f"http://localhost/uploads/{image_hash}.jpg"
+    assert stored.model_url == f"http://localhost/uploads/{image_hash}.model.jpg"
+    assert stored.thumbnail_url == f"http://localhost/uploads/{image_hash}.thumb.jpg"
+    assert (tmp_path / f"{image_hash}.jpg").read_bytes() == data
+    assert upload_content_hash(stored.model_url) == image_hash
+
+@pytest.mark.asyncio
+async def test_pipeline_skips_writes_for_duplicate_upload(tmp_path):
+    storage = CountingStorage(str(tmp_path))
+    pipeline = make_pipeline(storage)
+    data = make_jpeg((320, 240))
+
+    first = await pipeline.save(".jpg", chunks(data))
+    second = await pipeline.save(".jpeg", chunks(data))
+    # 재시작 등으로 인덱스가 비어 있어도 저장소에 있으면 다시 쓰지 않는다 (확장자가 달라도 같은 이름)
+    third = await make_pipeline(storage).save(".JPEG", chunks(data))
+
+    assert first == second == third
+    assert len(storage.saved) == 3
+
+@pytest.mark.asyncio
+async def test_pipeline_adds_missing_derivatives_to_existing_original(tmp_path):
+    storage = CountingStorage(str(tmp_path))
+    data = make_jpeg((320, 240))
+    await make_pipeline(storage, derivatives=False).save(".jpg", chunks(data))
+
+    stored = await make_pipeline(storage).save(".jpg", chunks(data))
+
+    assert storage.saved[1:] == [f"{stored.content_hash}.model.jpg", f"{stored.content_hash}.thumb.jpg"]
+    assert stored.url.endswith(f"{stored.content_hash}.jpg")
+
+@pytest.mark.asyncio
+async def test_pipeline_without_dedup_uses_unique_names(tmp_path):
+    storage = CountingStorage(str(tmp_path))
+    pipeline = make_pipeline(storage, deduplicate=False, derivatives=False)
+    data = b"same bytes"
+
+    first = await pipeline.save(".png", chunks(data))
+    second = await pipeline.save(".png", chunks(data))
+
+    assert first.url != second.url
+    assert first.content_hash == second.content_hash == hashlib.sha256(data).hexdigest()
+
+@pytest.mark.asyncio
+async def test_pipeline_without_dedup_streams_while_validating(tmp_path):
+    events = []
+
+    class RecordingStorage(CountingStorage):
+        async def save(self, name, chunks, content_type=None):
+            async def recorded():
+                async for chunk in chunks:
+                    events.append("stored")
+                    yield chunk
+            return await super().save(name, recorded(), content_type)
+
+    async def source(data):
+        async for chunk in chunks(data, size=5000):
+            events.append("received")
+            yield chunk
+
+    storage = RecordingStorage(str(tmp_path))
+    data = make_jpeg((640, 480))
+
+    stored = await make_pipeline(storage, deduplicate=False).save(".jpg", source(data))
+
+    # 다 받기 전에 받은 조각부터 저장소로 넘어간다
+    assert events[:4] == ["received", "stored", "received", "stored"]
+    assert stored.content_hash == hashlib.sha256(data).hexdigest()
+    name = stored.url.rsplit("/", 1)[1]
+    assert (tmp_path / name).read_bytes() == data
+    assert stored.model_url.endswith(name.replace(".jpg", ".model.jpg"))
+
+@pytest.mark.asyncio
+async def test_pipeline_without_dedup_removes_streamed_non_image(tmp_path):
+    storage = CountingStorage(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        await make_pipeline(storage, deduplicate=False).save(".png", chunks(b"not really a png"))
+
+    assert len(storage.saved) == 1
+    assert list(tmp_path.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_pipeline_names_file_by_decoded_format(tmp_path):
+    storage = CountingStorage(str(tmp_path))
+    data = make_jpeg((64, 64))
+
+    deduplicated = await make_pipeline(storage).save(".png", chunks(data))
+    streamed = await make_pipeline(storage, deduplicate=False).save(".jpeg", chunks(data))
+
+    assert deduplicated.url.endswith(".jpg")
+    assert streamed.url.endswith(".jpg")
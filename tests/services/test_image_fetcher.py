@@ -0,0 +1,161 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.services import image_fetcher as image_fetcher_module
+from app.services.image_fetcher import FetchedImage, FetchedImageBuffer, ImageFetcher
+
+def make_fetcher(handler, max_bytes=1024, buffer=None, prefer_derivatives=False):
+    return ImageFetcher(
+        max_connections=4,
+        max_connections_per_host=2,
+        connect_timeout=1.0,
+        read_timeout=1.0,
+        max_bytes=max_bytes,
+        transport=httpx.MockTransport(handler),
+        buffer=buffer,
+        prefer_derivatives=prefer_derivatives,
+    )
+
+@pytest.mark.asyncio
+async def test_fetch_returns_body():
+    fetcher = make_fetcher(lambda request: httpx.Response(200, content=b"image", headers={"content-type": "image/png"}))
+
+    image = await fetcher.fetch("http://images.test/a.png")
+
+    assert image.data == b"image"
+    assert image.content_type == "image/png"
+    await fetcher.close()
+
+@pytest.mark.asyncio
+async def test_fetch_rejects_body_over_limit():
+    fetcher = make_fetcher(lambda request: httpx.Response(200, content=b"x" * 2048))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fetcher.fetch("http://images.test/big.jpg")
+
+    assert exc_info.value.status_code == 413
+    await fetcher.close()
+
+@pytest.mark.asyncio
+async def test_fetch_error_status_is_bad_request():
+    fetcher = make_fetcher(lambda request: httpx.Response(404))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fetcher.fetch("http://images.test/missing.jpg")
+
+    assert exc_info.value.status_code == 400
+    await fetcher.close()
+
+@pytest.mark.asyncio
+async def test_fetch_is_coalesced_and_buffered():
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, content=b"image")
+
+    fetcher = make_fetcher(handler, buffer=FetchedImageBuffer(max_bytes=1024, ttl_seconds=60))
+
+    images = await asyncio.gather(*[fetcher.fetch("http://images.test/a.png") for _ in range(3)])
+    again = await fetcher.fetch("http://images.test/a.png")
+
+    assert [image.data for image in images] == [b"image"] * 3
+    assert again.data == b"image"
+    assert requests == ["/a.png"]
+    await fetcher.close()
+
+def test_buffer_evicts_by_size_and_ttl():
+    now = [0.0]
+    buffer = FetchedImageBuffer(max_bytes=10, ttl_seconds=5, clock=lambda: now[0])
+
+    buffer.put(FetchedImage(url="a", data=b"12345"))
+    buffer.put(FetchedImage(url="b", data=b"12345"))
+    buffer.get("a")  # a를 최근 사용으로
+    buffer.put(FetchedImage(url="c", data=b"123"))
+
+    assert buffer.get("b") is None
+    assert buffer.get("a") is not None
+    assert buffer.total_bytes == 8
+
+    now[0] = 6
+    assert buffer.get("a") is None
+
+@pytest.mark.asyncio
+async def test_fetch_model_image_prefers_derivative(monkeypatch):
+    monkeypatch.setattr(image_fetcher_module, "is_hosted_image_url", lambda url: True)
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        return httpx.Response(200, content=b"small")
+
+    fetcher = make_fetcher(handler, prefer_derivatives=True)
+
+    image = await fetcher.fetch_model_image("http://storage.test/c/a.jpg")
+
+    assert image.data == b"small"
+    assert requested == ["/c/a.model.jpg"]
+    await fetcher.close()
+
+@pytest.mark.asyncio
+async def test_fetch_model_image_falls_back_to_original_once(monkeypatch):
+    monkeypatch.setattr(image_fetcher_module, "is_hosted_image_url", lambda url: True)
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        if request.url.path.endswith(".model.jpg"):
+            return httpx.Response(404)
+        return httpx.Response(200, content=b"original")
+
+    fetcher = make_fetcher(handler, prefer_derivatives=True)
+
+    first = await fetcher.fetch_model_image("http://storage.test/c/old.jpg")
+    second = await fetcher.fetch_model_image("http://storage.test/c/old.jpg")
+
+    assert first.data == second.data == b"original"
+    assert requested == ["/c/old.model.jpg", "/c/old.jpg", "/c/old.jpg"]
+    await fetcher.close()
+
+@pytest.mark.asyncio
+async def test_fetch_upstream_error_is_bad_gateway():
+    fetcher = make_fetcher(lambda request: httpx.Response(503))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fetcher.fetch("http://images.test/a.jpg")
+
+    assert exc_info.value.status_code == 502
+    await fetcher.close()
+
+@pytest.mark.asyncio
+async def test_fetch_ignores_malformed_content_length():
+    fetcher = make_fetcher(lambda request: httpx.Response(200, content=b"image", headers={"content-length": "abc"}))
+
+    assert (await fetcher.fetch("http://images.test/a.png")).data == b"image"
+    await fetcher.close()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failure", ["server_error", "connection_reset"])
+async def test_transient_derivative_failure_is_not_remembered(monkeypatch, failure):
+    monkeypatch.setattr(image_fetcher_module, "is_hosted_image_url", lambda url: True)
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        if request.url.path.endswith(".model.jpg") and len(requested) == 1:
+            if failure == "connection_reset":
+                raise httpx.ReadError("connection reset", request=request)
+            return httpx.Response(500)
+        return httpx.Response(200, content=b"small" if request.url.path.endswith(".model.jpg") else b"original")
+
+    fetcher = make_fetcher(handler, prefer_derivatives=True)
+
+    first = await fetcher.fetch_model_image("http://storage.test/c/a.jpg")
+    second = await fetcher.fetch_model_image("http://storage.test/c/a.jpg")
+
+    assert first.data == b"original"
+    assert second.data == b"small"  # 일시적인 실패는 기억하지 않고 다시 축소본을 시도
+    assert requested == ["/c/a.model.jpg", "/c/a.jpg", "/c/a.model.jpg"]
+    await fetcher.close()
@@ -0,0 +1,29 @@
+import threading
+import pytest
+from fastapi import HTTPException
+from app.services.inference_executor import InferenceExecutor
+
+@pytest.mark.asyncio
+async def test_slot_rejects_with_retry_after_when_full():
+    executor = InferenceExecutor(max_workers=1, max_pending=1, torch_threads=0, retry_after_seconds=3)
+
+    async with executor.slot():
+        with pytest.raises(HTTPException) as exc_info:
+            async with executor.slot():
+                pass
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "3"}
+
+    # 슬롯이 반환되면 다시 수락
+    async with executor.slot():
+        pass
+
+@pytest.mark.asyncio
+async def test_run_executes_off_the_event_loop_thread():
+    executor = InferenceExecutor(max_workers=1, max_pending=1, torch_threads=0, retry_after_seconds=1)
+
+    thread_name = await executor.run(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("inference")
+    executor.shutdown()
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+import torch.nn as nn
+from app.services.model_registry import ModelRegistry, LoadedModel, ModelSpec
+
+def make_loader(calls: list):
+    def loader(spec: ModelSpec) -> LoadedModel:
+        calls.append(spec.key)
+        return LoadedModel(spec=spec, model=nn.Identity(), labels=["a", "b"], is_ensemble=False)
+    return loader
+
+@pytest.mark.asyncio
+async def test_model_is_loaded_once_and_shared():
+    calls = []
+    registry = ModelRegistry(loader=make_loader(calls))
+
+    results = await asyncio.gather(*[registry.get("dog") for _ in range(10)])
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+@pytest.mark.asyncio
+async def test_models_are_keyed_by_pet_type():
+    calls = []
+    registry = ModelRegistry(loader=make_loader(calls))
+
+    dog = await registry.get("dog")
+    cat = await registry.get("cat")
+
+    assert dog is not cat
+    assert [key[0] for key in calls] == ["dog", "cat"]
+
+@pytest.mark.asyncio
+async def test_unsupported_pet_type():
+    registry = ModelRegistry(loader=make_loader([]))
+    with pytest.raises(ValueError):
+        await registry.get("bird")
+
+@pytest.mark.asyncio
+async def test_warmup_failure_does_not_raise():
+    def failing_loader(spec: ModelSpec) -> LoadedModel:
+        raise RuntimeError("blob unavailable")
+
+    registry = ModelRegistry(loader=failing_loader)
+    await registry.warmup(["dog"])
+    assert registry.peek("dog") is None
@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.schemas.predict import PredictionResult
+from app.services import predict_service
+from app.services.custom_vision import ImageUrlUnreadableError
+from app.services.image_fetcher import FetchedImage, hosted_image_url_prefix
+from app.services.prediction_cache import InMemoryPredictionCache, PredictionCache
+
+class FakeCustomVision:
+    def __init__(self, url_error=None):
+        self.calls = []
+        self.url_error = url_error
+
+    def _result(self):
+        return SimpleNamespace(predictions=[
+            SimpleNamespace(tag_name="피부염", probability=0.7),
+            SimpleNamespace(tag_name="결막염", probability=0.2),
+        ])
+
+    async def classify_image(self, project_id, published_name, image_data):
+        self.calls.append(("bytes", image_data))
+        return self._result()
+
+    async def classify_image_url(self, project_id, published_name, url):
+        self.calls.append(("url", url))
+        if self.url_error is not None:
+            raise self.url_error
+        return self._result()
+
+class FakeFetcher:
+    def __init__(self):
+        self.urls = []
+
+    async def fetch(self, url):
+        self.urls.append(url)
+        return FetchedImage(url=url, data=b"image-bytes")
+
+    async def fetch_model_image(self, url):
+        return await self.fetch(url)
+
+@pytest.fixture
+def fakes(monkeypatch):
+    vision = FakeCustomVision()
+    fetcher = FakeFetcher()
+    monkeypatch.setattr(predict_service, "custom_vision_client", vision)
+    monkeypatch.setattr(predict_service, "image_fetcher", fetcher)
+    monkeypatch.setattr(predict_service, "prediction_cache", PredictionCache(InMemoryPredictionCache(100), ttl_seconds=60))
+    return SimpleNamespace(vision=vision, fetcher=fetcher)
+
+@pytest.mark.asyncio
+async def test_hosted_image_is_classified_by_url(fakes):
+    url = hosted_image_url_prefix() + "a.jpg"
+
+    results = await predict_service.predict_pet_disease_custom_vision(url, "dog")
+
+    assert results[0].tag_name == "피부염"
+    assert fakes.vision.calls == [("url", url)]
+    assert fakes.fetcher.urls == []
+
+@pytest.mark.asyncio
+async def test_external_image_is_sent_as_bytes(fakes):
+    await predict_service.predict_pet_disease_custom_vision("http://example.test/a.jpg", "dog")
+
+    assert fakes.vision.calls == [("bytes", b"image-bytes")]
+    assert fakes.fetcher.urls == ["http://example.test/a.jpg"]
+
+@pytest.mark.asyncio
+async def test_url_classification_failure_falls_back_to_bytes(fakes):
+    fakes.vision.url_error = ImageUrlUnreadableError(status_code=500, detail="BadRequestImageUrl")
+    url = hosted_image_url_prefix() + "private.jpg"
+
+    results = await predict_service.predict_pet_disease_custom_vision(url, "cat")
+
+    assert len(results) == 2
+    assert [kind for kind, _ in fakes.vision.calls] == ["url", "bytes"]
+
+@pytest.mark.asyncio
+async def test_url_classification_upstream_failure_is_not_retried_with_bytes(fakes):
+    fakes.vision.url_error = HTTPException(status_code=503, detail="busy", headers={"Retry-After": "1"})
+    url = hosted_image_url_prefix() + "a.jpg"
+
+    with pytest.raises(HTTPException) as exc_info:
+        await predict_service.predict_pet_disease_custom_vision(url, "cat")
+
+    assert exc_info.value.status_code == 503
+    assert [kind for kind, _ in fakes.vision.calls] == ["url"]
+    assert fakes.fetcher.urls == []
+
+@pytest.mark.asyncio
+async def test_both_backends_isolate_failures(fakes, monkeypatch):
+    async def fake_torch(image_url, pet_type):
+        await predict_service.image_fetcher.fetch(image_url)
+        raise HTTPException(status_code=503, detail="busy")
+
+    monkeypatch.setattr(predict_service, "predict_pet_disease_torch", fake_torch)
+
+    combined = await predict_service.predict_pet_disease_both("http://example.test/b.jpg", "dog")
+
+    assert combined.torch is None
+    assert combined.errors == {"torch": "busy"}
+    assert combined.vision[0] == PredictionResult(tag_name="피부염", probability=0.7)
+
+@pytest.mark.asyncio
+async def test_content_addressed_upload_hits_torch_cache_without_download(fakes, monkeypatch):
+    async def get_model(pet_type):
+        return SimpleNamespace(model_version="ckpt@v1")
+
+    monkeypatch.setattr(predict_service.model_registry, "get", get_model)
+    image_hash = "ab" * 32
+    url = hosted_image_url_prefix() + f"{image_hash}.jpg"
+    cached = [PredictionResult(tag_name="피부염", probability=0.9)]
+    key = predict_service.prediction_cache.make_key("torch", "dog", "ckpt@v1", "upload:" + image_hash)
+    await predict_service.prediction_cache.set(key, cached)
+
+    results = await predict_service.predict_pet_disease_torch(url, "dog")
+
+    assert results == cached
+    assert fakes.fetcher.urls == []
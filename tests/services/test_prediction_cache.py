@@ -0,0 +1,43 @@
+import pytest
+from app.schemas.predict import PredictionResult
+from app.services.prediction_cache import InMemoryPredictionCache, PredictionCache
+from conftest import FakeClock
+
+RESULTS = [PredictionResult(tag_name="피부염", probability=0.9)]
+
+@pytest.mark.asyncio
+async def test_hit_after_set():
+    cache = PredictionCache(backend=InMemoryPredictionCache(max_entries=10), ttl_seconds=60)
+    key = cache.make_key("torch", "dog", "model@1", "abc")
+
+    assert await cache.get(key) is None
+    await cache.set(key, RESULTS)
+    assert await cache.get(key) == RESULTS
+
+@pytest.mark.asyncio
+async def test_model_version_is_part_of_key():
+    cache = PredictionCache(backend=InMemoryPredictionCache(max_entries=10), ttl_seconds=60)
+    await cache.set(cache.make_key("torch", "dog", "model@1", "abc"), RESULTS)
+
+    assert await cache.get(cache.make_key("torch", "dog", "model@2", "abc")) is None
+
+@pytest.mark.asyncio
+async def test_entries_expire():
+    clock = FakeClock()
+    backend = InMemoryPredictionCache(max_entries=10, clock=clock)
+    await backend.set("key", "value", ttl_seconds=10)
+
+    clock.now = 11
+    assert await backend.get("key") is None
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    backend = InMemoryPredictionCache(max_entries=2)
+    await backend.set("a", "1", ttl_seconds=60)
+    await backend.set("b", "2", ttl_seconds=60)
+    await backend.get("a")
+    await backend.set("c", "3", ttl_seconds=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == "1"
+    assert len(backend) == 2
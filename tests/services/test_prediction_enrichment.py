@@ -0,0 +1,139 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import pytest
+from app.crud.cache import catalog_cache
+from app.models.disease import Disease, DiseaseDetail
+from app.models.hospital import Hospital
+from app.schemas.predict import PredictionResult
+from app.services import prediction_enrichment
+
+LABELS = ["dermatitis", "otitis", "conjunctivitis"]
+
+@pytest.fixture(autouse=True)
+async def seed(sessions, queries):
+    async with sessions() as session:
+        for type in ["dermatitis", "otitis"]:
+            disease = Disease(name=f"{type} 질병", type=type)
+            disease.details = [DiseaseDetail(detail_type="증상", detail_value="설명")]
+            disease.hospitals = [Hospital(hospital_name="동물병원", address="서울", contact_info="02-000-0000")]
+            session.add(disease)
+        await session.commit()
+    queries.clear()
+
+@pytest.fixture
+def loaded_labels(monkeypatch):
+    monkeypatch.setattr(
+        prediction_enrichment.model_registry, "peek", lambda pet_type: SimpleNamespace(labels=LABELS)
+    )
+
+def disease_queries(queries):
+    return [q for q in queries if "FROM diseases" in q]
+
+@pytest.mark.asyncio
+async def test_lookup_runs_while_inference_is_in_progress(sessions, queries, loaded_labels):
+    inference_started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def predict(image_url, pet_type):
+        inference_started.set()
+        await release.wait()
+        return [PredictionResult(tag_name="otitis", probability=0.7), PredictionResult(tag_name="conjunctivitis", probability=0.2)]
+
+    task = asyncio.ensure_future(prediction_enrichment.predict_and_enrich("http://img", "dog", predict, sessions=sessions))
+    await inference_started.wait()
+    while not disease_queries(queries):
+        await asyncio.sleep(0)
+    release.set()
+    results = await task
+
+    assert len(disease_queries(queries)) == 1  # 라벨 전체를 IN 쿼리 한 번으로
+    assert results[0].disease.type == "otitis"
+    assert results[0].disease.hospitals[0].hospital_name == "동물병원"
+    assert results[1].disease is None  # 카탈로그에 없는 라벨
+
+@pytest.mark.asyncio
+async def test_unknown_tags_are_looked_up_after_inference(sessions, queries, monkeypatch):
+    monkeypatch.setattr(prediction_enrichment.model_registry, "peek", lambda pet_type: None)
+
+    async def predict(image_url, pet_type):
+        return [PredictionResult(tag_name="dermatitis", probability=0.9)]
+
+    results = await prediction_enrichment.predict_and_enrich("http://img", "dog", predict, sessions=sessions)
+
+    assert results[0].disease.type == "dermatitis"
+    assert len(disease_queries(queries)) == 1
+
+@pytest.mark.asyncio
+async def test_second_request_is_served_from_catalog_cache(sessions, queries, loaded_labels):
+    async def predict(image_url, pet_type):
+        return [PredictionResult(tag_name="dermatitis", probability=0.9)]
+
+    await prediction_enrichment.predict_and_enrich("http://img", "dog", predict, sessions=sessions)
+    queries.clear()
+    results = await prediction_enrichment.predict_and_enrich("http://img", "dog", predict, sessions=sessions)
+
+    assert results[0].disease.type == "dermatitis"
+    assert disease_queries(queries) == []
+
+class TrackedSessions:
+    """열린 세션 수를 세는 세션 팩토리"""
+
+    def __init__(self, sessions):
+        self._sessions = sessions
+        self.opened = 0
+        self.open = 0
+
+    @asynccontextmanager
+    async def __call__(self):
+        self.opened += 1
+        self.open += 1
+        try:
+            async with self._sessions() as session:
+                yield session
+        finally:
+            self.open -= 1
+
+@pytest.mark.asyncio
+async def test_session_is_closed_before_waiting_for_inference(sessions, queries, loaded_labels):
+    tracked = TrackedSessions(sessions)
+    release = asyncio.Event()
+    open_while_waiting = []
+
+    async def predict(image_url, pet_type):
+        await release.wait()
+        open_while_waiting.append(tracked.open)
+        return [PredictionResult(tag_name="otitis", probability=0.7)]
+
+    task = asyncio.ensure_future(prediction_enrichment.predict_and_enrich("http://img", "dog", predict, sessions=tracked))
+    # 미리 조회한 결과가 캐시에 들어가면 조회가 끝난 것
+    while not len(catalog_cache):
+        await asyncio.sleep(0.001)
+    release.set()
+    results = await task
+
+    assert open_while_waiting == [0]
+    assert results[0].disease.type == "otitis"
+
+@pytest.mark.asyncio
+async def test_cached_catalog_opens_no_session(sessions, queries, loaded_labels):
+    async def predict(image_url, pet_type):
+        return [PredictionResult(tag_name="dermatitis", probability=0.9)]
+
+    await prediction_enrichment.predict_and_enrich("http://img", "dog", predict, sessions=sessions)
+    tracked = TrackedSessions(sessions)
+    await prediction_enrichment.predict_and_enrich("http://img", "dog", predict, sessions=tracked)
+
+    assert tracked.opened == 0
+
+@pytest.mark.asyncio
+async def test_vision_backend_skips_label_prefetch(sessions, queries, loaded_labels):
+    async def predict(image_url, pet_type):
+        return [PredictionResult(tag_name="dermatitis", probability=0.9)]
+
+    results = await prediction_enrichment.predict_and_enrich("http://img", "dog", predict, prefetch=False, sessions=sessions)
+
+    # 추론이 끝난 뒤 나온 태그만 조회
+    assert results[0].disease.type == "dermatitis"
+    assert len(disease_queries(queries)) == 1
+    assert "otitis" not in queries[-1] and all("conjunctivitis" not in q for q in queries)
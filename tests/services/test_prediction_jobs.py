@@ -0,0 +1,190 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.schemas.prediction_job import PredictionJobCreate
+from app.schemas.predict import PredictionResult
+from app.services.prediction_jobs import InMemoryJobStore, PredictionJobQueue, SqliteJobStore
+from conftest import FakeClock
+
+def make_queue(predict, store=None, clock=None, **kwargs):
+    options = dict(workers=1, max_queued=10, result_ttl_seconds=60, poll_interval=0.01)
+    options.update(kwargs)
+    return PredictionJobQueue(
+        store=store or InMemoryJobStore(clock=clock or FakeClock(now=1000.0)),
+        predictors={"torch": predict},
+        clock=clock or FakeClock(now=1000.0),
+        **options,
+    )
+
+def job_request(url, priority=0):
+    return PredictionJobCreate(image_url=url, pet_type="dog", priority=priority)
+
+async def echo_predict(image_url, pet_type):
+    return [PredictionResult(tag_name=image_url, probability=0.5)]
+
+@pytest.mark.asyncio
+async def test_job_completes_and_can_be_long_polled():
+    queue = make_queue(echo_predict)
+    try:
+        job = await queue.submit(job_request("a.jpg"))
+        assert job.status == "queued"
+
+        finished = await queue.get(job.id, wait=1)
+
+        assert finished.status == "succeeded"
+        assert finished.predictions[0].tag_name == "a.jpg"
+        assert finished.finished_at is not None
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_higher_priority_jobs_run_first():
+    release = asyncio.Event()
+    order = []
+
+    async def predict(image_url, pet_type):
+        if image_url == "blocker":
+            await release.wait()
+        order.append(image_url)
+        return []
+
+    queue = make_queue(predict)
+    try:
+        blocker = await queue.submit(job_request("blocker"))
+        await asyncio.sleep(0.01)
+        low = await queue.submit(job_request("low", priority=0))
+        high = await queue.submit(job_request("high", priority=9))
+        release.set()
+
+        await queue.get(low.id, wait=1)
+        assert order == ["blocker", "high", "low"]
+        assert (await queue.get(high.id)).status == "succeeded"
+        assert (await queue.get(blocker.id)).status == "succeeded"
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_failed_job_records_status_code():
+    async def predict(image_url, pet_type):
+        raise HTTPException(status_code=400, detail="이미지 다운로드 실패")
+
+    queue = make_queue(predict)
+    try:
+        job = await queue.submit(job_request("missing.jpg"))
+        failed = await queue.get(job.id, wait=1)
+
+        assert failed.status == "failed"
+        assert (failed.status_code, failed.error) == (400, "이미지 다운로드 실패")
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_retry_after():
+    release = asyncio.Event()
+
+    async def predict(image_url, pet_type):
+        await release.wait()
+        return []
+
+    queue = make_queue(predict, max_queued=1)
+    try:
+        await queue.submit(job_request("running"))
+        await asyncio.sleep(0.01)
+        await queue.submit(job_request("queued"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await queue.submit(job_request("rejected"))
+        assert exc_info.value.status_code == 503
+        assert "Retry-After" in exc_info.value.headers
+    finally:
+        release.set()
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire():
+    clock = FakeClock(now=1000.0)
+    store = InMemoryJobStore(clock=clock)
+    queue = make_queue(echo_predict, store=store, clock=clock, result_ttl_seconds=30)
+    try:
+        job = await queue.submit(job_request("a.jpg"))
+        assert (await queue.get(job.id, wait=1)).status == "succeeded"
+
+        clock.now += 31
+        assert await queue.get(job.id) is None
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_sqlite_store_resumes_unfinished_jobs(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    clock = FakeClock(now=1000.0)
+    never = asyncio.Event()
+
+    async def stuck(image_url, pet_type):
+        await never.wait()
+
+    first = make_queue(stuck, store=SqliteJobStore(path, clock=clock), clock=clock)
+    job = await first.submit(job_request("a.jpg"))
+    await asyncio.sleep(0.01)
+    await first.stop()  # 처리 중에 프로세스가 내려간 상황
+
+    second = make_queue(echo_predict, store=SqliteJobStore(path, clock=clock), clock=clock)
+    try:
+        await second.start()
+        finished = await second.get(job.id, wait=1)
+
+        assert finished.status == "succeeded"
+        assert finished.predictions[0].tag_name == "a.jpg"
+    finally:
+        await second.stop()
+
+@pytest.mark.asyncio
+async def test_worker_start_does_not_rerun_jobs_leased_by_live_worker(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    clock = FakeClock(now=1000.0)
+    never = asyncio.Event()
+    reruns = []
+
+    async def stuck(image_url, pet_type):
+        await never.wait()
+
+    async def record(image_url, pet_type):
+        reruns.append(image_url)
+        return []
+
+    live = make_queue(stuck, store=SqliteJobStore(path, clock=clock), clock=clock, lease_seconds=30)
+    job = await live.submit(job_request("a.jpg"))
+    await asyncio.sleep(0.01)
+
+    booting = make_queue(record, store=SqliteJobStore(path, clock=clock), clock=clock, lease_seconds=30)
+    try:
+        # 다른 워커가 뜨거나 재시작해도 lease 가 살아 있는 작업은 다시 실행하지 않는다
+        await booting.start()
+        assert (await booting.get(job.id, wait=0.05)).status == "running"
+        assert reruns == []
+
+        # lease 를 연장하지 못한 채(워커가 죽음) 시간이 지나면 다른 워커가 가져간다
+        clock.now += 31
+        await booting._adopt_expired()
+        assert (await booting.get(job.id, wait=1)).status == "succeeded"
+        assert reruns == ["a.jpg"]
+    finally:
+        never.set()
+        await booting.stop()
+        await live.stop()
+
+@pytest.mark.asyncio
+async def test_long_poll_timeout_does_not_leak_events():
+    never = asyncio.Event()
+
+    async def stuck(image_url, pet_type):
+        await never.wait()
+
+    queue = make_queue(stuck)
+    try:
+        job = await queue.submit(job_request("a.jpg"))
+        assert (await queue.get(job.id, wait=0.03)).status == "running"
+        assert job.id not in queue._events
+    finally:
+        never.set()
+        await queue.stop()
@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.schemas.predict import PredictionResult
+from app.services.prediction_router import PredictionRouter
+
+def backend(name, delay=0.0, error=None, calls=None):
+    async def predict(image_url, pet_type):
+        if calls is not None:
+            calls.append(name)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return [PredictionResult(tag_name=name, probability=1.0)]
+    return predict
+
+def make_router(backends, **kwargs):
+    options = dict(
+        budget_ms=1000,
+        hedge_quantile=0.95,
+        default_hedge_ms=200,
+        min_samples=3,
+        latency_window=50,
+        error_window=3,
+        max_error_rate=0.5,
+        unhealthy_cooldown_seconds=60,
+    )
+    options.update(kwargs)
+    return PredictionRouter(backends=backends, **options)
+
+@pytest.mark.asyncio
+async def test_uses_configured_order_without_history():
+    router = make_router({"torch": backend("torch"), "vision": backend("vision")})
+
+    name, results = await router.predict("a.jpg", "dog")
+
+    assert name == "torch"
+    assert results[0].tag_name == "torch"
+
+@pytest.mark.asyncio
+async def test_falls_back_on_server_error():
+    router = make_router({
+        "torch": backend("torch", error=HTTPException(status_code=503, detail="busy")),
+        "vision": backend("vision"),
+    })
+
+    name, _ = await router.predict("a.jpg", "dog")
+
+    assert name == "vision"
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried_on_other_backend():
+    calls = []
+    router = make_router({
+        "torch": backend("torch", error=ValueError("지원되지 않는 pet_type: bird"), calls=calls),
+        "vision": backend("vision", calls=calls),
+    })
+
+    with pytest.raises(ValueError):
+        await router.predict("a.jpg", "bird")
+    assert calls == ["torch"]
+
+@pytest.mark.asyncio
+async def test_hedges_slow_backend():
+    router = make_router(
+        {"torch": backend("torch", delay=0.5), "vision": backend("vision", delay=0.01)},
+        default_hedge_ms=20,
+    )
+
+    name, _ = await router.predict("a.jpg", "dog")
+
+    assert name == "vision"
+
+@pytest.mark.asyncio
+async def test_routes_to_faster_backend_per_pet_type():
+    router = make_router(
+        {"torch": backend("torch", delay=0.03), "vision": backend("vision", delay=0.001)},
+        min_samples=2,
+        default_hedge_ms=5,
+    )
+    # hedge 덕분에 두 백엔드 모두 기록이 쌓인다
+    for _ in range(3):
+        await router.predict("a.jpg", "dog")
+    await asyncio.sleep(0.05)
+    for _ in range(2):
+        await router.predict("a.jpg", "dog")
+
+    assert router.route("dog") == ["vision", "torch"]
+    assert router.route("cat") == ["torch", "vision"]
+
+@pytest.mark.asyncio
+async def test_unhealthy_backend_is_moved_back_until_cooldown():
+    now = [0.0]
+    router = make_router(
+        {"torch": backend("torch", error=HTTPException(status_code=500, detail="down")), "vision": backend("vision")},
+        clock=lambda: now[0],
+    )
+    for _ in range(3):
+        assert (await router.predict("a.jpg", "dog"))[0] == "vision"
+
+    assert router.route("dog") == ["vision", "torch"]
+    assert not router.is_healthy("torch", "dog")
+    now[0] += 61
+    assert router.is_healthy("torch", "dog")
+
+@pytest.mark.asyncio
+async def test_budget_exceeded_returns_504():
+    router = make_router(
+        {"torch": backend("torch", delay=1), "vision": backend("vision", delay=1)},
+        budget_ms=50,
+        default_hedge_ms=10,
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await router.predict("a.jpg", "dog")
+    assert exc_info.value.status_code == 504
+
+@pytest.mark.asyncio
+async def test_hedged_out_calls_record_censored_latency():
+    delays = {"torch": 0.0}
+
+    async def torch(image_url, pet_type):
+        await asyncio.sleep(delays["torch"])
+        return [PredictionResult(tag_name="torch", probability=1.0)]
+
+    router = make_router({"torch": torch, "vision": backend("vision", delay=0.05)})
+    for _ in range(3):
+        await router.predict("a.jpg", "dog")
+    assert router._typical_ms("torch", "dog", 0.5) < 10
+
+    # torch 가 느려져서 매번 hedging 으로 vision 에 지고 취소됨
+    delays["torch"] = 10
+    for _ in range(4):
+        name, _ = await router.predict("a.jpg", "dog")
+        assert name == "vision"
+
+    assert router._typical_ms("torch", "dog", 0.5) >= 40
@@ -0,0 +1,35 @@
+import pytest
+from app.services.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+from conftest import FakeClock
+
+def test_circuit_breaker_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test-breaker", failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.retry_after == 10
+
+    clock.now = 10
+    breaker.before_call()  # 시험 호출 하나만 허용
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_failure()  # 시험 호출 실패 -> 다시 open
+    assert breaker.state == "open"
+
+    clock.now = 20
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+def test_backoff_delay_is_capped_full_jitter():
+    assert backoff_delay(0, base=0.2, maximum=2.0, rand=lambda: 1.0) == pytest.approx(0.2)
+    assert backoff_delay(3, base=0.2, maximum=2.0, rand=lambda: 1.0) == pytest.approx(1.6)
+    assert backoff_delay(10, base=0.2, maximum=2.0, rand=lambda: 1.0) == pytest.approx(2.0)
+    assert backoff_delay(10, base=0.2, maximum=2.0, rand=lambda: 0.0) == 0.0
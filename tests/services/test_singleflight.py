@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from app.services.singleflight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_with_same_key_run_once():
+    flight = SingleFlight("test-same-key")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*[flight.do("key", work) for _ in range(5)])
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight("test-different-keys")
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    results = await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+
+    assert results == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_exception_is_shared_and_key_is_released():
+    flight = SingleFlight("test-exception")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeed():
+        return "ok"
+
+    assert await flight.do("key", succeed) == "ok"
+
+@pytest.mark.asyncio
+async def test_leader_cancellation_does_not_cancel_followers():
+    flight = SingleFlight("test-cancel")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    leader = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
+
+@pytest.mark.asyncio
+async def test_work_is_cancelled_when_all_waiters_are_cancelled():
+    flight = SingleFlight("test-abandon")
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "done"
+
+    waiters = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert cancelled == [1]
+    assert flight.in_flight() == 0
+
+    async def succeed():
+        return "ok"
+
+    # 취소된 작업에 붙지 않고 새로 실행
+    assert await flight.do("key", succeed) == "ok"
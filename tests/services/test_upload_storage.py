@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import pytest
+from app.services.upload_storage import AzureBlobUploadStorage, FilesystemUploadStorage
+from conftest import chunks
+
+class FakeBlobClient:
+    def __init__(self, service, name):
+        self.service = service
+        self.url = f"{service.url}/uploads/{name}"
+
+    def stage_block(self, block_id, data, length=None):
+        with self.service.lock:
+            self.service.in_flight += 1
+            self.service.max_in_flight = max(self.service.max_in_flight, self.service.in_flight)
+        threading.Event().wait(0.01)
+        with self.service.lock:
+            self.service.in_flight -= 1
+            self.service.staged[block_id] = data
+
+    def commit_block_list(self, block_list, content_settings=None):
+        self.service.committed = b"".join(self.service.staged[block.id] for block in block_list)
+        self.service.content_type = content_settings.content_type
+
+    def upload_blob(self, data, overwrite=False, content_settings=None):
+        self.service.uploaded = data
+
+    def exists(self):
+        return self.url.rsplit("/", 1)[1] in self.service.names
+
+class FakeBlobService:
+    url = "http://azurite.test/account"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.staged = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.committed = None
+        self.uploaded = None
+        self.content_type = None
+        self.names = {"existing.jpg"}
+
+    def get_blob_client(self, container, blob):
+        return FakeBlobClient(self, blob)
+
+def make_azure_storage(service, block_size=10, max_concurrency=2):
+    return AzureBlobUploadStorage(
+        connection_string="unused",
+        container="uploads",
+        block_size=block_size,
+        max_concurrency=max_concurrency,
+        client_factory=lambda _: service,
+    )
+
+@pytest.mark.asyncio
+async def test_azure_storage_stages_blocks_and_commits_in_order():
+    service = FakeBlobService()
+    storage = make_azure_storage(service)
+    data = bytes(range(95))
+
+    url = await storage.save("a.jpg", chunks(data, 7), content_type="image/jpeg")
+
+    assert url == "http://azurite.test/account/uploads/a.jpg"
+    assert service.committed == data
+    assert len(service.staged) == 10
+    assert 1 <= service.max_in_flight <= 2
+    assert service.content_type == "image/jpeg"
+
+@pytest.mark.asyncio
+async def test_azure_storage_uploads_small_file_in_one_call():
+    service = FakeBlobService()
+    storage = make_azure_storage(service, block_size=1024)
+
+    await storage.save("a.jpg", chunks(b"small", 2))
+
+    assert service.uploaded == b"small"
+    assert service.staged == {}
+
+@pytest.mark.asyncio
+async def test_azure_storage_url_prefix_uses_shared_client():
+    service = FakeBlobService()
+    storage = make_azure_storage(service)
+
+    assert storage.url_prefix == "http://azurite.test/account/uploads/"
+
+@pytest.mark.asyncio
+async def test_filesystem_storage_writes_file(tmp_path):
+    storage = FilesystemUploadStorage(str(tmp_path), "http://localhost/uploads/")
+
+    url = await storage.save("a.jpg", chunks(b"image-bytes", 3))
+
+    assert url == "http://localhost/uploads/a.jpg"
+    assert (tmp_path / "a.jpg").read_bytes() == b"image-bytes"
+
+@pytest.mark.asyncio
+async def test_filesystem_storage_removes_partial_file_on_error(tmp_path):
+    storage = FilesystemUploadStorage(str(tmp_path), "http://localhost/uploads")
+
+    async def failing():
+        yield b"part"
+        raise RuntimeError("client disconnected")
+
+    with pytest.raises(RuntimeError):
+        await storage.save("a.jpg", failing())
+    assert list(tmp_path.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_azure_storage_exists():
+    storage = make_azure_storage(FakeBlobService())
+
+    assert await storage.exists("existing.jpg")
+    assert not await storage.exists("missing.jpg")